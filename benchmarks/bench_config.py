@@ -0,0 +1,250 @@
+"""
+設定ファイル操作のベンチマーク。
+合成した設定ファイル（corpus.py）のサイズごとに、load_config・validate_config・
+get_mcp_path・set_mcp_path・save_config・backup_configの時間を、キャッシュが
+冷えた状態（cold）と温まった状態（warm）で測定し、結果をJSONで出力します。
+
+cold: 解析結果などのプロセス内のキャッシュを破棄し、ファイルから処理を始める
+      （backupは空のバックアップディレクトリへの作成）
+warm: キャッシュ済みの状態、またはメモリ上の設定データに対する処理
+      （backupは同じ内容のバックアップが既にある状態）
+
+使い方:
+    # 測定して結果を保存する
+    python benchmarks/bench_config.py --output results.json
+
+    # 測定して、基準の結果と比較する（最小値が25%を超えて遅くなった項目があると終了コード1）
+    python benchmarks/bench_config.py --compare baseline.json --threshold 0.25
+
+    # 保存済みの結果どうしを比較する
+    python benchmarks/bench_config.py --input results.json --compare baseline.json
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+# モジュールをインポートできるようにシステムパスを調整
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import corpus
+from src import config
+from src import parse_cache
+
+# 結果ファイルの形式のバージョン
+RESULT_VERSION = 1
+
+# 遅くなったと判定する割合の既定値
+DEFAULT_THRESHOLD = 0.25
+
+# 比較に使う値の既定値（最小値は中央値よりも他のプロセスの影響を受けにくい）
+DEFAULT_STATISTIC = 'min_ms'
+
+# これより小さい差（ミリ秒）は測定誤差として扱う
+NOISE_FLOOR_MS = 0.05
+
+
+def measure(operation, setup=None, min_time=0.2, min_runs=5, max_runs=200):
+    """
+    処理を繰り返し実行して時間を測定します。
+
+    Args:
+        operation (callable): 測定する処理
+        setup (callable, optional): 各回の前に実行する準備（時間に含めない）
+        min_time (float): 合計の測定時間の目安（秒）
+        min_runs (int): 最小の実行回数
+        max_runs (int): 最大の実行回数
+
+    Returns:
+        dict: 中央値・最小値（ミリ秒）と実行回数
+    """
+    timings = []
+    total = 0.0
+    while len(timings) < min_runs or (total < min_time and len(timings) < max_runs):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        operation()
+        elapsed = time.perf_counter() - started
+        timings.append(elapsed * 1000)
+        total += elapsed
+    return {
+        "median_ms": statistics.median(timings),
+        "min_ms": min(timings),
+        "runs": len(timings),
+    }
+
+
+class _Toggle:
+    """呼び出すたびに2つの値を交互に返す（保存のたびに内容を変えるため）"""
+
+    def __init__(self, first, second):
+        self.values = (first, second)
+        self.index = 0
+
+    def __call__(self):
+        self.index ^= 1
+        return self.values[self.index]
+
+
+def bench_size(path, backup_mode):
+    """
+    1つの設定ファイルに対して各処理を測定します。
+
+    Args:
+        path (str): 設定ファイルのパス
+        backup_mode (str): バックアップ形式
+
+    Returns:
+        dict: "処理/cold" または "処理/warm" をキーとする測定結果
+    """
+    cache = parse_cache.default_cache
+    clear = cache.invalidate
+    document = config.load_config(path)
+    next_path = _Toggle('D:\\bench\\first', 'D:\\bench\\second')
+    directory = os.path.dirname(path)
+    results = {}
+
+    # 読み込み
+    results["load/cold"] = measure(lambda: config.load_config(path), setup=clear)
+    config.load_config(path)
+    results["load/warm"] = measure(lambda: config.load_config(path))
+
+    # 検証
+    results["validate/cold"] = measure(lambda: config.validate_config(config.load_config(path)), setup=clear)
+    results["validate/warm"] = measure(lambda: config.validate_config(document))
+
+    # パスの取得・設定
+    results["get/cold"] = measure(lambda: config.read_mcp_path(path), setup=clear)
+    results["get/warm"] = measure(lambda: config.get_mcp_path(document))
+    results["set/cold"] = measure(lambda: config.set_mcp_path(config.load_config(path), next_path()), setup=clear)
+    results["set/warm"] = measure(lambda: config.set_mcp_path(document, next_path()))
+
+    # 保存（毎回パスを変えて、実際に書き込みが行われるようにする）
+    def save():
+        config.set_mcp_path(document, next_path())
+        config.save_config(document, path, backup=False)
+    results["save/cold"] = measure(save, setup=clear)
+    results["save/warm"] = measure(save, setup=lambda: cache.load_shared(path))
+
+    # バックアップ
+    copies = []
+
+    def fresh_copy():
+        copy_dir = tempfile.mkdtemp(dir=directory)
+        copies.append(os.path.join(copy_dir, os.path.basename(path)))
+        shutil.copyfile(path, copies[-1])
+    results["backup/cold"] = measure(lambda: config.backup_config(copies[-1], mode=backup_mode),
+                                     setup=fresh_copy, max_runs=50)
+    results["backup/warm"] = measure(lambda: config.backup_config(path, mode=backup_mode), max_runs=50)
+
+    size = os.path.getsize(path)
+    for result in results.values():
+        result["bytes"] = size
+    return results
+
+
+def run(sizes, backup_mode):
+    """
+    サイズごとの設定ファイルを作成して測定します。
+
+    Args:
+        sizes (list): サーバー数のリスト
+        backup_mode (str): バックアップ形式
+
+    Returns:
+        dict: 結果ファイルの内容
+    """
+    metrics = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for servers, path in corpus.write_corpus(directory, sizes).items():
+            for name, result in bench_size(path, backup_mode).items():
+                operation, state = name.split('/')
+                metrics[f"{operation}/{state}/{servers}"] = result
+                print(f"{operation:<9}{state:<5}{servers:>6}件  中央値 {result['median_ms']:10.3f} ms  "
+                      f"最小 {result['min_ms']:10.3f} ms  ({result['runs']}回)")
+    return {
+        "version": RESULT_VERSION,
+        "created": datetime.datetime.now().isoformat(timespec='seconds'),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "backup_mode": backup_mode,
+        "metrics": metrics,
+    }
+
+
+def compare(baseline, current, threshold=DEFAULT_THRESHOLD, statistic=DEFAULT_STATISTIC):
+    """
+    2つの結果を比較し、遅くなった項目を返します。
+
+    statisticの値が基準よりthresholdの割合を超えて大きく、かつ差がNOISE_FLOOR_MSを超える場合に
+    遅くなったと判定します。どちらかにしかない項目は比較しません。
+
+    Args:
+        baseline (dict): 基準の結果
+        current (dict): 比較する結果
+        threshold (float): 許容する割合（0.25は25%）
+        statistic (str): 比較に使う値（'min_ms' または 'median_ms'）
+
+    Returns:
+        list: (項目名, 基準の値, 今回の値, 比率) のリスト（比率の大きい順）
+    """
+    regressions = []
+    for name, result in current["metrics"].items():
+        base = baseline["metrics"].get(name)
+        if base is None:
+            continue
+        before, after = base[statistic], result[statistic]
+        if after > before * (1 + threshold) and after - before > NOISE_FLOOR_MS:
+            regressions.append((name, before, after, after / before if before else float('inf')))
+    regressions.sort(key=lambda item: item[3], reverse=True)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='設定ファイル操作のベンチマーク')
+    parser.add_argument('--sizes', type=corpus.parse_sizes, default=list(corpus.DEFAULT_SIZES),
+                        help='カンマ区切りのサーバー数（既定: 1,10,100,1000,5000）')
+    parser.add_argument('--backup-mode', choices=[config.BACKUP_MODE_STORE, config.BACKUP_MODE_PACK],
+                        default=config.BACKUP_MODE_STORE, help='測定するバックアップ形式')
+    parser.add_argument('--output', help='結果を書き込むJSONファイル')
+    parser.add_argument('--input', help='測定せずに読み込む結果のJSONファイル（--compareと使う）')
+    parser.add_argument('--compare', help='比較する基準の結果のJSONファイル')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='遅くなったと判定する割合（既定: 0.25）')
+    parser.add_argument('--statistic', choices=['min_ms', 'median_ms'], default=DEFAULT_STATISTIC,
+                        help='比較に使う値（既定: min_ms）')
+    args = parser.parse_args()
+
+    if args.input:
+        with open(args.input, encoding='utf-8') as f:
+            current = json.load(f)
+    else:
+        current = run(args.sizes, args.backup_mode)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(current, f, indent=2)
+
+    if not args.compare:
+        return 0
+
+    with open(args.compare, encoding='utf-8') as f:
+        baseline = json.load(f)
+    regressions = compare(baseline, current, args.threshold, args.statistic)
+    for name, before, after, ratio in regressions:
+        print(f"遅くなりました: {name}  {before:.3f} ms -> {after:.3f} ms  (x{ratio:.2f})")
+    print(f"比較: {len(current['metrics'])}項目  遅くなった項目: {len(regressions)}  "
+          f"しきい値: {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
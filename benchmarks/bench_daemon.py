@@ -0,0 +1,151 @@
+"""
+設定デーモンの負荷テスト。
+合成した設定ファイル（corpus.py）を読み込ませたデーモンを別プロセスで起動し、
+同時に接続するクライアントの数ごとに、1秒あたりの処理件数と応答時間を測定します。
+クライアントは接続を使い回し、それぞれ別のスレッドで依頼を続けます。
+
+あわせて、スクリプトから1回だけ実行する場合の比較として、`client get` と、デーモンを
+使わずに設定ファイルを読み込んでパスを表示するプロセスの、起動から終了までの時間を表示します。
+
+使い方:
+    python benchmarks/bench_daemon.py [--servers 100] [--clients 1,4,16] [--requests 2000] [--op get]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# モジュールをインポートできるようにシステムパスを調整
+sys.path.insert(0, ROOT)
+
+import corpus
+from src.daemon_client import PIPE_PREFIX, DaemonClient, DaemonError
+
+
+def start_daemon(address):
+    """
+    デーモンを別プロセスで起動し、依頼に答えるようになるまで待ちます。
+
+    Args:
+        address (str): 待ち受けアドレス
+
+    Returns:
+        subprocess.Popen: デーモンのプロセス
+    """
+    process = subprocess.Popen([sys.executable, '-m', 'src.main', 'daemon', '--socket', address, '--no-backup'],
+                               cwd=ROOT, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        try:
+            with DaemonClient(address) as client:
+                client.ping()
+            return process
+        except DaemonError:
+            time.sleep(0.05)
+    process.kill()
+    raise RuntimeError("デーモンが起動しませんでした")
+
+
+def run_clients(address, config_path, clients, requests, op):
+    """
+    複数のクライアントから同時に依頼を続けます。
+
+    Args:
+        address (str): デーモンのアドレス
+        config_path (str): 設定ファイルのパス
+        clients (int): 同時に接続するクライアントの数
+        requests (int): クライアントごとの依頼の数
+        op (str): 依頼する処理（get または validate）
+
+    Returns:
+        tuple: (経過秒数, すべての依頼の応答時間（ミリ秒）のリスト)
+    """
+    latencies = [[] for _ in range(clients)]
+    barrier = threading.Barrier(clients + 1)
+
+    def work(index):
+        with DaemonClient(address) as client:
+            call = client.get if op == 'get' else client.validate
+            call(config_path)
+            barrier.wait()
+            timings = latencies[index]
+            for _ in range(requests):
+                started = time.perf_counter()
+                call(config_path)
+                timings.append((time.perf_counter() - started) * 1000)
+
+    threads = [threading.Thread(target=work, args=(index,)) for index in range(clients)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    return elapsed, [timing for timings in latencies for timing in timings]
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def time_process(command, runs):
+    """コマンドを繰り返し実行し、終了までの時間の中央値（ミリ秒）を返します"""
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run(command, cwd=ROOT, stdout=subprocess.DEVNULL, check=True)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='設定デーモンの負荷テスト')
+    parser.add_argument('--servers', type=int, default=100, help='合成する設定ファイルのサーバー数')
+    parser.add_argument('--clients', default='1,4,16', help='同時に接続するクライアントの数（カンマ区切り）')
+    parser.add_argument('--requests', type=int, default=2000, help='クライアントごとの依頼の数')
+    parser.add_argument('--op', choices=('get', 'validate'), default='get', help='依頼する処理')
+    parser.add_argument('--runs', type=int, default=5, help='1回だけ実行する場合の比較の実行回数')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        config_path = os.path.join(directory, 'claude_desktop_config.json')
+        size = corpus.write_config(config_path, args.servers)
+        if sys.platform == 'win32':
+            address = PIPE_PREFIX + f'claude-config-editor-bench-{os.getpid()}'
+        else:
+            address = os.path.join(directory, 'daemon.sock')
+
+        process = start_daemon(address)
+        try:
+            print(f"設定ファイル: サーバー {args.servers}件 ({size:,} バイト)  処理: {args.op}")
+            for clients in (int(value) for value in args.clients.split(',')):
+                elapsed, latencies = run_clients(address, config_path, clients, args.requests, args.op)
+                print(f"クライアント {clients:>3}  {len(latencies) / elapsed:9.0f} 件/秒  "
+                      f"中央値 {statistics.median(latencies):6.3f} ms  "
+                      f"99% {_percentile(latencies, 0.99):6.3f} ms")
+
+            client = time_process([sys.executable, '-m', 'src.main', '--config', config_path,
+                                   'client', 'get', '--socket', address], args.runs)
+        finally:
+            with DaemonClient(address) as stopper:
+                stopper.shutdown()
+            process.wait(10)
+
+        direct = time_process([sys.executable, '-c',
+                               'import sys; from src import config; '
+                               'print(config.get_mcp_path(config.load_config(sys.argv[1])))', config_path], args.runs)
+        print(f"1回だけ実行する場合: client get {client:.1f} ms  デーモンなし {direct:.1f} ms")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
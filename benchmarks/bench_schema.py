@@ -0,0 +1,56 @@
+"""
+スキーマ検証のベンチマーク。
+一般的な設定ファイルを1コアで毎秒何件検証できるかを測定します。
+
+使い方:
+    python benchmarks/bench_schema.py [--count 50000] [--min-rate 10000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# モジュールをインポートできるようにシステムパスを調整
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src import schema
+
+
+def typical_config(index):
+    """一般的な規模（サーバー8件）の設定データを作ります"""
+    servers = {
+        "filesystem": {
+            "command": "npx",
+            "args": ["-y", "@modelcontextprotocol/server-filesystem", f"C:\\Users\\user{index}\\Documents"],
+        },
+    }
+    for number in range(7):
+        servers[f"server{number}"] = {
+            "command": "node",
+            "args": [f"C:\\mcp\\server{number}\\index.js", "--port", str(3000 + number)],
+            "env": {"API_KEY": "x" * 32, "LOG_LEVEL": "info"},
+        }
+    return {"mcpServers": servers}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='スキーマ検証のベンチマーク')
+    parser.add_argument('--count', type=int, default=50000, help='検証する設定の件数')
+    parser.add_argument('--min-rate', type=float, default=10000, help='必要な件数/秒（下回ると終了コード1）')
+    args = parser.parse_args()
+
+    documents = [typical_config(index % 100) for index in range(args.count)]
+    validator = schema.Validator(schema.CONFIG_SCHEMA)
+
+    start = time.perf_counter()
+    invalid = sum(1 for errors in validator.validate_many(documents) if errors)
+    elapsed = time.perf_counter() - start
+
+    rate = args.count / elapsed
+    print(f"検証: {args.count}件  無効: {invalid}件  経過: {elapsed:.3f}秒  ({rate:,.0f}件/秒)")
+    return 0 if rate >= args.min_rate else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,122 @@
+"""
+起動時間のベンチマーク。
+GUIを起動しないコマンドを別プロセスで実行し、最初の出力までの時間を測定します。
+あわせて、それらのコマンドがtkinterを読み込んでいないことを確認します。
+
+使い方:
+    python benchmarks/bench_startup.py [--runs 10] [--target-ms 100]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def sample_config(directory):
+    """検証に使う設定ファイルを作ります"""
+    path = os.path.join(directory, 'claude_desktop_config.json')
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({
+            "mcpServers": {
+                "filesystem": {
+                    "command": "npx",
+                    "args": ["-y", "@modelcontextprotocol/server-filesystem", "C:\\Users\\user\\Documents"],
+                },
+            },
+        }, f, indent=4)
+    return path
+
+
+def time_to_first_output(arguments):
+    """
+    コマンドを実行し、標準出力の最初の行が届くまでの秒数を返します。
+
+    Args:
+        arguments (list): src.mainに渡す引数
+
+    Returns:
+        float: 最初の出力までの秒数
+    """
+    started = time.perf_counter()
+    process = subprocess.Popen([sys.executable, '-m', 'src.main'] + arguments, cwd=ROOT,
+                               stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    first_line = process.stdout.readline()
+    elapsed = time.perf_counter() - started
+    process.communicate()
+    if not first_line:
+        raise RuntimeError(f"出力がありません: {' '.join(arguments)}")
+    return elapsed
+
+
+def loads_tkinter(arguments):
+    """
+    コマンドの実行中にtkinterが読み込まれたかを `-X importtime` の出力で調べます。
+
+    Args:
+        arguments (list): src.mainに渡す引数
+
+    Returns:
+        bool: tkinterが読み込まれたかどうか
+    """
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-m', 'src.main'] + arguments, cwd=ROOT,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    return any(line.rstrip().endswith(('| tkinter', ' tkinter')) for line in result.stderr.splitlines())
+
+
+def _time_command(command):
+    """コマンドの最初の出力までのミリ秒を返します"""
+    started = time.perf_counter()
+    process = subprocess.Popen(command, stdout=subprocess.PIPE)
+    process.stdout.readline()
+    elapsed = time.perf_counter() - started
+    process.communicate()
+    return elapsed * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='起動時間のベンチマーク')
+    parser.add_argument('--runs', type=int, default=10, help='コマンドごとの実行回数')
+    parser.add_argument('--target-ms', type=float, default=100,
+                        help='最初の出力までの目標時間（中央値がこれを超えると終了コード1）')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        commands = {
+            '--help': ['--help'],
+            'validate': ['validate', sample_config(directory)],
+        }
+
+        # 1回目はバイトコードの生成などを含むため計測から除く
+        for arguments in commands.values():
+            time_to_first_output(arguments)
+
+        failed = False
+        for label, arguments in commands.items():
+            timings = [time_to_first_output(arguments) * 1000 for _ in range(args.runs)]
+            median = statistics.median(timings)
+            tkinter = loads_tkinter(arguments)
+            print(f"{label:<10} 中央値 {median:7.1f} ms  最小 {min(timings):7.1f} ms  "
+                  f"最大 {max(timings):7.1f} ms  tkinter: {'読み込む' if tkinter else '読み込まない'}")
+            if median > args.target_ms or tkinter:
+                failed = True
+
+    # 比較用に、Pythonインタプリタだけの起動時間を表示する
+    interpreter = statistics.median(
+        _time_command([sys.executable, '-c', 'print()']) for _ in range(args.runs))
+    print(f"参考: インタプリタのみ {interpreter:.1f} ms  目標: {args.target_ms:.0f} ms")
+
+    if failed:
+        print("目標を達成できませんでした", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,119 @@
+"""
+ベンチマーク用の設定ファイルの生成。
+サーバー1件（数百バイト）から数千件（数MB）までの合成した設定ファイルを作ります。
+
+使い方:
+    python benchmarks/corpus.py OUTPUT_DIR [--sizes 1,10,100,1000,5000]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+
+# 既定のサーバー数（最大で数MBの設定ファイルになる）
+DEFAULT_SIZES = (1, 10, 100, 1000, 5000)
+
+# 設定ファイルのパスとして使うパス
+FILESYSTEM_PATH = 'C:\\Users\\user\\Documents'
+
+
+def make_config(servers, seed=0):
+    """
+    サーバー数を指定して合成した設定データを作ります。
+
+    先頭のサーバーはfilesystemで、残りは引数と環境変数を持つ一般的なサーバーです。
+    同じ引数からは常に同じ内容が作られます。
+
+    Args:
+        servers (int): サーバーの数（1以上）
+        seed (int): 乱数の種
+
+    Returns:
+        dict: 設定データ
+    """
+    generator = random.Random(seed)
+    mcp_servers = {
+        "filesystem": {
+            "command": "npx",
+            "args": ["-y", "@modelcontextprotocol/server-filesystem", FILESYSTEM_PATH],
+        },
+    }
+    for number in range(1, servers):
+        mcp_servers[f"server{number:05d}"] = {
+            "command": generator.choice(["node", "npx", "python", "uvx"]),
+            "args": [f"C:\\mcp\\server{number}\\index.js", "--port", str(3000 + number % 1000)]
+                    + [f"--option{index}=value{generator.randrange(10 ** 6)}"
+                       for index in range(generator.randrange(2, 12))],
+            "env": {
+                "API_KEY": ''.join(generator.choice('0123456789abcdef') for _ in range(40)),
+                "LOG_LEVEL": generator.choice(["debug", "info", "warning"]),
+                "DESCRIPTION": ' '.join(generator.choice(["alpha", "beta", "gamma", "delta", "epsilon"])
+                                        for _ in range(generator.randrange(5, 60))),
+            },
+        }
+    return {"mcpServers": mcp_servers}
+
+
+def write_config(path, servers, seed=0):
+    """
+    合成した設定ファイルを書き込みます。
+
+    Args:
+        path (str): 書き込むパス
+        servers (int): サーバーの数
+        seed (int): 乱数の種
+
+    Returns:
+        int: 書き込んだバイト数
+    """
+    data = json.dumps(make_config(servers, seed), indent=4).encode('utf-8')
+    with open(path, 'wb') as f:
+        f.write(data)
+    return len(data)
+
+
+def write_corpus(directory, sizes=DEFAULT_SIZES):
+    """
+    サーバー数ごとの設定ファイルをディレクトリ内に作ります。
+
+    Args:
+        directory (str): 出力先のディレクトリ（サーバー数ごとのサブディレクトリを作る）
+        sizes (iterable): サーバー数の列
+
+    Returns:
+        dict: サーバー数をキー、設定ファイルのパスを値とする辞書
+    """
+    paths = {}
+    for servers in sizes:
+        subdirectory = os.path.join(directory, f"servers-{servers}")
+        os.makedirs(subdirectory, exist_ok=True)
+        path = os.path.join(subdirectory, 'claude_desktop_config.json')
+        write_config(path, servers)
+        paths[servers] = path
+    return paths
+
+
+def parse_sizes(text):
+    """カンマ区切りのサーバー数を解析します"""
+    sizes = [int(part) for part in text.split(',') if part.strip()]
+    if not sizes or min(sizes) < 1:
+        raise argparse.ArgumentTypeError("サーバー数は1以上で指定してください")
+    return sizes
+
+
+def main():
+    parser = argparse.ArgumentParser(description='ベンチマーク用の設定ファイルを生成する')
+    parser.add_argument('directory', help='出力先のディレクトリ')
+    parser.add_argument('--sizes', type=parse_sizes, default=list(DEFAULT_SIZES),
+                        help='カンマ区切りのサーバー数（既定: 1,10,100,1000,5000）')
+    args = parser.parse_args()
+
+    for servers, path in write_corpus(args.directory, args.sizes).items():
+        print(f"{servers:>6}件  {os.path.getsize(path):>10,} バイト  {path}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -14,4 +14,4 @@ from src.main import main
 
 if __name__ == "__main__":
     # アプリケーションを起動
-    main()
+    sys.exit(main())
@@ -0,0 +1,191 @@
+"""
+バックアップ履歴の表示モジュール。
+設定ファイルのバックアップを新しい順にページ単位で一覧し、選択した版を復元する
+ウィンドウを提供します。一覧はインデックスから作られ、各版のfilesystemのパスと
+現在の設定ファイルとの違いの件数は、表示するページの分だけワーカースレッドで求めます。
+選択した版と現在の設定ファイルとの違いは、ウィンドウ下部の差分パネルに表示します。
+"""
+
+import tkinter as tk
+from tkinter import ttk, messagebox
+
+from . import diff
+from . import history
+from .tasks import TaskRunner
+
+
+class BackupBrowser:
+    """バックアップ履歴を表示して復元するウィンドウ"""
+
+    def __init__(self, parent, backup_history, on_restore, executor=None, page_size=history.DEFAULT_PAGE_SIZE):
+        """
+        初期化メソッド
+
+        Args:
+            parent (tk.Widget): 親ウィジェット
+            backup_history (BackupHistory): 表示するバックアップ履歴
+            on_restore (callable): 復元が選ばれたときに呼ばれる関数（引数はHistoryEntry）
+            executor (Executor, optional): 一覧を読み込むエグゼキュータ。
+                Noneの場合はこのウィンドウ用のスレッドを作り、閉じるときに停止する。
+            page_size (int): 1ページの件数
+        """
+        self.history = backup_history
+        self.differ = diff.BackupDiffer(backup_history)
+        self.on_restore = on_restore
+        self.page_size = page_size
+        self.page_number = 1
+        self.page_total = 1
+        self.window = tk.Toplevel(parent)
+        self.window.title("バックアップ履歴")
+        self.window.geometry("720x600")
+        self.tasks = TaskRunner(self.window, executor)
+        self._owns_executor = executor is None
+        # タイトルバーの閉じるボタンでも、ワーカースレッドを停止してから閉じる
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+
+        # 行ごとのバックアップ
+        self._entries = {}
+        self._loading = False
+        self._diff_request = 0
+        self.page_var = tk.StringVar()
+        self.status_var = tk.StringVar()
+
+        self._create_widgets()
+        self._load_page(1)
+
+    def _create_widgets(self):
+        """ウィジェットを作成してレイアウトします"""
+        top_frame = ttk.Frame(self.window, padding="5")
+        top_frame.pack(fill=tk.X)
+        ttk.Label(top_frame, text=str(self.history.config_path)).pack(side=tk.LEFT, padx=2)
+        ttk.Button(top_frame, text="更新", command=lambda: self._load_page(self.page_number)).pack(side=tk.RIGHT, padx=2)
+
+        tree_frame = ttk.Frame(self.window)
+        tree_frame.pack(fill=tk.BOTH, expand=True, padx=5)
+        columns = ('time', 'source', 'size', 'changes', 'path')
+        self.tree = ttk.Treeview(tree_frame, columns=columns, show='headings', selectmode='browse', height=12)
+        for column, text, width in (('time', "日時", 150), ('source', "形式", 60), ('size', "サイズ", 80),
+                                    ('changes', "現在との違い", 90), ('path', "filesystemのパス", 320)):
+            self.tree.heading(column, text=text)
+            self.tree.column(column, width=width, anchor=tk.E if column in ('size', 'changes') else tk.W)
+        scrollbar = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.bind('<Double-1>', lambda event: self._restore())
+        self.tree.bind('<<TreeviewSelect>>', lambda event: self._show_diff())
+
+        page_frame = ttk.Frame(self.window, padding="5")
+        page_frame.pack(fill=tk.X)
+        ttk.Button(page_frame, text="前へ", command=lambda: self._load_page(self.page_number - 1)).pack(side=tk.LEFT, padx=2)
+        ttk.Label(page_frame, textvariable=self.page_var).pack(side=tk.LEFT, padx=5)
+        ttk.Button(page_frame, text="次へ", command=lambda: self._load_page(self.page_number + 1)).pack(side=tk.LEFT, padx=2)
+
+        # 差分パネル
+        diff_frame = ttk.LabelFrame(self.window, text="選択したバックアップから現在の設定ファイルへの違い", padding="5")
+        diff_frame.pack(fill=tk.BOTH, expand=True, padx=5)
+        self.diff_text = tk.Text(diff_frame, height=10, wrap=tk.NONE, state=tk.DISABLED)
+        diff_scrollbar = ttk.Scrollbar(diff_frame, orient=tk.VERTICAL, command=self.diff_text.yview)
+        self.diff_text.configure(yscrollcommand=diff_scrollbar.set)
+        self.diff_text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        diff_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        button_frame = ttk.Frame(self.window, padding="5")
+        button_frame.pack(fill=tk.X)
+        ttk.Button(button_frame, text="復元", command=self._restore).pack(side=tk.RIGHT, padx=2)
+        ttk.Button(button_frame, text="閉じる", command=self.close).pack(side=tk.RIGHT, padx=2)
+        ttk.Label(button_frame, textvariable=self.status_var).pack(side=tk.LEFT)
+
+    def close(self):
+        """ウィンドウを閉じます"""
+        if self._owns_executor:
+            self.tasks.shutdown()
+        self.window.destroy()
+
+    def _load_page(self, number):
+        """指定したページをワーカースレッドで読み込みます"""
+        if self._loading or number < 1 or number > self.page_total:
+            return
+        self._loading = True
+        self.status_var.set("読み込んでいます...")
+
+        def work(cancel):
+            page_total = self.history.page_count(self.page_size)
+            page_number = min(number, page_total)
+            entries = self.history.page(page_number, self.page_size)
+            try:
+                counts = self.differ.counts(entries)
+            except (OSError, ValueError):
+                # 現在の設定ファイルを読み込めない場合は件数を表示しない
+                counts = {}
+            return page_number, page_total, self.history.count(), entries, self.history.previews(entries), counts
+
+        def done(result):
+            self._loading = False
+            self._show_page(*result)
+
+        def failed(error):
+            self._loading = False
+            self.status_var.set(f"エラー: {error}")
+
+        self.tasks.run("履歴の読み込み", work, done, failed)
+
+    def _show_page(self, page_number, page_total, count, entries, previews, counts):
+        """読み込んだページを表示します（メインスレッド上で実行される）"""
+        self.page_number = page_number
+        self.page_total = page_total
+        self.tree.delete(*self.tree.get_children(''))
+        self._entries.clear()
+        for entry in entries:
+            preview = previews.get(entry.id)
+            item = self.tree.insert('', 'end', values=(
+                f"{entry.timestamp:%Y-%m-%d %H:%M:%S}", entry.source, f"{entry.size:,}",
+                f"{counts[entry.id]}件" if entry.id in counts else "-",
+                preview if preview is not None else "(パスなし)"))
+            self._entries[item] = entry
+        self._set_diff_text("")
+        self.page_var.set(f"{page_number}/{page_total}ページ")
+        self.status_var.set(f"{count}件" if entries else "バックアップはありません。")
+
+    def _show_diff(self):
+        """選択中のバックアップと現在の設定ファイルとの違いをワーカースレッドで求めて表示します"""
+        selection = self.tree.selection()
+        if not selection or selection[0] not in self._entries:
+            return
+        entry = self._entries[selection[0]]
+        # 選択が続けて変わった場合は、最後の選択の結果だけを表示する
+        self._diff_request += 1
+        request = self._diff_request
+
+        def work(cancel):
+            return diff.format_changes(self.differ.diff(entry)) or "違いはありません。"
+
+        def done(text):
+            if request == self._diff_request:
+                self._set_diff_text(text)
+
+        def failed(error):
+            if request == self._diff_request:
+                self._set_diff_text(f"比較できませんでした: {error}")
+
+        self.tasks.run("差分の計算", work, done, failed)
+
+    def _set_diff_text(self, text):
+        """差分パネルの内容を置き換えます"""
+        self.diff_text.configure(state=tk.NORMAL)
+        self.diff_text.delete('1.0', tk.END)
+        self.diff_text.insert('1.0', text)
+        self.diff_text.configure(state=tk.DISABLED)
+
+    def _restore(self):
+        """選択中のバックアップを、確認のうえ復元します"""
+        selection = self.tree.selection()
+        if not selection or selection[0] not in self._entries:
+            return
+        entry = self._entries[selection[0]]
+        if not messagebox.askyesno(
+                "確認", f"{entry.timestamp:%Y-%m-%d %H:%M:%S} のバックアップを復元しますか？\n"
+                        "現在の設定ファイルは保存前にバックアップされます。", parent=self.window):
+            return
+        self.close()
+        self.on_restore(entry)
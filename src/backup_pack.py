@@ -0,0 +1,348 @@
+"""
+パック形式のバックアップモジュール。
+設定の履歴を1つのパックファイルに、定期的な完全スナップショット（キーフレーム）と
+その間の構造的な差分（デルタ）として圧縮して保存します。
+
+ファイル構成:
+    backup/config.pack      zlib圧縮されたレコードの連結（追記専用）
+    backup/config.pack.idx  固定長のインデックス（追記専用）
+                            1件 = タイムスタンプ, オフセット, 長さ, キーフレームの番号
+    backup/config.pack.idx.lock
+                            追記をプロセス間で直列化するロックファイル
+
+任意の版はキーフレームから最大 keyframe_interval - 1 件のデルタを適用して復元できます。
+インデックスは固定長のため、時刻による検索は二分探索で行えます。
+"""
+
+import json
+import os
+import struct
+import time
+import zlib
+from collections import namedtuple
+from datetime import datetime
+from pathlib import Path
+
+from .backup_store import _catalog_lock
+
+
+# インデックスの1件: (タイムスタンプ, オフセット, 長さ, キーフレームの番号)
+_INDEX_FORMAT = struct.Struct('<dQIQ')
+
+# キーフレームを作成する間隔（この件数ごとに完全スナップショットを保存する）
+DEFAULT_KEYFRAME_INTERVAL = 32
+
+# パック内の1版
+PackEntry = namedtuple('PackEntry', ['number', 'timestamp', 'keyframe', 'size'])
+
+# 直前の版の内容（デルタ計算用）をパックファイルごとに保持する
+_tail_cache = {}
+
+
+def diff_documents(old, new, path=()):
+    """
+    2つのJSON文書の構造的な差分を求めます。
+
+    Args:
+        old: 変更前の値
+        new: 変更後の値
+        path (tuple): 現在の位置
+
+    Returns:
+        list: 差分の操作のリスト（["set", パス, 値] または ["del", パス]）
+    """
+    if type(old) is dict and type(new) is dict:
+        common = [key for key in new if key in old]
+        # キーの並び順が変わる場合は、適用後の順序を保つため丸ごと置き換える
+        if [key for key in old if key in new] != common or list(new)[:len(common)] != common:
+            return [['set', list(path), new]]
+        ops = [['del', list(path + (key,))] for key in old if key not in new]
+        for key, value in new.items():
+            if key not in old:
+                ops.append(['set', list(path + (key,)), value])
+            elif old[key] != value:
+                ops.extend(diff_documents(old[key], value, path + (key,)))
+        return ops
+
+    if type(old) is list and type(new) is list and len(old) == len(new):
+        ops = []
+        for index, (old_value, new_value) in enumerate(zip(old, new)):
+            if old_value != new_value:
+                ops.extend(diff_documents(old_value, new_value, path + (index,)))
+        return ops
+
+    if old == new and type(old) is type(new):
+        return []
+    return [['set', list(path), new]]
+
+
+def apply_delta(document, ops):
+    """
+    差分の操作を文書に適用します。
+
+    Args:
+        document: 適用先の文書（その場で変更されます）
+        ops (list): diff_documentsが返した操作のリスト
+
+    Returns:
+        適用後の文書
+    """
+    for op in ops:
+        path = op[1]
+        if not path:
+            document = op[2]
+            continue
+        parent = document
+        for key in path[:-1]:
+            parent = parent[key]
+        if op[0] == 'set':
+            parent[path[-1]] = op[2]
+        else:
+            del parent[path[-1]]
+    return document
+
+
+def _to_epoch(at):
+    """datetimeまたは数値のタイムスタンプをエポック秒に変換します"""
+    if at is None:
+        return None
+    if isinstance(at, datetime):
+        return at.timestamp()
+    return float(at)
+
+
+class BackupPack:
+    """キーフレームとデルタで履歴を保存するパックファイル"""
+
+    PACK_FILE = 'config.pack'
+    INDEX_FILE = 'config.pack.idx'
+
+    def __init__(self, backup_dir, keyframe_interval=DEFAULT_KEYFRAME_INTERVAL):
+        """
+        初期化メソッド
+
+        Args:
+            backup_dir (Path): バックアップディレクトリ
+            keyframe_interval (int): キーフレームを作成する間隔
+        """
+        self.backup_dir = Path(backup_dir)
+        self.pack_path = self.backup_dir / self.PACK_FILE
+        self.index_path = self.backup_dir / self.INDEX_FILE
+        self.keyframe_interval = max(1, keyframe_interval)
+        self._lock = _catalog_lock(self.index_path)
+
+    def __len__(self):
+        """保存されている版の数を返します"""
+        try:
+            size = os.path.getsize(self.index_path)
+        except FileNotFoundError:
+            return 0
+        # 書き込み途中で中断された末尾の不完全な行は数えない
+        return size // _INDEX_FORMAT.size
+
+    def append(self, source_path, timestamp=None):
+        """
+        ファイルの内容を新しい版として追加します。
+
+        Args:
+            source_path (Path): バックアップ対象の設定ファイル
+            timestamp (float, optional): 版の時刻（エポック秒）。Noneの場合は現在時刻。
+
+        Returns:
+            PackEntry: 追加された版
+        """
+        with open(source_path, 'r', encoding='utf-8') as file:
+            document = json.load(file)
+        # 読み込んだ文書は他から参照されないため、次回の差分計算用にそのまま保持できる
+        return self._append(document, timestamp, keep_tail=True)
+
+    def append_document(self, document, timestamp=None):
+        """
+        文書を新しい版として追加します。
+
+        Args:
+            document: 設定データ
+            timestamp (float, optional): 版の時刻（エポック秒）。Noneの場合は現在時刻。
+
+        Returns:
+            PackEntry: 追加された版
+        """
+        return self._append(document, timestamp, keep_tail=False)
+
+    def _append(self, document, timestamp, keep_tail):
+        """版を追加します（keep_tailがTrueなら文書を次回の差分計算用に保持する）"""
+        with self._lock:
+            number = len(self)
+            last = self._read_index(number - 1) if number else None
+            if timestamp is None:
+                timestamp = time.time()
+            # 時刻の逆転があっても二分探索できるよう単調増加にそろえる
+            if last is not None:
+                timestamp = max(timestamp, last[0])
+
+            previous = self._tail_document(number) if number else None
+            keyframe_number = last[3] if last is not None else 0
+            is_keyframe = previous is None or number - keyframe_number >= self.keyframe_interval
+            if is_keyframe:
+                payload = {'k': document}
+            else:
+                payload = {'d': diff_documents(previous, document)}
+            record = zlib.compress(json.dumps(payload, separators=(',', ':')).encode('utf-8'))
+            if is_keyframe:
+                keyframe_number = number
+
+            os.makedirs(self.backup_dir, exist_ok=True)
+            with open(self.pack_path, 'ab') as pack:
+                offset = pack.seek(0, os.SEEK_END)
+                pack.write(record)
+            # インデックスは本体の書き込み後に追記する（中断時は本体の末尾が無視されるだけ）
+            with open(self.index_path, 'ab') as index:
+                index.seek(number * _INDEX_FORMAT.size)
+                index.truncate()
+                index.write(_INDEX_FORMAT.pack(timestamp, offset, len(record), keyframe_number))
+
+            if keep_tail:
+                _tail_cache[str(self.index_path)] = (number + 1, document)
+            else:
+                _tail_cache.pop(str(self.index_path), None)
+            return PackEntry(number, timestamp, is_keyframe, len(record))
+
+    def entries(self, start=0, stop=None):
+        """
+        版の一覧を返します。
+
+        Args:
+            start (int): 最初の版の番号
+            stop (int, optional): 最後の版の次の番号
+
+        Returns:
+            list: PackEntryのリスト
+        """
+        count = len(self)
+        start = max(0, start)
+        stop = count if stop is None else min(stop, count)
+        if start >= stop:
+            return []
+        # 範囲のインデックスを1回で読み込む
+        with open(self.index_path, 'rb') as index:
+            index.seek(start * _INDEX_FORMAT.size)
+            data = index.read((stop - start) * _INDEX_FORMAT.size)
+        result = []
+        for number, (timestamp, _, length, keyframe_number) in enumerate(_INDEX_FORMAT.iter_unpack(data), start):
+            result.append(PackEntry(number, timestamp, keyframe_number == number, length))
+        return result
+
+    def find(self, at=None):
+        """
+        指定時刻の時点で最新だった版の番号を求めます。
+
+        Args:
+            at (datetime or float, optional): 時刻。Noneの場合は最新の版。
+
+        Returns:
+            int: 版の番号。該当する版がない場合はNone。
+        """
+        count = len(self)
+        if count == 0:
+            return None
+        at = _to_epoch(at)
+        if at is None:
+            return count - 1
+
+        # タイムスタンプが at 以下の最後の版を二分探索する
+        low, high = 0, count
+        while low < high:
+            middle = (low + high) // 2
+            if self._read_index(middle)[0] <= at:
+                low = middle + 1
+            else:
+                high = middle
+        return low - 1 if low > 0 else None
+
+    def restore(self, at=None):
+        """
+        指定時刻の時点の設定を復元します。
+
+        Args:
+            at (datetime or float, optional): 時刻。Noneの場合は最新の版。
+
+        Returns:
+            dict: 復元された設定データ
+
+        Raises:
+            LookupError: 該当する版が存在しない場合
+        """
+        number = self.find(at)
+        if number is None:
+            raise LookupError("指定した時刻以前のバックアップが存在しません")
+        return self.restore_version(number)
+
+    def restore_version(self, number):
+        """
+        番号を指定して版を復元します。
+
+        Args:
+            number (int): 版の番号
+
+        Returns:
+            dict: 復元された設定データ
+        """
+        keyframe_number = self._read_index(number)[3]
+        records = [self._read_index(n) for n in range(keyframe_number, number + 1)]
+        with open(self.pack_path, 'rb') as pack:
+            document = None
+            for _, offset, length, _ in records:
+                pack.seek(offset)
+                payload = json.loads(zlib.decompress(pack.read(length)))
+                if 'k' in payload:
+                    document = payload['k']
+                else:
+                    document = apply_delta(document, payload['d'])
+        return document
+
+    def iter_versions(self, start, stop):
+        """
+        連続した版を古い順に復元します。
+
+        最初の版のキーフレームから1回だけ差分をたどるため、版ごとにrestore_versionを
+        呼ぶよりも高速です。返される文書は次の版の復元でその場で変更されるため、
+        必要な値は次の版を取り出す前に取り出してください。
+
+        Args:
+            start (int): 最初の版の番号
+            stop (int): 最後の版の次の番号
+
+        Yields:
+            tuple: (版の番号, 設定データ)
+        """
+        stop = min(stop, len(self))
+        if start >= stop:
+            return
+        keyframe_number = self._read_index(start)[3]
+        with open(self.index_path, 'rb') as index:
+            index.seek(keyframe_number * _INDEX_FORMAT.size)
+            data = index.read((stop - keyframe_number) * _INDEX_FORMAT.size)
+        with open(self.pack_path, 'rb') as pack:
+            document = None
+            for number, (_, offset, length, _) in enumerate(_INDEX_FORMAT.iter_unpack(data), keyframe_number):
+                pack.seek(offset)
+                payload = json.loads(zlib.decompress(pack.read(length)))
+                if 'k' in payload:
+                    document = payload['k']
+                else:
+                    document = apply_delta(document, payload['d'])
+                if number >= start:
+                    yield number, document
+
+    def _read_index(self, number):
+        """インデックスからnumber番目の版の情報を読み込みます"""
+        with open(self.index_path, 'rb') as index:
+            index.seek(number * _INDEX_FORMAT.size)
+            return _INDEX_FORMAT.unpack(index.read(_INDEX_FORMAT.size))
+
+    def _tail_document(self, count):
+        """最新の版の内容を返します（同じプロセスで直前に追加した版はキャッシュを使う）"""
+        cached = _tail_cache.get(str(self.index_path))
+        if cached is not None and cached[0] == count:
+            return cached[1]
+        return self.restore_version(count - 1)
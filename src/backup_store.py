@@ -0,0 +1,524 @@
+"""
+バックアップストアモジュール。
+設定ファイルのスナップショットを内容のハッシュで管理し、同一内容の重複保存を防ぎます。
+
+ディレクトリ構成:
+    backup/
+        objects/ab/abcdef....json   内容ハッシュ（SHA-256）をキーにしたスナップショット本体
+        index.jsonl                 追記専用のカタログ（バックアップID → ハッシュ、および削除記録）
+        index.jsonl.lock            カタログの追記・整理をプロセス間で直列化するロックファイル
+        claude_desktop_config_backup_<ID>.json
+                                    本体へのハードリンク（エクスプローラーからの参照用）
+        legacy_import.json          ストア導入前のバックアップを取り込み済みであることの記録
+
+ストア導入前の版が作成したバックアップ（claude_desktop_config_backup_<YYYYMMDDHHMMSS>.json の
+独立したファイル）は、import_legacy() で一度だけカタログに取り込み、そのファイルを本体への
+ハードリンクとして残します。
+"""
+
+import hashlib
+import json
+import os
+import stat
+import sys
+import threading
+from collections import namedtuple
+from datetime import datetime
+from pathlib import Path
+
+
+# インデックスの1エントリ
+BackupEntry = namedtuple('BackupEntry', ['id', 'digest', 'size'])
+
+# Linuxのreflink用ioctl番号（FICLONE）
+_FICLONE = 0x40049409
+
+# カタログ末尾を逆順に読む際のブロックサイズ
+_TAIL_BLOCK_SIZE = 4096
+
+# ロックファイルの拡張子
+LOCK_SUFFIX = '.lock'
+
+# カタログごとのロック（追記とコンパクションを直列化する）
+_catalog_locks = {}
+_catalog_locks_guard = threading.Lock()
+
+
+def _lock_file(file):
+    """ファイルの排他ロックを取得します（取得できるまで待つ）"""
+    if sys.platform == 'win32':
+        import msvcrt
+        file.seek(0)
+        while True:
+            try:
+                # LK_LOCKは約10秒で諦めて例外を送出するため、取得できるまで繰り返す
+                msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                continue
+    import fcntl
+    fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+
+
+def _unlock_file(file):
+    """ファイルの排他ロックを解放します"""
+    if sys.platform == 'win32':
+        import msvcrt
+        file.seek(0)
+        msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+        return
+    import fcntl
+    fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+
+
+class _CatalogLock:
+    """
+    カタログの書き込みをスレッド間とプロセス間で直列化するロック
+
+    デーモン・GUI・CLIが同じバックアップディレクトリに同時に書き込めるよう、プロセス内の
+    ロックに加えて、カタログの隣のロックファイル（<カタログ名>.lock）をOSのファイルロックで
+    ロックします。カタログ自体は整理の際に置き換えられるため、ロックには使いません。
+    """
+
+    def __init__(self, index_path):
+        """
+        初期化メソッド
+
+        Args:
+            index_path (Path): カタログファイルのパス
+        """
+        self.path = Path(str(index_path) + LOCK_SUFFIX)
+        self._thread_lock = threading.Lock()
+        self._file = None
+
+    def __enter__(self):
+        self._thread_lock.acquire()
+        try:
+            os.makedirs(self.path.parent, exist_ok=True)
+            self._file = open(self.path, 'a+b')
+            try:
+                _lock_file(self._file)
+            except BaseException:
+                self._file.close()
+                raise
+        except BaseException:
+            self._thread_lock.release()
+            raise
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            _unlock_file(self._file)
+        finally:
+            self._file.close()
+            self._file = None
+            self._thread_lock.release()
+        return False
+
+
+def _catalog_lock(index_path):
+    """カタログファイルに対応するロックを返します"""
+    key = os.path.normcase(os.path.abspath(index_path))
+    with _catalog_locks_guard:
+        if key not in _catalog_locks:
+            _catalog_locks[key] = _CatalogLock(index_path)
+        return _catalog_locks[key]
+
+
+def entry_time(entry):
+    """
+    バックアップIDの先頭（YYYYMMDDHHMMSS、続けてマイクロ秒の6桁があればそれも）から作成日時を求めます。
+
+    Args:
+        entry (BackupEntry): エントリ
+
+    Returns:
+        datetime: 作成日時。IDが日時形式でない場合はNone。
+    """
+    try:
+        if len(entry.id) >= 20 and entry.id[:20].isdigit():
+            return datetime.strptime(entry.id[:20], '%Y%m%d%H%M%S%f')
+        return datetime.strptime(entry.id[:14], '%Y%m%d%H%M%S')
+    except ValueError:
+        return None
+
+
+def _remove_file(path):
+    """読み取り専用属性を外してからファイルを削除します（存在しない場合は無視）"""
+    try:
+        os.chmod(path, stat.S_IWRITE | stat.S_IREAD)
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _clone_file(source_path, target_path):
+    """
+    対応するファイルシステム上でreflink（コピーオンライト複製）を作成します。
+
+    Args:
+        source_path (Path): 複製元のパス
+        target_path (Path): 複製先のパス
+
+    Returns:
+        bool: reflinkを作成できたかどうか
+    """
+    if not sys.platform.startswith('linux'):
+        return False
+    try:
+        import fcntl
+        with open(source_path, 'rb') as src, open(target_path, 'wb') as dst:
+            fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+        return True
+    except (ImportError, OSError):
+        return False
+
+
+class BackupStore:
+    """内容アドレス方式のバックアップストア"""
+
+    OBJECTS_DIR = 'objects'
+    INDEX_FILE = 'index.jsonl'
+    SNAPSHOT_PREFIX = 'claude_desktop_config_backup_'
+    LEGACY_MARKER = 'legacy_import.json'
+
+    def __init__(self, backup_dir, link_snapshots=True):
+        """
+        初期化メソッド
+
+        Args:
+            backup_dir (Path): バックアップディレクトリ
+            link_snapshots (bool): バックアップごとに本体へのハードリンクを作成するかどうか
+        """
+        self.backup_dir = Path(backup_dir)
+        self.objects_dir = self.backup_dir / self.OBJECTS_DIR
+        self.index_path = self.backup_dir / self.INDEX_FILE
+        self.link_snapshots = link_snapshots
+        self._lock = _catalog_lock(self.index_path)
+
+    def blob_path(self, digest):
+        """
+        ハッシュ値に対応するスナップショット本体のパスを返します。
+
+        Args:
+            digest (str): 内容のSHA-256ハッシュ（16進数）
+
+        Returns:
+            Path: スナップショット本体のパス
+        """
+        return self.objects_dir / digest[:2] / f'{digest}.json'
+
+    def snapshot_path(self, backup_id):
+        """
+        バックアップIDに対応するハードリンクのパスを返します。
+
+        Args:
+            backup_id (str): バックアップID
+
+        Returns:
+            Path: ハードリンクのパス
+        """
+        return self.backup_dir / f'{self.SNAPSHOT_PREFIX}{backup_id}.json'
+
+    def put(self, source_path, backup_id):
+        """
+        ファイルの内容をストアに追加し、インデックスに記録します。
+
+        同じ内容の本体が既に存在する場合は書き込みを行いません。
+
+        Args:
+            source_path (Path): バックアップ対象のファイル
+            backup_id (str): バックアップID
+
+        Returns:
+            BackupEntry: 追加されたエントリ
+        """
+        with open(source_path, 'rb') as file:
+            data = file.read()
+        digest = hashlib.sha256(data).hexdigest()
+
+        blob = self.blob_path(digest)
+        entry = BackupEntry(backup_id, digest, len(data))
+        with self._lock:
+            if not blob.exists():
+                self._write_blob(source_path, data, blob)
+            self._append_index(entry)
+
+        # 別プロセスの整理処理と競合して本体が消えた場合は作り直す
+        if not blob.exists():
+            self._write_blob(source_path, data, blob)
+
+        if self.link_snapshots:
+            self._link_snapshot(blob, self.snapshot_path(backup_id))
+
+        return entry
+
+    def import_legacy(self):
+        """
+        ストア導入前のバックアップをカタログに取り込みます。
+
+        バックアップディレクトリ直下の claude_desktop_config_backup_<YYYYMMDDHHMMSS>.json のうち
+        カタログにないものを、ファイル名の日時をIDとして登録します。ファイルはそのまま
+        本体へのハードリンクとして残ります（同じ内容の本体が既にあれば、そのリンクに置き換えます）。
+        取り込みは一度だけ行い、完了を記録したファイルがあれば何もしません。
+
+        Returns:
+            int: 取り込んだバックアップの数
+        """
+        marker = self.backup_dir / self.LEGACY_MARKER
+        if marker.exists() or not self.backup_dir.is_dir():
+            return 0
+
+        with self._lock:
+            if marker.exists():
+                return 0
+            known = {entry.id for entry in self.entries()}
+            imported = []
+            for path in sorted(self.backup_dir.glob(f'{self.SNAPSHOT_PREFIX}*.json')):
+                backup_id = path.name[len(self.SNAPSHOT_PREFIX):-len('.json')]
+                if len(backup_id) != 14 or not backup_id.isdigit() or backup_id in known:
+                    continue
+                try:
+                    imported.append(self._adopt(path, backup_id))
+                except OSError:
+                    # 読めないファイルは取り込まずに残す
+                    continue
+            if imported:
+                with open(self.index_path, 'a', encoding='utf-8') as file:
+                    for entry in imported:
+                        file.write(json.dumps({'id': entry.id, 'hash': entry.digest, 'size': entry.size}) + '\n')
+            with open(marker, 'w', encoding='utf-8') as file:
+                json.dump({'imported': len(imported)}, file)
+        return len(imported)
+
+    def _adopt(self, path, backup_id):
+        """既存のバックアップファイルを本体として登録します（カタログへの記録は呼び出し元が行う）"""
+        with open(path, 'rb') as file:
+            data = file.read()
+        digest = hashlib.sha256(data).hexdigest()
+        blob = self.blob_path(digest)
+        if not blob.exists():
+            os.makedirs(blob.parent, exist_ok=True)
+            try:
+                os.link(path, blob)
+                os.chmod(blob, stat.S_IREAD | stat.S_IRGRP | stat.S_IROTH)
+            except OSError:
+                # ハードリンク非対応の環境では複製する
+                self._write_blob(path, data, blob)
+        elif self.link_snapshots and not os.path.samefile(blob, path):
+            # 同じ内容の本体へのリンクに置き換えて、重複した内容を1つにまとめる
+            temp_path = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+            try:
+                os.link(blob, temp_path)
+                os.replace(temp_path, path)
+            except OSError:
+                if temp_path.exists():
+                    os.remove(temp_path)
+        return BackupEntry(backup_id, digest, len(data))
+
+    def read(self, digest):
+        """
+        スナップショット本体の内容を読み込みます。
+
+        Args:
+            digest (str): 内容のハッシュ値
+
+        Returns:
+            bytes: スナップショットの内容
+
+        Raises:
+            FileNotFoundError: 本体が存在しない場合
+        """
+        with open(self.blob_path(digest), 'rb') as file:
+            return file.read()
+
+    def entries(self):
+        """
+        カタログに記録された有効なエントリを古い順に返します。
+
+        ディレクトリは走査せず、カタログのみを読み込みます。
+
+        Returns:
+            list: BackupEntryのリスト
+        """
+        live = {}
+        for record in self._read_records():
+            if record.get('op') == 'drop':
+                live.pop(record['id'], None)
+            else:
+                live[record['id']] = BackupEntry(record['id'], record['hash'], record['size'])
+        return list(live.values())
+
+    def latest(self):
+        """
+        最新の有効なエントリを返します。
+
+        カタログの末尾から逆順に読むため、履歴の件数によらず一定時間で完了します。
+
+        Returns:
+            BackupEntry: 最新のエントリ。バックアップがない場合はNone。
+        """
+        dropped = set()
+        for record in self._read_records_reversed():
+            if record.get('op') == 'drop':
+                dropped.add(record['id'])
+            elif record['id'] not in dropped:
+                return BackupEntry(record['id'], record['hash'], record['size'])
+        return None
+
+    def drop(self, backup_ids):
+        """
+        エントリを削除し、参照されなくなった本体とハードリンクを取り除きます。
+
+        削除はまずカタログに追記されるため、途中で中断してもカタログの整合性は保たれます
+        （ファイルの削除が済んでいない本体がディスク上に残るだけです）。
+
+        Args:
+            backup_ids (iterable): 削除するバックアップIDのリスト
+
+        Returns:
+            int: 削除した本体の合計バイト数
+        """
+        backup_ids = set(backup_ids)
+        if not backup_ids:
+            return 0
+
+        with self._lock:
+            entries = self.entries()
+            removed = [entry for entry in entries if entry.id in backup_ids]
+            if not removed:
+                return 0
+            with open(self.index_path, 'a', encoding='utf-8') as file:
+                for entry in removed:
+                    file.write(json.dumps({'op': 'drop', 'id': entry.id}) + '\n')
+
+            live_digests = {entry.digest for entry in entries if entry.id not in backup_ids}
+            freed_digests = set()
+            freed = 0
+            for entry in removed:
+                _remove_file(self.snapshot_path(entry.id))
+                blob = self.blob_path(entry.digest)
+                if entry.digest in live_digests:
+                    # 同じ本体を指すリンクの削除で外れた読み取り専用属性を戻す
+                    if blob.exists():
+                        os.chmod(blob, stat.S_IREAD | stat.S_IRGRP | stat.S_IROTH)
+                elif entry.digest not in freed_digests:
+                    freed_digests.add(entry.digest)
+                    if blob.exists():
+                        _remove_file(blob)
+                        freed += entry.size
+
+            self._compact_if_needed(len(entries) - len(removed))
+        return freed
+
+    def _read_records(self):
+        """カタログのレコードを先頭から順に返します"""
+        if not self.index_path.exists():
+            return
+        with open(self.index_path, 'r', encoding='utf-8') as file:
+            for line in file:
+                record = self._parse_record(line)
+                if record is not None:
+                    yield record
+
+    def _read_records_reversed(self):
+        """カタログのレコードを末尾から逆順に返します"""
+        try:
+            file = open(self.index_path, 'rb')
+        except FileNotFoundError:
+            return
+        with file:
+            file.seek(0, os.SEEK_END)
+            position = file.tell()
+            remainder = b''
+            while position > 0:
+                size = min(_TAIL_BLOCK_SIZE, position)
+                position -= size
+                file.seek(position)
+                lines = (file.read(size) + remainder).split(b'\n')
+                # 先頭の行はブロック境界で切れている可能性があるため次回に持ち越す
+                remainder = lines.pop(0)
+                for line in reversed(lines):
+                    record = self._parse_record(line)
+                    if record is not None:
+                        yield record
+            record = self._parse_record(remainder)
+            if record is not None:
+                yield record
+
+    @staticmethod
+    def _parse_record(line):
+        """カタログの1行を解析します（空行や書き込み途中の行はNone）"""
+        if isinstance(line, bytes):
+            line = line.decode('utf-8', errors='replace')
+        line = line.strip()
+        if not line:
+            return None
+        try:
+            return json.loads(line)
+        except json.JSONDecodeError:
+            return None
+
+    def _compact_if_needed(self, live_count):
+        """削除記録が有効なエントリより多くなったらカタログを書き直します"""
+        try:
+            total_lines = sum(1 for _ in open(self.index_path, 'rb'))
+        except FileNotFoundError:
+            return
+        if total_lines <= max(2 * live_count, 64):
+            return
+
+        temp_path = self.index_path.with_name(f'{self.INDEX_FILE}.{os.getpid()}.tmp')
+        with open(self.index_path, 'rb') as source:
+            snapshot = source.read()
+        live = {}
+        for line in snapshot.split(b'\n'):
+            record = self._parse_record(line)
+            if record is None:
+                continue
+            if record.get('op') == 'drop':
+                live.pop(record['id'], None)
+            else:
+                live[record['id']] = record
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            for record in live.values():
+                file.write(json.dumps(record) + '\n')
+            # 読み込み後に別プロセスが追記した行を引き継ぐ
+            with open(self.index_path, 'rb') as source:
+                source.seek(len(snapshot))
+                file.write(source.read().decode('utf-8', errors='replace'))
+        os.replace(temp_path, self.index_path)
+
+    def _write_blob(self, source_path, data, blob):
+        """本体を一時ファイル経由で作成します（可能ならreflinkを使用）"""
+        os.makedirs(blob.parent, exist_ok=True)
+        temp_path = blob.with_name(f'{blob.name}.{os.getpid()}.tmp')
+        try:
+            # reflinkできた場合でも、ハッシュ計算後に内容が変わっていないか確認する
+            if not (_clone_file(source_path, temp_path) and temp_path.read_bytes() == data):
+                with open(temp_path, 'wb') as file:
+                    file.write(data)
+            os.chmod(temp_path, stat.S_IREAD | stat.S_IRGRP | stat.S_IROTH)
+            os.replace(temp_path, blob)
+        finally:
+            if temp_path.exists():
+                os.chmod(temp_path, stat.S_IWRITE | stat.S_IREAD)
+                os.remove(temp_path)
+
+    def _append_index(self, entry):
+        """インデックスに1行追記します"""
+        os.makedirs(self.backup_dir, exist_ok=True)
+        line = json.dumps({'id': entry.id, 'hash': entry.digest, 'size': entry.size})
+        with open(self.index_path, 'a', encoding='utf-8') as file:
+            file.write(line + '\n')
+
+    @staticmethod
+    def _link_snapshot(blob, snapshot):
+        """本体へのハードリンクを作成します（非対応のファイルシステムでは作成しない）"""
+        try:
+            os.link(blob, snapshot)
+        except FileExistsError:
+            pass
+        except OSError:
+            # FATなどハードリンク非対応の環境では、インデックスからのみ参照する
+            pass
@@ -0,0 +1,196 @@
+"""
+バッチ処理モジュール。
+複数の設定ファイルに対するパス変更を、GUIを使わずに並列で実行します。
+"""
+
+import glob
+import os
+import time
+from collections import namedtuple
+
+from . import config
+from . import tracing
+
+
+# 1ファイル分の処理結果（written: 内容が変わり書き込みを行ったか）
+BatchResult = namedtuple('BatchResult', ['path', 'ok', 'old_path', 'error', 'written'],
+                         defaults=(False,))
+
+# バッチ全体の集計結果（unchanged: 内容が変わらず書き込みを省略した件数）
+BatchSummary = namedtuple('BatchSummary', ['total', 'succeeded', 'failed', 'elapsed', 'unchanged'],
+                          defaults=(0,))
+
+
+def expand_paths(patterns):
+    """
+    パスまたはglobパターンのリストを設定ファイルのパスのリストに展開します。
+
+    Args:
+        patterns (list): パスまたはglobパターン（`**` による再帰指定も可）
+
+    Returns:
+        list: 重複を除いたパスのリスト（指定順を維持）
+    """
+    paths = []
+    seen = set()
+    for pattern in patterns:
+        if glob.has_magic(pattern):
+            matches = sorted(glob.glob(pattern, recursive=True))
+        else:
+            # パターンでない場合は存在しなくてもそのまま渡し、結果にエラーとして報告する
+            matches = [pattern]
+        for match in matches:
+            key = os.path.normcase(os.path.abspath(match))
+            if key not in seen:
+                seen.add(key)
+                paths.append(match)
+    return paths
+
+
+def apply_path(config_path, new_path, backup=True, backup_mode=None):
+    """
+    1つの設定ファイルに対して読み込み→パス変更→保存を行います。
+
+    例外は呼び出し元に送出せず、結果オブジェクトに格納して返します。
+
+    Args:
+        config_path (str): 設定ファイルのパス
+        new_path (str): 新しいパス
+        backup (bool): 保存前にバックアップを作成するかどうか
+        backup_mode (str, optional): バックアップ形式
+
+    Returns:
+        BatchResult: 処理結果
+    """
+    try:
+        config_data = config.load_config(config_path)
+        errors = config.structure_errors(config_data)
+        if errors:
+            raise ValueError("設定ファイルの形式が正しくありません: "
+                             + "; ".join(f"{e.pointer}: {e.message}" for e in errors))
+        old_path = config.get_mcp_path(config_data)
+        config.set_mcp_path(config_data, new_path)
+        result = config.save_config(config_data, config_path, backup=backup, backup_mode=backup_mode)
+        return BatchResult(str(config_path), True, old_path, None, result.written)
+    except Exception as e:
+        return BatchResult(str(config_path), False, None, f"{type(e).__name__}: {e}")
+
+
+def _apply_chunk(config_paths, new_path, backup, backup_mode, profile=False):
+    """
+    ワーカープロセス内でファイルのまとまりを処理します。
+
+    Returns:
+        tuple: (BatchResultのリスト, 処理時間の集計。profileがFalseの場合はNone)
+    """
+    if not profile:
+        return [apply_path(path, new_path, backup, backup_mode) for path in config_paths], None
+    tracing.start_worker()
+    results = [apply_path(path, new_path, backup, backup_mode) for path in config_paths]
+    return results, tracing.stats()
+
+
+def _chunk_size(total, workers):
+    """プロセス間通信の回数を抑えつつ、結果が逐次返るようにチャンクサイズを決めます"""
+    return max(1, min(64, total // (workers * 8)))
+
+
+def run_batch(config_paths, new_path, workers=None, backup=True, backup_mode=None):
+    """
+    複数の設定ファイルにパス変更を適用し、完了した順に結果を返します。
+
+    Args:
+        config_paths (list): 設定ファイルのパスのリスト
+        new_path (str): 新しいパス
+        workers (int, optional): ワーカープロセス数。Noneの場合はCPU数。1の場合は逐次実行。
+        backup (bool): 保存前にバックアップを作成するかどうか
+        backup_mode (str, optional): バックアップ形式
+
+    Yields:
+        BatchResult: 各ファイルの処理結果（完了順）
+    """
+    config_paths = list(config_paths)
+    if not config_paths:
+        return
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(config_paths)))
+
+    if workers == 1:
+        for path in config_paths:
+            yield apply_path(path, new_path, backup, backup_mode)
+        return
+
+    # プロセスプールはvalidateなどの他のサブコマンドの起動時間に影響しないよう、ここで読み込む
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    size = _chunk_size(len(config_paths), workers)
+    chunks = [config_paths[i:i + size] for i in range(0, len(config_paths), size)]
+    # 計測中はワーカーの処理時間も集計して親プロセスの内訳に加える
+    profile = tracing.is_enabled()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_apply_chunk, chunk, new_path, backup, backup_mode, profile)
+                   for chunk in chunks]
+        for future in as_completed(futures):
+            results, collected = future.result()
+            if collected:
+                tracing.merge(collected)
+            for result in results:
+                yield result
+
+
+def summarize(results, elapsed):
+    """
+    処理結果を集計します。
+
+    Args:
+        results (list): BatchResultのリスト
+        elapsed (float): 経過時間（秒）
+
+    Returns:
+        BatchSummary: 集計結果
+    """
+    succeeded = sum(1 for result in results if result.ok)
+    unchanged = sum(1 for result in results if result.ok and not result.written)
+    return BatchSummary(len(results), succeeded, len(results) - succeeded, elapsed, unchanged)
+
+
+def format_summary(summary):
+    """
+    集計結果をスループット付きの文字列に整形します。
+
+    Args:
+        summary (BatchSummary): 集計結果
+
+    Returns:
+        str: 表示用の文字列
+    """
+    rate = summary.total / summary.elapsed if summary.elapsed > 0 else 0.0
+    return (f"処理: {summary.total}件  成功: {summary.succeeded}件（うち変更なし: {summary.unchanged}件）  "
+            f"失敗: {summary.failed}件  経過: {summary.elapsed:.2f}秒  ({rate:.1f}件/秒)")
+
+
+def timed_batch(config_paths, new_path, workers=None, backup=True, backup_mode=None, on_result=None):
+    """
+    バッチを実行し、結果ごとにコールバックを呼び出した上で集計結果を返します。
+
+    Args:
+        config_paths (list): 設定ファイルのパスのリスト
+        new_path (str): 新しいパス
+        workers (int, optional): ワーカープロセス数
+        backup (bool): 保存前にバックアップを作成するかどうか
+        backup_mode (str, optional): バックアップ形式
+        on_result (callable, optional): 結果ごとに呼び出される関数
+
+    Returns:
+        BatchSummary: 集計結果
+    """
+    start = time.perf_counter()
+    results = []
+    for result in run_batch(config_paths, new_path, workers=workers, backup=backup,
+                            backup_mode=backup_mode):
+        results.append(result)
+        if on_result is not None:
+            on_result(result)
+    return summarize(results, time.perf_counter() - start)
@@ -0,0 +1,288 @@
+"""
+コマンドラインモジュール。
+GUIを起動せずに実行するサブコマンドの処理を提供します。
+
+起動時間を短く保つため、各サブコマンドが使うモジュールはそのサブコマンドの関数の中で読み込みます。
+"""
+
+import os
+import sys
+import time
+
+
+def run_batch_command(args):
+    """
+    batchサブコマンドを実行します。
+
+    Args:
+        args (argparse.Namespace): 解析された引数
+
+    Returns:
+        int: 終了コード（全件成功なら0、失敗があれば1）
+    """
+    from . import batch
+
+    config_paths = batch.expand_paths(args.files)
+    if not config_paths:
+        print("対象の設定ファイルが見つかりません。", file=sys.stderr)
+        return 1
+
+    def report(result):
+        if result.ok and not result.written:
+            print(f"--  {result.path}  (変更なし)", flush=True)
+        elif result.ok:
+            print(f"OK  {result.path}  ({result.old_path} -> {args.path})", flush=True)
+        else:
+            print(f"NG  {result.path}  {result.error}", flush=True)
+
+    summary = batch.timed_batch(
+        config_paths,
+        args.path,
+        workers=args.workers,
+        backup=not args.no_backup,
+        backup_mode=args.backup_mode,
+        on_result=report,
+    )
+    print(batch.format_summary(summary))
+    return 0 if summary.failed == 0 else 1
+
+
+def run_validate_command(args):
+    """
+    validateサブコマンドを実行します。各ファイルのすべての違反を表示します。
+
+    Args:
+        args (argparse.Namespace): 解析された引数
+
+    Returns:
+        int: 終了コード（全件有効なら0、無効なファイルがあれば1）
+    """
+    from . import batch
+    from . import config
+    from . import schema
+
+    config_paths = batch.expand_paths(args.files)
+    if not config_paths:
+        print("対象の設定ファイルが見つかりません。", file=sys.stderr)
+        return 1
+
+    invalid = 0
+    start = time.perf_counter()
+    for config_path in config_paths:
+        try:
+            errors = config.config_errors(config.load_config(config_path, use_cache=False))
+        except Exception as e:
+            errors = [schema.Violation('', f"{type(e).__name__}: {e}")]
+        if not errors:
+            print(f"OK  {config_path}", flush=True)
+            continue
+        invalid += 1
+        print(f"NG  {config_path}", flush=True)
+        for line in schema.format_violations(errors).splitlines():
+            print(f"    {line}")
+    elapsed = time.perf_counter() - start
+
+    total = len(config_paths)
+    rate = total / elapsed if elapsed > 0 else 0.0
+    print(f"検証: {total}件  有効: {total - invalid}件  無効: {invalid}件  "
+          f"経過: {elapsed:.2f}秒 ({rate:.1f}件/秒)")
+    return 0 if invalid == 0 else 1
+
+
+def run_txn_command(args):
+    """
+    txnサブコマンドを実行します。すべてのファイルのパスを変更するか、1つも変更しません。
+
+    Args:
+        args (argparse.Namespace): 解析された引数
+
+    Returns:
+        int: 終了コード（すべて変更できれば0、失敗してどのファイルも変更しなかった場合は1）
+    """
+    from . import batch
+    from . import transaction
+
+    config_paths = batch.expand_paths(args.files)
+    if not config_paths:
+        print("対象の設定ファイルが見つかりません。", file=sys.stderr)
+        return 1
+
+    try:
+        result = transaction.apply_path(config_paths, args.path, workers=args.workers,
+                                        backup=not args.no_backup, backup_mode=args.backup_mode)
+    except transaction.TransactionError as e:
+        for path, error in e.failures:
+            print(f"NG  {path}  {error}", flush=True)
+        if e.rolled_back:
+            print(f"確定に失敗したため、{len(e.rolled_back)}件を元の内容に戻しました。")
+        print("どのファイルも変更していません。")
+        return 1
+
+    for path in result.committed:
+        print(f"OK  {path}  (-> {args.path})")
+    for path in result.unchanged:
+        print(f"--  {path}  (変更なし)")
+    print(f"準備: {len(config_paths)}件（変更あり {len(result.committed)}件、変更なし {len(result.unchanged)}件）  "
+          f"経過: {result.prepare_time * 1000:.1f} ms")
+    print(f"確定: {len(result.committed)}件  経過: {result.commit_time * 1000:.2f} ms")
+    return 0
+
+
+def _history_for(args):
+    """引数で指定された（または既定の）設定ファイルのバックアップ履歴を返します"""
+    from . import config
+    from . import history
+
+    config_path = args.config or config.get_default_config_path()
+    return config_path, history.BackupHistory(config_path)
+
+
+def run_list_backups_command(args):
+    """
+    --list-backupsを実行します。バックアップを新しい順にページ単位で表示します。
+
+    Args:
+        args (argparse.Namespace): 解析された引数
+
+    Returns:
+        int: 終了コード（ページが範囲外なら1）
+    """
+    config_path, backup_history = _history_for(args)
+    page_size = max(1, args.page_size)
+    pages = backup_history.page_count(page_size)
+    total = backup_history.count()
+    if args.page < 1 or args.page > pages:
+        print(f"ページは1から{pages}の範囲で指定してください。", file=sys.stderr)
+        return 1
+
+    print(f"バックアップ: {total}件（{args.page}/{pages}ページ）  {config_path}")
+    entries = backup_history.page(args.page, page_size)
+    previews = backup_history.previews(entries)
+    for entry in entries:
+        preview = previews[entry.id]
+        print(f"{entry.id:<22}  {entry.timestamp:%Y-%m-%d %H:%M:%S}  {entry.source:<5}  "
+              f"{entry.size:>9,}  {preview if preview is not None else '(パスなし)'}")
+    return 0
+
+
+def run_restore_command(args):
+    """
+    --restoreを実行します。指定したバックアップの内容をsave_configで書き戻します。
+
+    書き戻す前の設定ファイルは、通常の保存と同じようにバックアップされます（--no-backupを除く）。
+
+    Args:
+        args (argparse.Namespace): 解析された引数
+
+    Returns:
+        int: 終了コード（バックアップが見つからない・書き込めない場合は1）
+    """
+    from . import config
+
+    config_path, backup_history = _history_for(args)
+    entry = backup_history.find(args.restore)
+    if entry is None:
+        print(f"バックアップが見つかりません: {args.restore}", file=sys.stderr)
+        return 1
+
+    try:
+        document = backup_history.load(entry)
+        result = config.save_config(document, config_path, backup=not args.no_backup,
+                                    backup_mode=args.backup_mode)
+    except (OSError, ValueError) as e:
+        print(f"復元できませんでした: {e}", file=sys.stderr)
+        return 1
+
+    if not result.written:
+        print(f"現在の内容がバックアップ {entry.id} と同じため、書き込みを省略しました。")
+    else:
+        print(f"バックアップ {entry.id}（{entry.timestamp:%Y-%m-%d %H:%M:%S}）を復元しました: {config_path}")
+    return 0
+
+
+def _diff_side(differ, backup_history, ref):
+    """バックアップIDまたはファイルのパスから、ハッシュ木と表示名を返します"""
+    from . import config
+    from . import diff
+
+    entry = backup_history.find(ref)
+    if entry is not None:
+        return differ.tree(entry), f"{entry.id}（{entry.timestamp:%Y-%m-%d %H:%M:%S}）"
+    if os.path.isfile(ref):
+        return diff.build_tree(config.load_config(ref, use_cache=False)), ref
+    raise LookupError(f"バックアップまたはファイルが見つかりません: {ref}")
+
+
+def run_diff_command(args):
+    """
+    --diffを実行します。
+
+    IDを1つ指定した場合はそのバックアップから現在の設定ファイルへの違い、
+    2つ指定した場合は1つ目から2つ目への違いを表示します。IDの代わりにファイルのパスも指定できます。
+
+    Args:
+        args (argparse.Namespace): 解析された引数
+
+    Returns:
+        int: 終了コード（バックアップが見つからない・読み込めない場合は1）
+    """
+    from . import diff
+
+    if len(args.diff) > 2:
+        print("--diffに指定できるのは2つまでです。", file=sys.stderr)
+        return 1
+
+    config_path, backup_history = _history_for(args)
+    differ = diff.BackupDiffer(backup_history)
+    try:
+        old_tree, old_label = _diff_side(differ, backup_history, args.diff[0])
+        if len(args.diff) == 2:
+            new_tree, new_label = _diff_side(differ, backup_history, args.diff[1])
+        else:
+            new_tree, new_label = differ.current_tree(), f"現在の設定ファイル（{config_path}）"
+    except (LookupError, OSError, ValueError) as e:
+        print(f"比較できませんでした: {e}", file=sys.stderr)
+        return 1
+
+    changes = diff.diff_trees(old_tree, new_tree)
+    print(f"--- {old_label}")
+    print(f"+++ {new_label}")
+    if changes:
+        print(diff.format_changes(changes))
+    kinds = [change.kind for change in changes]
+    print(f"違い: {len(changes)}件（追加 {kinds.count('added')}、削除 {kinds.count('removed')}、"
+          f"変更 {kinds.count('changed')}）")
+    return 0
+
+
+def run_verify_command(args):
+    """
+    verify-backupsサブコマンドを実行します。
+
+    バックアップディレクトリを指定しない場合は、設定ファイルのバックアップディレクトリを検証します。
+
+    Args:
+        args (argparse.Namespace): 解析された引数
+
+    Returns:
+        int: 終了コード（問題が見つかった・ディレクトリがない場合は1）
+    """
+    from . import config
+    from . import history
+    from . import verify
+
+    backup_dirs = args.dirs or [history.BackupHistory(args.config or config.get_default_config_path()).backup_dir]
+    failed = False
+    for backup_dir in backup_dirs:
+        print(f"{backup_dir}", flush=True)
+        try:
+            report = verify.verify_backups(
+                backup_dir, full=args.full, workers=args.workers,
+                on_problem=lambda path, message: print(f"NG  {path}  {message}", flush=True))
+        except OSError as e:
+            print(f"検証できませんでした: {e}", file=sys.stderr)
+            failed = True
+            continue
+        print(verify.format_report(report))
+        failed = failed or bool(report.problems)
+    return 1 if failed else 0
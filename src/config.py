@@ -5,45 +5,56 @@ JSON設定ファイルの読み込み、解析、書き込みを担当します
 
 import json
 import os
-import shutil
-from pathlib import Path
+from collections import namedtuple
 from datetime import datetime
+from pathlib import Path
+
+from . import locator
+from . import parse_cache
+from . import schema
+from . import selector
+from . import tracing
+from . import utils
+# lazyjson・roundtrip・retention・backup_pack・backup_store は、validateなど保存やバックアップを
+# 行わないサブコマンドの起動時間に影響しないよう、使う関数の中で読み込む
+
+
+# バックアップ形式
+BACKUP_MODE_STORE = 'store'  # 内容アドレス方式（スナップショットごとに1ファイル）
+BACKUP_MODE_PACK = 'pack'    # パック形式（キーフレームと差分を1ファイルに圧縮）
+
+# backup_modeが指定されない場合に使うバックアップ形式
+DEFAULT_BACKUP_MODE = BACKUP_MODE_STORE
+
+# save_configの結果（written: 書き込みを行ったか, bytes_written: 書き込んだバイト数）
+SaveResult = namedtuple('SaveResult', ['written', 'bytes_written'])
 
 
+@tracing.traced
 def get_default_config_path():
     """
     デフォルトの設定ファイルパスを取得します。
     
+    候補パスの存在確認はlocator.default_locatorがキャッシュするため、
+    繰り返し呼び出してもファイルシステムへの問い合わせは有効期限ごとに1回です。
+    
     Returns:
         Path: デフォルトの設定ファイルパス
     """
-    # デフォルトの場所を調べる（Windowsの場合）
-    app_data = os.environ.get('APPDATA', '')
-    # ユーザーのホームディレクトリを取得
-    home_dir = os.path.expanduser('~')
-    
-    # 候補パスのリスト
-    paths = [
-        Path(app_data) / 'Claude' / 'claude_desktop_config.json',  # 新しいパス形式
-        Path(app_data) / 'Claude Desktop' / 'claude_desktop_config.json',  # 以前の形式
-        Path(home_dir) / 'AppData' / 'Roaming' / 'Claude' / 'claude_desktop_config.json',  # 明示的なパス
-    ]
-    
-    # 最初に存在するパスを返す
-    for path in paths:
-        if path.exists():
-            return path
-    
-    # デフォルトとして最初のパスを返す
-    return paths[0]
+    return locator.default_locator.resolve()
 
 
-def load_config(config_path=None):
+@tracing.traced
+def load_config(config_path=None, use_cache=True):
     """
     設定ファイルを読み込みます。
     
+    既定では解析結果をキャッシュし、ファイルが変更されていなければ再解析を省略します
+    （返される値は毎回複製されるため、変更しても構いません）。
+    
     Args:
         config_path (Path, optional): 設定ファイルのパス。Noneの場合はデフォルトパスを使用。
+        use_cache (bool, optional): 解析結果のキャッシュを使うかどうか
     
     Returns:
         dict: 設定データ
@@ -55,22 +66,35 @@ def load_config(config_path=None):
     if config_path is None:
         config_path = get_default_config_path()
     
+    if use_cache:
+        return parse_cache.default_cache.load(config_path)
+    
     with open(config_path, 'r') as file:
         config = json.load(file)
     
     return config
 
 
-def save_config(config, config_path=None):
+@tracing.traced
+def save_config(config, config_path=None, backup=True, backup_mode=None, preserve_format=True):
     """
     設定ファイルを保存します。
     
     Args:
         config (dict): 保存する設定データ
         config_path (Path, optional): 設定ファイルのパス。Noneの場合はデフォルトパスを使用。
+        backup (bool, optional): 保存前にバックアップを作成するかどうか
+        backup_mode (str, optional): バックアップ形式。Noneの場合はDEFAULT_BACKUP_MODE。
+        preserve_format (bool, optional): 既存ファイルの書式を保ち、変更された値だけを書き換えるかどうか
+    
+    preserve_formatがTrueの場合、既存ファイルのインデント・キーの順序・改行コードは
+    変更されません。書式を保てない場合（ファイルが存在しない場合など）は全体を整形して書き込みます。
+    ディスク上の内容と同一の場合は、バックアップも書き込みも行いません。
+    書き込みは一時ファイルを経由して置き換えるため、途中で中断しても設定ファイルが
+    壊れることはありません。
     
     Returns:
-        bool: 保存が成功したかどうか
+        SaveResult: 書き込みを行ったかどうかと書き込んだバイト数
         
     Raises:
         PermissionError: ファイルへの書き込み権限がない場合
@@ -78,42 +102,158 @@ def save_config(config, config_path=None):
     if config_path is None:
         config_path = get_default_config_path()
     
+    data = render_config(config, config_path, preserve_format)
+    
+    # 内容が変わらない場合は何もしない
+    if utils.file_content_equals(config_path, data):
+        return SaveResult(False, 0)
+    
     # バックアップを作成
-    backup_config(config_path)
+    if backup:
+        backup_config(config_path, mode=backup_mode)
+    
+    utils.atomic_write_bytes(config_path, data)
+    # ファイルが新しく作成された場合に備えて、存在確認のキャッシュを破棄する
+    locator.default_locator.invalidate(config_path)
+    
+    return SaveResult(True, len(data))
+
+
+def render_config(config, config_path, preserve_format=True):
+    """
+    設定データを、設定ファイルに書き込むバイト列に変換します。
     
-    with open(config_path, 'w') as file:
-        json.dump(config, file, indent=4)
+    Args:
+        config (dict): 設定データ
+        config_path (Path): 設定ファイルのパス（書式を保つ場合は既存の内容を参照する）
+        preserve_format (bool, optional): 既存ファイルの書式を保つかどうか
     
-    return True
+    Returns:
+        bytes: 書き込む内容。書式を保てない場合は全体を整形した内容（改行はOSの形式）。
+    """
+    from . import roundtrip
+    
+    with tracing.span('render'):
+        data = roundtrip.render(config_path, config) if preserve_format else None
+    if data is None:
+        with tracing.span('serialize'):
+            # 従来のテキストモードでの書き込みと同じバイト列（改行はOSの形式）を作る
+            text = json.dumps(config, indent=4)
+            data = text.replace('\n', os.linesep).encode('utf-8')
+    return data
 
 
-def backup_config(config_path):
+@tracing.traced
+def backup_config(config_path, mode=None):
     """
     設定ファイルのバックアップを作成します。
     
+    既定の形式では、バックアップは内容のハッシュで管理され、同じ内容のスナップショットは
+    1つにまとめられます。パック形式では、直前の版との差分のみが圧縮して追記されます。
+    
     Args:
         config_path (Path): 設定ファイルのパス
+        mode (str, optional): バックアップ形式（BACKUP_MODE_STORE / BACKUP_MODE_PACK）。
+            Noneの場合はDEFAULT_BACKUP_MODE。
     
     Returns:
         Path: バックアップファイルのパス
+    
+    Raises:
+        ValueError: 不明なバックアップ形式が指定された場合
     """
     if not os.path.exists(config_path):
         return None
     
+    from . import retention
+    from .backup_pack import BackupPack
+    from .backup_store import BackupStore
+    
+    mode = mode or DEFAULT_BACKUP_MODE
+    if mode not in (BACKUP_MODE_STORE, BACKUP_MODE_PACK):
+        raise ValueError(f"不明なバックアップ形式です: {mode}")
+    
     # バックアップディレクトリ
+    backup_dir = utils.create_backup_dir(Path(config_path).parent)
+    
+    if mode == BACKUP_MODE_PACK:
+        try:
+            with tracing.span('pack_append'):
+                BackupPack(backup_dir).append(config_path)
+            return backup_dir / BackupPack.PACK_FILE
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            # JSONとして解析できない内容は差分を取れないため、通常のバックアップに残す
+            pass
+    
+    store = BackupStore(backup_dir)
+    
+    # 作成順に並ぶ重複しないIDでストアに追加（同じ秒の保存でも上書きされない）
+    backup_id = utils.new_backup_id()
+    with tracing.span('store_put'):
+        entry = store.put(config_path, backup_id)
+    
+    # 古いバックアップの整理を予約（保存処理は待たない）
+    retention.schedule_prune(backup_dir)
+    
+    snapshot = store.snapshot_path(backup_id)
+    if snapshot.exists():
+        return snapshot
+    return store.blob_path(entry.digest)
+
+
+@tracing.traced
+def restore_config(config_path=None, at=None):
+    """
+    バックアップから指定時刻の時点の設定を復元します。
+    
+    パック形式と通常形式のバックアップのうち、指定時刻以前で最も新しい版を返します。
+    ファイルへの書き込みは行いません（書き戻す場合はsave_configを使用します）。
+    
+    Args:
+        config_path (Path, optional): 設定ファイルのパス。Noneの場合はデフォルトパスを使用。
+        at (datetime or float, optional): 時刻（datetimeまたはエポック秒）。Noneの場合は最新。
+    
+    Returns:
+        dict: 復元された設定データ
+    
+    Raises:
+        LookupError: 指定時刻以前のバックアップが存在しない場合
+    """
+    if config_path is None:
+        config_path = get_default_config_path()
+    
+    from .backup_pack import BackupPack
+    from .backup_store import BackupStore, entry_time
+    
     backup_dir = Path(config_path).parent / 'backup'
-    os.makedirs(backup_dir, exist_ok=True)
+    if isinstance(at, datetime):
+        at = at.timestamp()
     
-    # タイムスタンプ付きのバックアップファイル名
-    timestamp = datetime.now().strftime('%Y%m%d%H%M%S')
-    backup_file = backup_dir / f'claude_desktop_config_backup_{timestamp}.json'
+    # パック形式の候補
+    pack = BackupPack(backup_dir)
+    pack_number = pack.find(at)
+    pack_time = pack.entries(pack_number, pack_number + 1)[0].timestamp if pack_number is not None else None
     
-    # バックアップをコピー
-    shutil.copy2(config_path, backup_file)
+    # 通常形式の候補（カタログから指定時刻以前の最新エントリを探す）
+    store = BackupStore(backup_dir)
+    store_entry = None
+    store_time = None
+    for entry in store.entries():
+        moment = entry_time(entry)
+        if moment is None:
+            continue
+        moment = moment.timestamp()
+        if (at is None or moment <= at) and (store_time is None or moment >= store_time):
+            store_entry, store_time = entry, moment
     
-    return backup_file
+    if pack_time is None and store_time is None:
+        raise LookupError("指定した時刻以前のバックアップが存在しません")
+    if store_time is None or (pack_time is not None and pack_time >= store_time):
+        return pack.restore_version(pack_number)
+    return json.loads(store.read(store_entry.digest))
 
 
+@tracing.traced
 def get_mcp_path(config):
     """
     mcpServers.filesystem.argsの最後の要素（パス）を取得します。
@@ -137,6 +277,36 @@ def get_mcp_path(config):
         raise KeyError("設定ファイルに必要なキーが存在しません")
 
 
+@tracing.traced
+def read_mcp_path(config_path=None):
+    """
+    設定ファイル全体を解析せずに、mcpServers.filesystem.argsの最後の要素（パス）を読み込みます。
+    
+    多数の大きな設定ファイルからパスだけを読み取る場合に使います。
+    
+    Args:
+        config_path (Path, optional): 設定ファイルのパス。Noneの場合はデフォルトパスを使用。
+    
+    Returns:
+        str: 現在設定されているパス
+        
+    Raises:
+        FileNotFoundError: 設定ファイルが見つからない場合
+        json.JSONDecodeError: JSONの解析エラーがある場合
+        KeyError: 必要なキーが存在しない場合
+    """
+    if config_path is None:
+        config_path = get_default_config_path()
+    
+    from . import lazyjson
+    
+    try:
+        return lazyjson.extract(config_path, ['mcpServers', 'filesystem', 'args', -1])
+    except (KeyError, IndexError):
+        raise KeyError("設定ファイルに必要なキーが存在しません")
+
+
+@tracing.traced
 def set_mcp_path(config, new_path):
     """
     mcpServers.filesystem.argsの最後の要素（パス）を変更します。
@@ -164,29 +334,77 @@ def set_mcp_path(config, new_path):
         raise KeyError("設定ファイルに必要なキーが存在しません")
 
 
+@tracing.traced
+def edit_config(edits, config_path=None, backup=True, backup_mode=None):
+    """
+    セレクタで指定した複数の値を、1回の読み込みと1回の保存で変更します。
+    
+    Args:
+        edits (dict or iterable): セレクタ（例: 'mcpServers.*.args[-1]'）と新しい値の組
+        config_path (Path, optional): 設定ファイルのパス。Noneの場合はデフォルトパスを使用。
+        backup (bool): バックアップを作成するかどうか
+        backup_mode (str, optional): バックアップ形式。Noneの場合はDEFAULT_BACKUP_MODE。
+    
+    Returns:
+        SaveResult: 書き込みの結果（変更がなければwrittenはFalse）
+        
+    Raises:
+        FileNotFoundError: 設定ファイルが見つからない場合
+        json.JSONDecodeError: JSONの解析エラーがある場合
+        KeyError: 変更先の経路が存在しない場合
+        ValueError: セレクタが不正な場合、または変更後の設定が無効な場合
+    """
+    if config_path is None:
+        config_path = get_default_config_path()
+    
+    config = load_config(config_path)
+    if selector.apply_edits(config, edits) == 0:
+        return SaveResult(False, 0)
+    if not validate_config(config):
+        raise ValueError("変更後の設定が無効です")
+    return save_config(config, config_path, backup=backup, backup_mode=backup_mode)
+
+
+@tracing.traced
 def validate_config(config):
     """
     設定が必要な構造を持っているか検証します。
     
+    検査するのはエディタが使う mcpServers.filesystem.args（空でない配列）だけです。
+    他のサーバーの内容まで検査するには config_errors() を使います。
+    
     Args:
         config (dict): 設定データ
     
     Returns:
         bool: 有効な設定かどうか
     """
-    try:
-        # 必要なキーが存在するか確認
-        if 'mcpServers' not in config:
-            return False
-        if 'filesystem' not in config['mcpServers']:
-            return False
-        if 'args' not in config['mcpServers']['filesystem']:
-            return False
-        if not isinstance(config['mcpServers']['filesystem']['args'], list):
-            return False
-        if len(config['mcpServers']['filesystem']['args']) < 1:
-            return False
-        
-        return True
-    except Exception:
-        return False
+    return schema.structure_validator.is_valid(config)
+
+
+@tracing.traced
+def structure_errors(config):
+    """
+    validate_config() が検査する構造の違反を返します。
+    
+    Args:
+        config (dict): 設定データ
+    
+    Returns:
+        list: schema.Violation（JSONポインタと内容）のリスト。有効な場合は空。
+    """
+    return schema.structure_validator.errors(config)
+
+
+@tracing.traced
+def config_errors(config):
+    """
+    設定のすべての違反を返します。
+    
+    Args:
+        config (dict): 設定データ
+    
+    Returns:
+        list: schema.Violation（JSONポインタと内容）のリスト。有効な場合は空。
+    """
+    return schema.config_validator.errors(config)
@@ -0,0 +1,301 @@
+"""
+設定デーモンモジュール。
+常駐して設定ファイルの解析結果を保持し、ローカルソケット（Windowsでは名前付きパイプ）で
+値の読み取り（get）・変更（set）・検証（validate）の依頼に答えます。
+
+解析結果は ParseCache に保持し、依頼のたびにファイルの状態（更新時刻・サイズ・inode）を
+確認するため、外部で変更されたファイルは次の依頼で読み込み直されます。検証の結果も、
+解析結果が同じである間は再利用します。接続ごとにスレッドを1つ使い、1つの接続で
+続けて依頼できます。プロトコルとクライアントは daemon_client.py にあります。
+"""
+
+import json
+import os
+import socket
+import stat
+import sys
+import threading
+import time
+
+from . import config
+from . import parse_cache
+from . import selector
+from .daemon_client import (DEFAULT_SELECTOR, DaemonError, SocketConnection, check_owner, connect, default_address,
+                            is_pipe_address)
+
+
+class ConfigService:
+    """デーモンへの依頼を処理するサービス（通信を含まない）"""
+
+    def __init__(self, cache=None, backup=True, backup_mode=None):
+        """
+        初期化メソッド
+
+        Args:
+            cache (ParseCache, optional): 解析結果のキャッシュ。Noneの場合はこのサービス専用のキャッシュ。
+            backup (bool): setで保存する前にバックアップを作成するかどうか
+            backup_mode (str, optional): バックアップ形式
+        """
+        self.cache = cache or parse_cache.ParseCache()
+        self.backup = backup
+        self.backup_mode = backup_mode
+        self.started = time.time()
+        self.requests = 0
+        # ファイルごとの (検証した解析結果, 違反のリスト)
+        self._validated = {}
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._handlers = {
+            'get': self._get,
+            'set': self._set,
+            'validate': self._validate,
+            'ping': self._ping,
+            'stats': self._stats,
+        }
+
+    def handle(self, request):
+        """
+        依頼を処理します。
+
+        Args:
+            request (dict): 依頼（opと処理ごとの引数）
+
+        Returns:
+            dict: 応答（成功した場合は {'ok': True, 'value': 結果}、
+                失敗した場合は {'ok': False, 'error': 内容}）
+        """
+        with self._lock:
+            self.requests += 1
+        handler = self._handlers.get(request.get('op'))
+        if handler is None:
+            return {'ok': False, 'error': f"不明な処理です: {request.get('op')}"}
+        try:
+            return {'ok': True, 'value': handler(request)}
+        except Exception as e:
+            return {'ok': False, 'error': f"{type(e).__name__}: {e}"}
+
+    def _config_path(self, request):
+        return request.get('config') or str(config.get_default_config_path())
+
+    def _get(self, request):
+        """セレクタで指定した値を返します（ワイルドカードを含む場合は値のリスト）"""
+        document = self.cache.load_shared(self._config_path(request))
+        compiled = selector.compile_selector(request.get('selector') or DEFAULT_SELECTOR)
+        if compiled.has_wildcard:
+            return [match.value for match in compiled.select(document)]
+        return compiled.get(document)
+
+    def _set(self, request):
+        """値を変更して保存します"""
+        config_path = self._config_path(request)
+        # 同じファイルへの変更が互いに上書きしないよう、読み込みから保存までを1つずつ行う
+        with self._write_lock:
+            document = self.cache.load(config_path)
+            if request.get('edits') is not None:
+                selector.apply_edits(document, request['edits'])
+            else:
+                config.set_mcp_path(document, request['path'])
+            if not config.validate_config(document):
+                raise ValueError("変更後の設定が無効です: " + "; ".join(
+                    f"{violation.pointer or '/'} {violation.message}" for violation in config.structure_errors(document)))
+            result = config.save_config(document, config_path, backup=self.backup, backup_mode=self.backup_mode)
+            self.cache.invalidate(config_path)
+        return {'written': result.written, 'bytes': result.bytes_written}
+
+    def _validate(self, request):
+        """違反のリストを返します"""
+        config_path = os.path.realpath(self._config_path(request))
+        document = self.cache.load_shared(config_path)
+        cached = self._validated.get(config_path)
+        if cached is not None and cached[0] is document:
+            return cached[1]
+        violations = [{'pointer': violation.pointer, 'message': violation.message}
+                      for violation in config.config_errors(document)]
+        self._validated[config_path] = (document, violations)
+        return violations
+
+    def _ping(self, request):
+        return {'pid': os.getpid(), 'uptime': time.time() - self.started}
+
+    def _stats(self, request):
+        return {'requests': self.requests, 'files': len(self.cache),
+                'cache_hits': self.cache.hits, 'cache_misses': self.cache.misses}
+
+
+def _prepare_directory(directory):
+    """
+    ソケットファイルを置くディレクトリを用意します。
+
+    存在しない場合は所有者だけがアクセスできる権限で作成します。既定のアドレスのディレクトリ
+    （一時ディレクトリ内のユーザーごとのディレクトリ）は、他のユーザーが作成したものや
+    他のユーザーが書き込めるものであれば使いません。
+    """
+    try:
+        os.mkdir(directory, 0o700)
+    except FileExistsError:
+        pass
+    if os.path.abspath(directory) != os.path.dirname(os.path.abspath(default_address())):
+        return
+    stat_result = os.lstat(directory)
+    if (not stat.S_ISDIR(stat_result.st_mode) or stat_result.st_uid != os.getuid()
+            or stat_result.st_mode & 0o077):
+        raise DaemonError(f"ソケットのディレクトリが他のユーザーに作成されたか、所有者以外もアクセスできます（{directory}）")
+
+
+class _SocketListener:
+    """Unixドメインソケットの待ち受け"""
+
+    def __init__(self, address):
+        _prepare_directory(os.path.dirname(address) or '.')
+        if os.path.lexists(address):
+            # 他のユーザーが先に作成したソケットは使わず、削除もしない
+            try:
+                check_owner(address)
+            except PermissionError as e:
+                raise DaemonError(str(e)) from e
+            # 前回のデーモンが残したソケットファイルは削除する（応答する場合は起動中）
+            try:
+                connect(address).close()
+            except OSError:
+                os.remove(address)
+            else:
+                raise DaemonError(f"デーモンは既に起動しています（{address}）")
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        # 他のユーザーが接続できないよう、所有者だけが読み書きできるソケットファイルを作る
+        previous_umask = os.umask(0o177)
+        try:
+            self._sock.bind(address)
+        finally:
+            os.umask(previous_umask)
+        self._sock.listen(64)
+        self.address = address
+
+    def accept(self):
+        sock, _ = self._sock.accept()
+        return SocketConnection(sock)
+
+    def close(self):
+        self._sock.close()
+        try:
+            os.remove(self.address)
+        except FileNotFoundError:
+            pass
+
+
+def _listen(address):
+    """アドレスの種類に応じて待ち受けを始めます"""
+    if is_pipe_address(address):
+        from multiprocessing.connection import Listener
+        return Listener(address, family='AF_PIPE')
+    return _SocketListener(address)
+
+
+class ConfigDaemon:
+    """設定デーモン"""
+
+    def __init__(self, address=None, service=None):
+        """
+        初期化メソッド
+
+        Args:
+            address (str, optional): 待ち受けアドレス。Noneの場合はdefault_address()。
+            service (ConfigService, optional): 依頼を処理するサービス
+        """
+        self.address = address or default_address()
+        self.service = service or ConfigService()
+        self._stopping = threading.Event()
+        self._listener = None
+
+    def listen(self):
+        """
+        待ち受けを始めます。
+
+        Raises:
+            DaemonError: 同じアドレスでデーモンが既に起動している場合
+        """
+        if self._listener is None:
+            self._listener = _listen(self.address)
+
+    def serve_forever(self):
+        """
+        shutdown()が呼ばれるまで依頼を処理します。
+
+        Raises:
+            DaemonError: 同じアドレスでデーモンが既に起動している場合
+        """
+        self.listen()
+        try:
+            while not self._stopping.is_set():
+                try:
+                    connection = self._listener.accept()
+                except OSError:
+                    if self._stopping.is_set():
+                        break
+                    raise
+                if self._stopping.is_set():
+                    connection.close()
+                    break
+                threading.Thread(target=self._serve_connection, args=(connection,), daemon=True).start()
+        finally:
+            self._listener.close()
+
+    def shutdown(self):
+        """待ち受けを終了します"""
+        self._stopping.set()
+        # accept()で待っているスレッドを起こすため、自分に接続する
+        try:
+            connect(self.address).close()
+        except OSError:
+            pass
+
+    def _serve_connection(self, connection):
+        """1つの接続の依頼を、接続が閉じられるまで処理します"""
+        try:
+            while True:
+                try:
+                    data = connection.recv_bytes()
+                except (EOFError, OSError):
+                    break
+                try:
+                    request = json.loads(data)
+                except ValueError as e:
+                    response = {'ok': False, 'error': f"依頼を解析できません: {e}"}
+                    request = {}
+                else:
+                    if request.get('op') == 'shutdown':
+                        response = {'ok': True, 'value': None}
+                    else:
+                        response = self.service.handle(request)
+                connection.send_bytes(json.dumps(response, ensure_ascii=False).encode('utf-8'))
+                if request.get('op') == 'shutdown':
+                    self.shutdown()
+                    break
+        except OSError:
+            pass
+        finally:
+            connection.close()
+
+
+def run_daemon_command(args):
+    """
+    daemonサブコマンドを実行します。停止の依頼（client stop）かCtrl+Cで終了します。
+
+    Args:
+        args (argparse.Namespace): 解析された引数
+
+    Returns:
+        int: 終了コード（既に起動している場合は1）
+    """
+    service = ConfigService(backup=not args.no_backup, backup_mode=args.backup_mode)
+    daemon = ConfigDaemon(args.socket, service)
+    try:
+        daemon.listen()
+    except DaemonError as e:
+        print(e, file=sys.stderr)
+        return 1
+    print(f"待ち受けています: {daemon.address}", file=sys.stderr, flush=True)
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
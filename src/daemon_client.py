@@ -0,0 +1,328 @@
+"""
+設定デーモンのクライアントモジュール。
+常駐している設定デーモン（daemon.py）にローカルソケット（Windowsでは名前付きパイプ）で
+接続し、設定ファイルの値の読み取り・変更・検証を依頼します。
+
+スクリプトから1回だけ呼び出される場合の起動を速くするため、このモジュールは設定処理の
+モジュールを読み込みません。メッセージは4バイトの長さ（ビッグエンディアン）に続くJSONです。
+"""
+
+import json
+import os
+import socket
+import stat
+import struct
+import sys
+
+
+# Windowsの名前付きパイプの接頭辞
+PIPE_PREFIX = '\\\\.\\pipe\\'
+
+# ソケット・パイプの名前
+SOCKET_NAME = 'claude-config-editor'
+
+# getで値の位置を省略した場合のセレクタ（filesystemのパス）
+DEFAULT_SELECTOR = 'mcpServers.filesystem.args[-1]'
+
+# メッセージの長さのヘッダー
+_HEADER = struct.Struct('!I')
+
+
+class DaemonError(Exception):
+    """デーモンに接続できない場合、またはデーモンが処理に失敗した場合の例外"""
+
+
+def default_address():
+    """
+    デーモンの既定の待ち受けアドレスを返します。
+
+    Returns:
+        str: Windowsでは名前付きパイプの名前、それ以外ではソケットファイルのパス
+            （XDG_RUNTIME_DIR、なければ一時ディレクトリのユーザーごとのディレクトリ内。
+            ディレクトリはデーモンが所有者だけがアクセスできる権限で作成する）
+    """
+    if sys.platform == 'win32':
+        return PIPE_PREFIX + f"{SOCKET_NAME}-{os.environ.get('USERNAME', 'user')}"
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime_dir:
+        return os.path.join(runtime_dir, f'{SOCKET_NAME}.sock')
+    import tempfile
+    return os.path.join(tempfile.gettempdir(), f'{SOCKET_NAME}-{os.getuid()}', 'daemon.sock')
+
+
+def check_owner(address):
+    """
+    ソケットファイルが現在のユーザーのものか確認します。
+
+    共有の一時ディレクトリでは、他のユーザーが先に同じ名前のソケットを作成して依頼を
+    盗み見たり偽の値を返したりできるため、接続する前に所有者を確認します。
+
+    Args:
+        address (str): ソケットファイルのパス
+
+    Raises:
+        FileNotFoundError: ソケットファイルが存在しない場合
+        PermissionError: ソケットではない場合、または他のユーザーが所有している場合
+    """
+    stat_result = os.lstat(address)
+    if not stat.S_ISSOCK(stat_result.st_mode):
+        raise PermissionError(f"ソケットではありません: {address}")
+    if stat_result.st_uid != os.getuid():
+        raise PermissionError(f"他のユーザーが作成したソケットです: {address}")
+
+
+def _check_peer(sock, address):
+    """接続先のプロセスが現在のユーザーのものか確認します（SO_PEERCREDに対応するOSのみ）"""
+    if not hasattr(socket, 'SO_PEERCRED'):
+        return
+    # struct ucred { pid_t pid; uid_t uid; gid_t gid; }
+    _, uid, _ = struct.unpack('3i', sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize('3i')))
+    if uid != os.getuid():
+        raise PermissionError(f"他のユーザーのプロセスが待ち受けています: {address}")
+
+
+def is_pipe_address(address):
+    """アドレスが名前付きパイプかどうかを返します"""
+    return address.startswith(PIPE_PREFIX)
+
+
+class SocketConnection:
+    """長さつきのメッセージを送受信するUnixドメインソケットの接続"""
+
+    def __init__(self, sock):
+        """
+        初期化メソッド
+
+        Args:
+            sock (socket.socket): 接続済みのソケット
+        """
+        self._sock = sock
+        self._reader = sock.makefile('rb')
+
+    def send_bytes(self, data):
+        """メッセージを送信します"""
+        self._sock.sendall(_HEADER.pack(len(data)) + data)
+
+    def recv_bytes(self):
+        """
+        メッセージを受信します。
+
+        Returns:
+            bytes: 受信したメッセージ
+
+        Raises:
+            EOFError: 相手が接続を閉じた場合
+        """
+        header = self._reader.read(_HEADER.size)
+        if len(header) < _HEADER.size:
+            raise EOFError
+        size, = _HEADER.unpack(header)
+        data = self._reader.read(size)
+        if len(data) < size:
+            raise EOFError
+        return data
+
+    def close(self):
+        """接続を閉じます"""
+        self._reader.close()
+        self._sock.close()
+
+
+def connect(address):
+    """
+    デーモンに接続します。
+
+    Args:
+        address (str): 待ち受けアドレス
+
+    Returns:
+        SocketConnection or multiprocessing.connection.Connection: send_bytes/recv_bytesを持つ接続
+
+    Raises:
+        OSError: 接続できない場合
+        PermissionError: ソケットまたは待ち受けているプロセスが他のユーザーのものである場合
+    """
+    if is_pipe_address(address):
+        from multiprocessing.connection import Client
+        return Client(address, family='AF_PIPE')
+    check_owner(address)
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(address)
+        _check_peer(sock, address)
+    except OSError:
+        sock.close()
+        raise
+    return SocketConnection(sock)
+
+
+class DaemonClient:
+    """
+    設定デーモンのクライアント
+
+    1つの接続を使い回すため、続けて依頼する場合も接続は1回です。
+    スレッド間で共有せず、スレッドごとに作成してください。
+    """
+
+    def __init__(self, address=None):
+        """
+        初期化メソッド
+
+        Args:
+            address (str, optional): 待ち受けアドレス。Noneの場合はdefault_address()。
+
+        Raises:
+            DaemonError: デーモンに接続できない場合
+        """
+        self.address = address or default_address()
+        try:
+            self._connection = connect(self.address)
+        except OSError as e:
+            raise DaemonError(f"デーモンに接続できません（{self.address}）: {e}") from e
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    def close(self):
+        """接続を閉じます"""
+        self._connection.close()
+
+    def request(self, op, **fields):
+        """
+        デーモンに処理を依頼します。
+
+        Args:
+            op (str): 処理の名前（get, set, validate, ping, stats, shutdown）
+            **fields: 処理ごとの引数
+
+        Returns:
+            処理の結果（JSONの値）
+
+        Raises:
+            DaemonError: 接続が切れた場合、またはデーモンが処理に失敗した場合
+        """
+        message = dict(fields, op=op)
+        try:
+            self._connection.send_bytes(json.dumps(message, ensure_ascii=False).encode('utf-8'))
+            response = json.loads(self._connection.recv_bytes())
+        except (OSError, EOFError) as e:
+            raise DaemonError(f"デーモンとの接続が切れました: {e}") from e
+        if not response.get('ok'):
+            raise DaemonError(response.get('error', "デーモンが処理に失敗しました"))
+        return response.get('value')
+
+    def get(self, config_path=None, selector=DEFAULT_SELECTOR):
+        """
+        セレクタで指定した値を返します。
+
+        Args:
+            config_path (str, optional): 設定ファイルのパス。Noneの場合はデーモン側の既定のパス。
+            selector (str): セレクタ（ワイルドカードを含む場合は一致したすべての値のリストを返す）
+
+        Returns:
+            値
+        """
+        return self.request('get', config=_absolute(config_path), selector=selector)
+
+    def set_mcp_path(self, new_path, config_path=None):
+        """
+        filesystemのパスを変更して保存します。
+
+        Args:
+            new_path (str): 新しいパス
+            config_path (str, optional): 設定ファイルのパス
+
+        Returns:
+            bool: 書き込んだかどうか（内容が変わらない場合はFalse）
+        """
+        return self.request('set', config=_absolute(config_path), path=new_path)['written']
+
+    def apply_edits(self, edits, config_path=None):
+        """
+        セレクタで指定した値を変更して保存します。
+
+        Args:
+            edits (dict): セレクタと新しい値の組
+            config_path (str, optional): 設定ファイルのパス
+
+        Returns:
+            bool: 書き込んだかどうか
+        """
+        return self.request('set', config=_absolute(config_path), edits=edits)['written']
+
+    def validate(self, config_path=None):
+        """
+        設定ファイルを検証します。
+
+        Args:
+            config_path (str, optional): 設定ファイルのパス
+
+        Returns:
+            list: 違反（pointerとmessageを持つ辞書）のリスト。有効な場合は空。
+        """
+        return self.request('validate', config=_absolute(config_path))
+
+    def ping(self):
+        """デーモンの状態（プロセスIDと起動からの秒数）を返します"""
+        return self.request('ping')
+
+    def stats(self):
+        """デーモンの統計（処理件数とキャッシュのヒット数など）を返します"""
+        return self.request('stats')
+
+    def shutdown(self):
+        """デーモンを停止します"""
+        return self.request('shutdown')
+
+
+def _absolute(config_path):
+    """デーモンとカレントディレクトリが異なっても同じファイルを指すよう、絶対パスにします"""
+    return None if config_path is None else os.path.abspath(config_path)
+
+
+def run_client_command(args):
+    """
+    clientサブコマンドを実行します。
+
+    Args:
+        args (argparse.Namespace): 解析された引数
+
+    Returns:
+        int: 終了コード（デーモンに接続できない・処理に失敗した・検証で違反があった場合は1）
+    """
+    try:
+        with DaemonClient(args.socket) as client:
+            if args.action == 'get':
+                value = client.get(args.config, args.selector or DEFAULT_SELECTOR)
+                print(value if isinstance(value, str) else json.dumps(value, ensure_ascii=False))
+            elif args.action == 'set':
+                if args.value is None:
+                    print("setには--valueが必要です。", file=sys.stderr)
+                    return 1
+                if args.selector:
+                    written = client.apply_edits({args.selector: args.value}, args.config)
+                else:
+                    written = client.set_mcp_path(args.value, args.config)
+                print("保存しました。" if written else "内容が変わらないため、書き込みを省略しました。")
+            elif args.action == 'validate':
+                violations = client.validate(args.config)
+                for violation in violations:
+                    print(f"{violation['pointer'] or '/'}: {violation['message']}")
+                print("NG" if violations else "OK")
+                return 1 if violations else 0
+            elif args.action == 'stats':
+                print(json.dumps(client.stats(), ensure_ascii=False))
+            elif args.action == 'stop':
+                client.shutdown()
+                print("デーモンを停止しました。")
+            else:
+                status = client.ping()
+                print(f"起動中（PID {status['pid']}、{status['uptime']:.0f}秒）")
+    except DaemonError as e:
+        print(e, file=sys.stderr)
+        return 1
+    return 0
@@ -0,0 +1,361 @@
+"""
+構造的な差分モジュール。
+2つの設定データの違いを、値の経路（セレクタと同じ書式）ごとの追加・削除・変更として求めます。
+
+各オブジェクト・配列（サーバーごとの設定やargsのリストなど）のハッシュを下から順に計算した
+ハッシュ木を作り、ハッシュが等しい部分木は中を見ずに読み飛ばします。配列は要素のハッシュの
+並びを比べるため、途中への挿入や削除も、それ以降の要素すべての変更にはなりません。
+オブジェクトのキーの順序だけが違う場合は同じ値として扱います。
+
+バックアップの内容は変わらないため、BackupDiffer はバックアップごとのハッシュ木を
+キャッシュし、現在の設定ファイルのハッシュ木はファイルが変更されるまで再利用します。
+"""
+
+import copy
+import difflib
+import hashlib
+import json
+import os
+from collections import OrderedDict, namedtuple
+
+from . import history
+from . import parse_cache
+
+
+# 差分の1件（kind: 'added', 'removed', 'changed' のいずれか, path: キー・インデックスの列）
+Change = namedtuple('Change', ['kind', 'path', 'old', 'new'])
+
+# ハッシュの長さ（バイト）
+DIGEST_SIZE = 16
+
+# BackupDifferがキャッシュするハッシュ木の数の既定値
+DEFAULT_CACHE_SIZE = 512
+
+# 表示する値の最大の長さ
+_VALUE_WIDTH = 80
+
+# 経路の表示でそのまま書けるキー（それ以外は ["key"] と書く）
+_PLAIN_KEY_CHARS = frozenset('.[]"')
+
+_MARKS = {'added': '+', 'removed': '-', 'changed': '~'}
+
+# 子の部分木を作る型
+_CONTAINERS = (dict, list)
+
+
+class Node:
+    """オブジェクトまたは配列の部分木"""
+
+    __slots__ = ('digest', 'value', 'children')
+
+    def __init__(self, digest, value, children):
+        """
+        初期化メソッド（build_treeを使って作成してください）
+
+        Args:
+            digest (bytes): 部分木のハッシュ
+            value (dict or list): 元の値
+            children (dict or list): 子の部分木（Node）またはスカラー値のトークン（bytes）。
+                子がすべてスカラー値の場合は、差分を求めるまでNone。
+        """
+        self.digest = digest
+        self.value = value
+        self.children = children
+
+
+def _scalar_token(value):
+    """スカラー値を、型と値が同じときだけ等しくなるバイト列にします"""
+    if value is None:
+        return b'n'
+    if value is True:
+        return b't'
+    if value is False:
+        return b'f'
+    if type(value) is str:
+        return b's' + value.encode('utf-8', 'surrogatepass')
+    if type(value) is int:
+        return b'i%d' % value
+    return b'r' + repr(value).encode('ascii')
+
+
+def _token(item):
+    """部分木またはスカラー値のトークンから、比較に使うバイト列を返します"""
+    return item.digest if type(item) is Node else item
+
+
+def build_tree(value):
+    """
+    JSONの値のハッシュ木を作ります。
+
+    子にオブジェクト・配列を含まないオブジェクト・配列（argsのリストやenvなど）は、
+    JSONの文字列から1回でハッシュを求め、子のトークンは差分を求めるときに作ります。
+
+    Args:
+        value: JSONの値（変更しないこと。ハッシュ木は元の値を参照する）
+
+    Returns:
+        Node or bytes: オブジェクト・配列の場合はNode、スカラー値の場合はトークン
+    """
+    if type(value) is dict:
+        if not any(type(child) in _CONTAINERS for child in value.values()):
+            # キーの順序によらず同じハッシュにする
+            return Node(_flat_digest(b'{', value), value, None)
+        hasher = hashlib.blake2b(b'{', digest_size=DIGEST_SIZE)
+        children = {key: build_tree(child) for key, child in value.items()}
+        for key in sorted(children):
+            encoded = key.encode('utf-8', 'surrogatepass')
+            token = _token(children[key])
+            hasher.update(b'%d:%b%d:%b' % (len(encoded), encoded, len(token), token))
+        return Node(hasher.digest(), value, children)
+    if type(value) is list:
+        if not any(type(child) in _CONTAINERS for child in value):
+            return Node(_flat_digest(b'[', value), value, None)
+        hasher = hashlib.blake2b(b'[', digest_size=DIGEST_SIZE)
+        children = [build_tree(child) for child in value]
+        for item in children:
+            token = _token(item)
+            hasher.update(b'%d:%b' % (len(token), token))
+        return Node(hasher.digest(), value, children)
+    return _scalar_token(value)
+
+
+def _flat_digest(kind, value):
+    """子にオブジェクト・配列を含まない値のハッシュを、JSONの文字列から求めます"""
+    text = json.dumps(value, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.blake2b(kind + text.encode('utf-8', 'surrogatepass'), digest_size=DIGEST_SIZE).digest()
+
+
+def _children(node):
+    """部分木の子を返します（子のトークンが未作成であれば作る）"""
+    if node.children is None:
+        if type(node.value) is dict:
+            node.children = {key: _scalar_token(child) for key, child in node.value.items()}
+        else:
+            node.children = [_scalar_token(child) for child in node.value]
+    return node.children
+
+
+def diff_trees(old, new, old_value=None, new_value=None, path=()):
+    """
+    2つのハッシュ木の差分を求めます。
+
+    Args:
+        old (Node or bytes): 変更前のハッシュ木
+        new (Node or bytes): 変更後のハッシュ木
+        old_value: oldがスカラー値のトークンの場合の元の値
+        new_value: newがスカラー値のトークンの場合の元の値
+        path (tuple): 現在の位置
+
+    Returns:
+        list: Changeのリスト
+    """
+    if _token(old) == _token(new):
+        return []
+    if type(old) is Node and type(new) is Node:
+        if type(old.value) is dict and type(new.value) is dict:
+            return _diff_objects(old, new, path)
+        if type(old.value) is list and type(new.value) is list:
+            return _diff_arrays(old, new, path)
+    return [Change('changed', path, old.value if type(old) is Node else old_value,
+                   new.value if type(new) is Node else new_value)]
+
+
+def _diff_objects(old, new, path):
+    """2つのオブジェクトの差分を求めます"""
+    changes = []
+    old_children, new_children = _children(old), _children(new)
+    for key, item in old_children.items():
+        if key not in new_children:
+            changes.append(Change('removed', path + (key,), old.value[key], None))
+        else:
+            changes.extend(diff_trees(item, new_children[key], old.value[key], new.value[key], path + (key,)))
+    for key in new_children:
+        if key not in old_children:
+            changes.append(Change('added', path + (key,), None, new.value[key]))
+    return changes
+
+
+def _diff_arrays(old, new, path):
+    """2つの配列の差分を、要素のハッシュの並びの一致を手がかりに求めます"""
+    changes = []
+    old_children, new_children = _children(old), _children(new)
+    matcher = difflib.SequenceMatcher(None, [_token(item) for item in old_children],
+                                      [_token(item) for item in new_children], autojunk=False)
+    for tag, old_start, old_end, new_start, new_end in matcher.get_opcodes():
+        if tag == 'equal':
+            continue
+        paired = min(old_end - old_start, new_end - new_start) if tag == 'replace' else 0
+        for offset in range(paired):
+            i, j = old_start + offset, new_start + offset
+            changes.extend(diff_trees(old_children[i], new_children[j], old.value[i], new.value[j], path + (j,)))
+        for i in range(old_start + paired, old_end):
+            changes.append(Change('removed', path + (i,), old.value[i], None))
+        for j in range(new_start + paired, new_end):
+            changes.append(Change('added', path + (j,), None, new.value[j]))
+    return changes
+
+
+def compare_documents(old, new):
+    """
+    2つの設定データの差分を求めます。
+
+    Args:
+        old: 変更前の設定データ
+        new: 変更後の設定データ
+
+    Returns:
+        list: Changeのリスト（削除された配列の要素の位置は変更前、それ以外は変更後の位置）
+    """
+    return diff_trees(build_tree(old), build_tree(new), old, new)
+
+
+def format_path(path):
+    """
+    経路をセレクタと同じ書式の文字列にします。
+
+    Args:
+        path (tuple): キー・インデックスの列
+
+    Returns:
+        str: 例: mcpServers.filesystem.args[2]
+    """
+    text = ''
+    for key in path:
+        if type(key) is int:
+            text += f'[{key}]'
+        elif key and key != '*' and not _PLAIN_KEY_CHARS.intersection(key):
+            text += f'.{key}' if text else key
+        else:
+            text += f'[{json.dumps(key, ensure_ascii=False)}]'
+    return text or '(全体)'
+
+
+def _short(value):
+    """値を表示用の短い文字列にします"""
+    text = json.dumps(value, ensure_ascii=False)
+    return text if len(text) <= _VALUE_WIDTH else text[:_VALUE_WIDTH - 3] + '...'
+
+
+def format_changes(changes):
+    """
+    差分を1件1行の文字列にします。
+
+    Args:
+        changes (list): Changeのリスト
+
+    Returns:
+        str: 「+ 経路: 値」（追加）、「- 経路: 値」（削除）、「~ 経路: 変更前 -> 変更後」（変更）の行
+    """
+    lines = []
+    for change in changes:
+        mark = _MARKS[change.kind]
+        if change.kind == 'added':
+            lines.append(f"{mark} {format_path(change.path)}: {_short(change.new)}")
+        elif change.kind == 'removed':
+            lines.append(f"{mark} {format_path(change.path)}: {_short(change.old)}")
+        else:
+            lines.append(f"{mark} {format_path(change.path)}: {_short(change.old)} -> {_short(change.new)}")
+    return "\n".join(lines)
+
+
+class BackupDiffer:
+    """現在の設定ファイルとバックアップ、またはバックアップどうしの差分を求めます"""
+
+    def __init__(self, backup_history, cache_size=DEFAULT_CACHE_SIZE):
+        """
+        初期化メソッド
+
+        Args:
+            backup_history (BackupHistory): 対象のバックアップ履歴
+            cache_size (int): キャッシュするバックアップのハッシュ木の数
+        """
+        self.history = backup_history
+        self.cache_size = cache_size
+        self._trees = OrderedDict()
+        self._current = (None, None)
+
+    def current_tree(self):
+        """
+        現在の設定ファイルのハッシュ木を返します。ファイルが変更されるまで再利用します。
+
+        Raises:
+            FileNotFoundError: 設定ファイルが見つからない場合
+            json.JSONDecodeError: JSONの解析エラーがある場合
+        """
+        stat_result = os.stat(self.history.config_path)
+        signature = (stat_result.st_mtime_ns, stat_result.st_size)
+        if self._current[0] != signature:
+            # 解析キャッシュの値は変更されないため、複製せずに使う
+            document = parse_cache.default_cache.load_shared(self.history.config_path)
+            self._current = (signature, build_tree(document))
+        return self._current[1]
+
+    def trees(self, entries):
+        """
+        各バックアップのハッシュ木を返します。
+
+        キャッシュにないものだけを読み込みます。パック形式の版は連続した範囲をまとめて復元します。
+
+        Args:
+            entries (list): HistoryEntryのリスト
+
+        Returns:
+            list: entriesと同じ順のハッシュ木
+        """
+        pending = [entry for entry in entries if (entry.source, entry.ref) not in self._trees]
+        loaded = {}
+        for entry in pending:
+            if entry.source != history.SOURCE_PACK:
+                loaded[(entry.source, entry.ref)] = build_tree(self.history.load(entry))
+        numbers = {entry.ref for entry in pending if entry.source == history.SOURCE_PACK}
+        if numbers:
+            for number, document in self.history.pack.iter_versions(min(numbers), max(numbers) + 1):
+                if number in numbers:
+                    # ハッシュ木は元の値を参照し、文書は次の版の復元でその場で変更されるため複製する
+                    loaded[(history.SOURCE_PACK, number)] = build_tree(copy.deepcopy(document))
+
+        result = []
+        for entry in entries:
+            key = (entry.source, entry.ref)
+            tree = self._trees.get(key) or loaded[key]
+            self._trees[key] = tree
+            self._trees.move_to_end(key)
+            result.append(tree)
+        while len(self._trees) > self.cache_size:
+            self._trees.popitem(last=False)
+        return result
+
+    def tree(self, entry):
+        """
+        1つのバックアップ（Noneの場合は現在の設定ファイル）のハッシュ木を返します。
+
+        Args:
+            entry (HistoryEntry): バックアップ。Noneの場合は現在の設定ファイル。
+        """
+        return self.current_tree() if entry is None else self.trees([entry])[0]
+
+    def diff(self, old_entry, new_entry=None):
+        """
+        2つの版の差分を求めます。
+
+        Args:
+            old_entry (HistoryEntry): 変更前とするバックアップ。Noneの場合は現在の設定ファイル。
+            new_entry (HistoryEntry, optional): 変更後とするバックアップ。Noneの場合は現在の設定ファイル。
+
+        Returns:
+            list: Changeのリスト
+        """
+        return diff_trees(self.tree(old_entry), self.tree(new_entry))
+
+    def counts(self, entries):
+        """
+        各バックアップと現在の設定ファイルとの違いの件数を返します。
+
+        Args:
+            entries (list): HistoryEntryのリスト
+
+        Returns:
+            dict: IDをキー、違いの件数を値とする辞書
+        """
+        current = self.current_tree()
+        return {entry.id: len(diff_trees(tree, current)) for entry, tree in zip(entries, self.trees(entries))}
@@ -0,0 +1,395 @@
+"""
+ディレクトリ参照モジュール。
+巨大なディレクトリツリーでも待たされないよう、子ディレクトリを展開時に一定件数ずつ
+ワーカースレッドで読み込む、ttk.Treeviewによるアプリ内のディレクトリブラウザを提供します。
+
+読み込んだ一覧はセッション中キャッシュされ、同じディレクトリを再び展開しても
+ファイルシステムには問い合わせません。続きのページは読み込み済みの行と合わせて名前順に並べます。
+"""
+
+import bisect
+import os
+import threading
+import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
+from tkinter import ttk
+
+from .tasks import TaskRunner
+
+
+# 1回に読み込む子ディレクトリの数
+DEFAULT_PAGE_SIZE = 200
+
+# 絞り込みの入力が止まってから適用するまでの時間（ミリ秒）
+FILTER_DELAY_MS = 150
+
+# 未読み込みの子を表す仮の行と、続きを読み込む行のテキスト
+_PLACEHOLDER_TEXT = "読み込み中..."
+_MORE_TEXT = "さらに読み込む..."
+
+
+class DirectoryListing:
+    """1つのディレクトリの子ディレクトリの一覧（必要な分だけ読み込む）"""
+
+    def __init__(self, path):
+        """
+        初期化メソッド
+
+        Args:
+            path (str): ディレクトリのパス
+        """
+        self.path = path
+        self.names = []
+        self.complete = False
+        self.error = None
+        self._iterator = None
+        self._lock = threading.Lock()
+
+    def fetch(self, start, count):
+        """
+        start番目からcount件の子ディレクトリ名を返します。足りない分だけ読み込みます。
+
+        Args:
+            start (int): 開始位置
+            count (int): 件数
+
+        Returns:
+            tuple: (名前のリスト, 一覧の最後まで読み込んだかどうか)
+        """
+        with self._lock:
+            while not self.complete and len(self.names) < start + count:
+                self._read_next(start + count - len(self.names))
+            return self.names[start:start + count], self.complete and len(self.names) <= start + count
+
+    def _read_next(self, count):
+        """scandirの続きから最大count件を読み込みます"""
+        try:
+            if self._iterator is None:
+                self._iterator = os.scandir(self.path)
+            read = 0
+            for entry in self._iterator:
+                try:
+                    if not entry.is_dir():
+                        continue
+                except OSError:
+                    continue
+                self.names.append(entry.name)
+                read += 1
+                if read >= count:
+                    return
+        except OSError as e:
+            self.error = e
+        self._close()
+
+    def _close(self):
+        """一覧の読み込みを終えます"""
+        self.complete = True
+        if self._iterator is not None:
+            self._iterator.close()
+            self._iterator = None
+
+
+class ListingCache:
+    """セッション中のディレクトリ一覧のキャッシュ"""
+
+    def __init__(self):
+        self._listings = {}
+        self._lock = threading.Lock()
+
+    def get(self, path):
+        """
+        ディレクトリの一覧を返します（なければ作成します）。
+
+        Args:
+            path (str): ディレクトリのパス
+
+        Returns:
+            DirectoryListing: 一覧
+        """
+        key = os.path.normcase(os.path.abspath(path))
+        with self._lock:
+            listing = self._listings.get(key)
+            if listing is None:
+                listing = self._listings[key] = DirectoryListing(path)
+            return listing
+
+    def invalidate(self, path=None):
+        """
+        キャッシュを破棄します。
+
+        Args:
+            path (str, optional): 破棄するディレクトリのパス。Noneの場合はすべて破棄。
+        """
+        with self._lock:
+            if path is None:
+                self._listings.clear()
+            else:
+                self._listings.pop(os.path.normcase(os.path.abspath(path)), None)
+
+
+def matches_filter(name, text):
+    """
+    名前が絞り込みの文字列に一致するかを返します（大文字・小文字を区別しない前方一致）。
+
+    Args:
+        name (str): ディレクトリ名
+        text (str): 絞り込みの文字列
+
+    Returns:
+        bool: 一致するかどうか
+    """
+    return not text or name.casefold().startswith(text.casefold())
+
+
+# アプリケーション全体で共有する一覧のキャッシュ
+session_cache = ListingCache()
+
+# 一覧の読み込みに使うエグゼキュータ（設定ファイルの読み書きとは別に順に処理する）
+_executor = None
+
+
+def _default_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='dir-listing')
+    return _executor
+
+
+class DirectoryBrowser:
+    """ディレクトリを選択するためのアプリ内ブラウザ"""
+
+    def __init__(self, parent, initial_path, on_select, cache=None, executor=None,
+                 page_size=DEFAULT_PAGE_SIZE):
+        """
+        初期化メソッド
+
+        Args:
+            parent (tk.Widget): 親ウィジェット
+            initial_path (str): 最初に表示するディレクトリ
+            on_select (callable): ディレクトリが選択されたときに呼ばれる関数（引数はパス）
+            cache (ListingCache, optional): 一覧のキャッシュ。Noneの場合はsession_cache。
+            executor (Executor, optional): 一覧を読み込むエグゼキュータ
+            page_size (int): 1回に読み込む子ディレクトリの数
+        """
+        self.on_select = on_select
+        self.cache = cache or session_cache
+        self.page_size = page_size
+        self.window = tk.Toplevel(parent)
+        self.window.title("ディレクトリを選択")
+        self.window.geometry("500x500")
+        self.tasks = TaskRunner(self.window, executor or _default_executor())
+
+        # 行ごとの情報（ディレクトリのパス、読み込み済みの子の行とその並べ替えのキー、続きを読み込む行）
+        self._paths = {}
+        self._children = {}
+        self._sort_keys = {}
+        self._more_items = {}
+        self._loading = set()
+        self._filter_after = None
+        self._filter_item = None
+        self.filter_var = tk.StringVar()
+
+        self._create_widgets()
+        self._set_root(initial_path)
+
+    def _create_widgets(self):
+        """ウィジェットを作成してレイアウトします"""
+        top_frame = ttk.Frame(self.window, padding="5")
+        top_frame.pack(fill=tk.X)
+        ttk.Button(top_frame, text="上へ", command=self._go_up).pack(side=tk.LEFT, padx=2)
+        ttk.Label(top_frame, text="絞り込み:").pack(side=tk.LEFT, padx=2)
+        filter_entry = ttk.Entry(top_frame, textvariable=self.filter_var)
+        filter_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=2)
+        self.filter_var.trace_add('write', self._on_filter_changed)
+
+        tree_frame = ttk.Frame(self.window)
+        tree_frame.pack(fill=tk.BOTH, expand=True, padx=5)
+        self.tree = ttk.Treeview(tree_frame, show='tree', selectmode='browse')
+        scrollbar = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=self.tree.yview)
+        self.scrollbar = scrollbar
+        self.tree.configure(yscrollcommand=self._on_scroll)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.bind('<<TreeviewOpen>>', self._on_open)
+        self.tree.bind('<<TreeviewSelect>>', self._on_selected)
+        self.tree.bind('<Double-1>', lambda event: self._choose())
+
+        button_frame = ttk.Frame(self.window, padding="5")
+        button_frame.pack(fill=tk.X)
+        ttk.Button(button_frame, text="選択", command=self._choose).pack(side=tk.RIGHT, padx=2)
+        ttk.Button(button_frame, text="キャンセル", command=self.close).pack(side=tk.RIGHT, padx=2)
+        self.status_var = tk.StringVar()
+        ttk.Label(button_frame, textvariable=self.status_var).pack(side=tk.LEFT)
+
+    def close(self):
+        """ブラウザを閉じます"""
+        self.window.destroy()
+
+    def _set_root(self, path):
+        """指定したディレクトリを最上位として表示します"""
+        self.tree.delete(*self.tree.get_children(''))
+        self._paths.clear()
+        self._children.clear()
+        self._sort_keys.clear()
+        self._more_items.clear()
+        self._loading.clear()
+        self._filter_item = None
+        self.root_path = os.path.abspath(path)
+        item = self._insert_directory('', self.root_path, self.root_path)
+        self.tree.item(item, open=True)
+        self.tree.selection_set(item)
+        self._load_page(item)
+
+    def _go_up(self):
+        """1つ上のディレクトリを最上位にします"""
+        parent = os.path.dirname(self.root_path)
+        if parent and parent != self.root_path:
+            self._set_root(parent)
+
+    def _insert_directory(self, parent, path, text, index='end'):
+        """ディレクトリの行を追加します（子は展開時に読み込むため仮の行を置く）"""
+        item = self.tree.insert(parent, index, text=text)
+        self._paths[item] = path
+        self.tree.insert(item, 'end', text=_PLACEHOLDER_TEXT)
+        return item
+
+    def _on_open(self, event=None):
+        """行が展開されたら子ディレクトリを読み込みます"""
+        item = self.tree.focus()
+        if item in self._paths and item not in self._children:
+            self._load_page(item)
+
+    def _on_selected(self, event=None):
+        """「さらに読み込む」行が選択されたら続きを読み込みます"""
+        for item in self.tree.selection():
+            parent = self._parent_of_more(item)
+            if parent is not None:
+                self._load_page(parent)
+
+    def _on_scroll(self, first, last):
+        """スクロールで「さらに読み込む」行が見えたら続きを読み込みます"""
+        self.scrollbar.set(first, last)
+        for parent, more_item in list(self._more_items.items()):
+            if self.tree.exists(more_item) and self.tree.bbox(more_item):
+                self._load_page(parent)
+
+    def _parent_of_more(self, item):
+        """「さらに読み込む」行であれば、その親の行を返します"""
+        for parent, more_item in self._more_items.items():
+            if more_item == item:
+                return parent
+        return None
+
+    def _load_page(self, item):
+        """子ディレクトリの次のページをワーカースレッドで読み込みます"""
+        if item in self._loading:
+            return
+        self._loading.add(item)
+        path = self._paths[item]
+        listing = self.cache.get(path)
+        start = len(self._children.get(item, []))
+        self.status_var.set(f"{path} を読み込んでいます...")
+
+        def work(cancel):
+            return listing.fetch(start, self.page_size)
+
+        def done(result):
+            self._loading.discard(item)
+            if self.tree.exists(item):
+                self._show_page(item, listing, *result)
+
+        def failed(error):
+            self._loading.discard(item)
+            self.status_var.set(f"エラー: {error}")
+
+        self.tasks.run("一覧の読み込み", work, done, failed)
+
+    def _show_page(self, item, listing, names, complete):
+        """読み込んだページを表示します（メインスレッド上で実行される）"""
+        children = self._children.get(item)
+        if children is None:
+            # 最初のページでは仮の行を取り除く
+            self.tree.delete(*self.tree.get_children(item))
+            children = self._children[item] = []
+            self._sort_keys[item] = []
+        keys = self._sort_keys[item]
+        more_item = self._more_items.pop(item, None)
+        if more_item is not None and self.tree.exists(more_item):
+            self.tree.delete(more_item)
+
+        # scandirの順序は名前順ではないため、読み込み済みの行と合わせて名前順の位置に入れる
+        filter_text = self.filter_var.get() if item == self._filter_item else ''
+        path = self._paths[item]
+        for name in names:
+            key = name.casefold()
+            index = bisect.bisect_right(keys, key)
+            # 絞り込み中は一部の行が外れていて位置がずれるため、最後に並べ直す
+            child = self._insert_directory(item, os.path.join(path, name), name,
+                                           'end' if filter_text else index)
+            keys.insert(index, key)
+            children.insert(index, child)
+        if filter_text:
+            self._arrange(item, filter_text)
+
+        if not complete:
+            self._more_items[item] = self.tree.insert(item, 'end', text=_MORE_TEXT)
+        if listing.error is not None:
+            self.status_var.set(f"エラー: {listing.error}")
+        else:
+            total = len(listing.names)
+            self.status_var.set(f"{total}件のディレクトリ" + ("" if complete else "（続きがあります）"))
+
+    def _on_filter_changed(self, *args):
+        """絞り込みの入力が止まってから適用します"""
+        if self._filter_after is not None:
+            self.window.after_cancel(self._filter_after)
+        self._filter_after = self.window.after(FILTER_DELAY_MS, self._apply_filter)
+
+    def _apply_filter(self):
+        """選択中のディレクトリの子を、入力された文字列で前方一致により絞り込みます"""
+        self._filter_after = None
+        # 絞り込み中に対象が変わらないよう、入力を始めた時点の対象を使い続ける
+        if self._filter_item is None or not self.tree.exists(self._filter_item):
+            self._filter_item = self._filter_target()
+        item = self._filter_item
+        if item is None:
+            return
+        text = self.filter_var.get()
+        if not text:
+            self._filter_item = None
+        self._arrange(item, text)
+        visible = self.tree.get_children(item)
+        if text and visible and visible[0] != self._more_items.get(item):
+            self.tree.see(visible[0])
+
+    def _arrange(self, item, text):
+        """子の行のうち絞り込みに一致するものだけを名前順に表示します（続きを読み込む行は最後に残る）"""
+        index = 0
+        for child in self._children[item]:
+            if matches_filter(self.tree.item(child, 'text'), text):
+                self.tree.move(child, item, index)
+                index += 1
+            else:
+                self.tree.detach(child)
+
+    def _filter_target(self):
+        """絞り込みの対象となる、子を読み込み済みのディレクトリの行を返します"""
+        selection = self.tree.selection()
+        item = selection[0] if selection else None
+        while item:
+            if item in self._children and self.tree.item(item, 'open'):
+                return item
+            item = self.tree.parent(item)
+        root_items = self.tree.get_children('')
+        if root_items and root_items[0] in self._children:
+            return root_items[0]
+        return None
+
+    def _choose(self):
+        """選択中のディレクトリを選んで閉じます"""
+        selection = self.tree.selection()
+        if not selection or selection[0] not in self._paths:
+            return
+        path = self._paths[selection[0]]
+        self.close()
+        self.on_select(path)
@@ -11,20 +11,54 @@ from pathlib import Path
 
 # 自作モジュールのインポート
 from . import config
+from . import history
+from . import locator
+from . import pathcheck
+from . import profiles
+from . import schema
+from . import tracing
+from .backup_browser import BackupBrowser
+from .dirbrowser import DirectoryBrowser
+from .parse_cache import clone
+from .tasks import TaskCancelled, TaskRunner
+from .watcher import FileWatcher
+
+
+# 新しいパスの入力が止まってから存在を確認するまでの時間（ミリ秒）
+PATH_CHECK_DELAY_MS = 400
+
+# プロファイル名の入力が止まってから候補を絞り込むまでの時間（ミリ秒）
+PROFILE_SEARCH_DELAY_MS = 150
+
+# 存在確認の結果の表示
+PATH_VERDICT_LABELS = {
+    pathcheck.EXISTS: "✓ パスが存在します",
+    pathcheck.MISSING: "⚠ パスが存在しません",
+    pathcheck.TIMEOUT: "⚠ パスから応答がありません（ネットワークを確認してください）",
+}
 
 
 class ConfigEditorApp:
     """Claude Desktop設定エディタのメインGUIクラス"""
     
-    def __init__(self, root):
+    def __init__(self, root, executor=None, profile_store=None, config_path=None):
         """
         初期化メソッド
         
         Args:
             root (tk.Tk): tkinterのルートウィンドウ
+            executor (Executor, optional): ファイル操作を実行するエグゼキュータ。
+                Noneの場合はバックグラウンドの1スレッドで実行する。
+            profile_store (ProfileStore, optional): プロファイルの保存先。
+                Noneの場合はアプリケーションデータのディレクトリ内のデータベース。
+            config_path (str, optional): 最初に読み込む設定ファイルのパス。
+                Noneの場合はデフォルトのパス。
         """
         self.root = root
         self.root.title("Claude Desktop 設定エディタ")
+        
+        # 前回の処理時間をステータスバーに表示するため、処理時間の計測を有効にする
+        tracing.enable()
         self.root.geometry("600x400")
         self.root.resizable(True, True)
         
@@ -40,15 +74,33 @@ class ConfigEditorApp:
         self.new_path_var = tk.StringVar()
         self.profile_name_var = tk.StringVar()
         self.status_var = tk.StringVar()
+        self.timing_var = tk.StringVar()
+        self.path_status_var = tk.StringVar()
+        
+        # 設定ファイルのパスを指定されたパス、なければデフォルト値に設定
+        self.config_path_var.set(str(config_path) if config_path else str(config.get_default_config_path()))
         
-        # 設定ファイルのパスをデフォルト値に設定
-        self.config_path_var.set(str(config.get_default_config_path()))
+        # プロファイルの保存先（最初に使われるまでデータベースは開かない）
+        self.profile_store = profile_store or profiles.ProfileStore()
+        self._profile_search_after = None
         
-        # プロファイルリスト
-        self.profiles = {}
+        # 読み込んだ設定データと、外部での変更を監視するウォッチャー
+        self.config_data = None
+        self.watcher = None
+        
+        # ファイル操作はバックグラウンドで行い、実行中の処理は1つだけにする
+        self.tasks = TaskRunner(root, executor)
+        self.current_task = None
+        self.action_buttons = []
+        
+        # 新しいパスの存在確認（入力が止まってから時間制限つきで行う）
+        self.path_checker = pathcheck.PathChecker()
+        self._path_check_after = None
+        self.new_path_var.trace_add('write', self._on_new_path_changed)
         
         # UIの作成
         self._create_widgets()
+        self.root.protocol("WM_DELETE_WINDOW", self._on_close)
         
         # 初期設定の読み込み
         self.load_config()
@@ -64,8 +116,10 @@ class ConfigEditorApp:
         path_frame.pack(fill=tk.X, padx=5, pady=5)
         
         ttk.Entry(path_frame, textvariable=self.config_path_var, width=50).grid(row=0, column=0, padx=5, pady=5, sticky=tk.W+tk.E)
-        ttk.Button(path_frame, text="参照", command=self._browse_config).grid(row=0, column=1, padx=5, pady=5)
-        ttk.Button(path_frame, text="読み込み", command=self.load_config).grid(row=0, column=2, padx=5, pady=5)
+        browse_button = ttk.Button(path_frame, text="参照", command=self._browse_config)
+        browse_button.grid(row=0, column=1, padx=5, pady=5)
+        load_button = ttk.Button(path_frame, text="読み込み", command=self.load_config)
+        load_button.grid(row=0, column=2, padx=5, pady=5)
         
         # 現在のパス
         current_frame = ttk.LabelFrame(main_frame, text="現在のパス設定", padding="10")
@@ -82,6 +136,8 @@ class ConfigEditorApp:
         
         ttk.Entry(entry_frame, textvariable=self.new_path_var, width=50).grid(row=0, column=0, padx=5, pady=5, sticky=tk.W+tk.E)
         ttk.Button(entry_frame, text="参照", command=self._browse_directory).grid(row=0, column=1, padx=5, pady=5)
+        ttk.Button(entry_frame, text="ツリー参照", command=self._browse_tree).grid(row=0, column=2, padx=5, pady=5)
+        ttk.Label(entry_frame, textvariable=self.path_status_var).grid(row=1, column=0, columnspan=3, padx=5, sticky=tk.W)
         
         # プロファイル管理（オプション機能）
         profile_frame = ttk.LabelFrame(main_frame, text="プロファイル管理", padding="10")
@@ -94,21 +150,39 @@ class ConfigEditorApp:
         ttk.Entry(profile_entry_frame, textvariable=self.profile_name_var, width=20).grid(row=0, column=1, padx=5, pady=5)
         ttk.Button(profile_entry_frame, text="保存", command=self._save_profile).grid(row=0, column=2, padx=5, pady=5)
         
-        # プロファイル選択
-        self.profile_combobox = ttk.Combobox(profile_entry_frame, state="readonly", width=20)
+        # プロファイル選択（入力した文字で候補を絞り込む）
+        self.profile_combobox = ttk.Combobox(profile_entry_frame, width=20, postcommand=self._update_profile_list)
         self.profile_combobox.grid(row=0, column=3, padx=5, pady=5)
         self.profile_combobox.bind("<<ComboboxSelected>>", self._load_profile)
+        self.profile_combobox.bind("<Return>", self._load_profile)
+        self.profile_combobox.bind("<KeyRelease>", self._on_profile_typed)
         
         # アクションボタン
         button_frame = ttk.Frame(main_frame)
         button_frame.pack(fill=tk.X, padx=5, pady=10)
         
-        ttk.Button(button_frame, text="保存", command=self.save_config).pack(side=tk.RIGHT, padx=5)
-        ttk.Button(button_frame, text="キャンセル", command=self.root.destroy).pack(side=tk.RIGHT, padx=5)
+        save_button = ttk.Button(button_frame, text="保存", command=self.save_config)
+        save_button.pack(side=tk.RIGHT, padx=5)
+        ttk.Button(button_frame, text="キャンセル", command=self._on_close).pack(side=tk.RIGHT, padx=5)
+        history_button = ttk.Button(button_frame, text="バックアップ履歴", command=self._show_history)
+        history_button.pack(side=tk.LEFT, padx=5)
+        
+        # 処理中に無効にするボタン
+        self.action_buttons = [browse_button, load_button, save_button, history_button]
+        
+        # ステータスバー（処理中は進捗と中止ボタンを表示する）
+        status_frame = ttk.Frame(self.root)
+        status_frame.pack(side=tk.BOTTOM, fill=tk.X)
+        
+        self.abort_button = ttk.Button(status_frame, text="中止", command=self._cancel_task)
+        self.abort_button.pack(side=tk.RIGHT, padx=2)
+        self.abort_button.state(['disabled'])
+        self.progress = ttk.Progressbar(status_frame, mode='indeterminate', length=120)
+        self.progress.pack(side=tk.RIGHT, padx=2)
+        ttk.Label(status_frame, textvariable=self.timing_var).pack(side=tk.RIGHT, padx=5)
         
-        # ステータスバー
-        status_bar = ttk.Label(self.root, textvariable=self.status_var, relief=tk.SUNKEN, anchor=tk.W)
-        status_bar.pack(side=tk.BOTTOM, fill=tk.X)
+        status_bar = ttk.Label(status_frame, textvariable=self.status_var, relief=tk.SUNKEN, anchor=tk.W)
+        status_bar.pack(side=tk.LEFT, fill=tk.X, expand=True)
         
         # 初期ステータス
         self.status_var.set("準備完了")
@@ -118,6 +192,141 @@ class ConfigEditorApp:
         path_frame.columnconfigure(0, weight=1)
         entry_frame.columnconfigure(0, weight=1)
     
+    def _on_close(self):
+        """ウィンドウを閉じる"""
+        if self.current_task is not None:
+            self.current_task.cancel()
+        self.tasks.shutdown()
+        if self.watcher is not None:
+            self.watcher.stop()
+        self.root.destroy()
+    
+    def _run_task(self, name, message, work, on_success, on_error):
+        """
+        ファイル操作をバックグラウンドで実行する
+        
+        処理中はボタンを無効にして進捗を表示し、完了時にメインスレッドで元に戻す。
+        """
+        if self.current_task is not None:
+            return None
+        
+        # 処理全体を1つの区間として計測し、完了時にステータスバーへ内訳を表示する
+        timed = []
+        
+        def traced_work(cancel_event):
+            with tracing.span(name) as span:
+                timed.append(span)
+                return work(cancel_event)
+        
+        def finish(callback):
+            def wrapper(*args):
+                self._end_task()
+                if timed and tracing.is_enabled():
+                    self.timing_var.set(f"前回: {tracing.summarize(timed[0])}")
+                callback(*args)
+            return wrapper
+        
+        def cancelled():
+            self._end_task()
+            self.status_var.set(f"{name}を中止しました。")
+        
+        for button in self.action_buttons:
+            button.state(['disabled'])
+        self.abort_button.state(['!disabled'])
+        self.progress.start(10)
+        self.status_var.set(message)
+        
+        self.current_task = self.tasks.run(name, traced_work, finish(on_success), finish(on_error), cancelled)
+        # 同期的に完了した場合はすでに終了処理が済んでいる
+        if self.current_task is not None and self.current_task.done:
+            self.current_task = None
+        return self.current_task
+    
+    def _end_task(self):
+        """処理中の表示を元に戻す"""
+        self.current_task = None
+        self.progress.stop()
+        self.abort_button.state(['disabled'])
+        for button in self.action_buttons:
+            button.state(['!disabled'])
+    
+    def _cancel_task(self):
+        """実行中の処理の中止を要求する"""
+        if self.current_task is not None:
+            self.current_task.cancel()
+            self.status_var.set(f"{self.current_task.name}を中止しています...")
+    
+    def _watch_config(self, config_path):
+        """設定ファイルの外部での変更の監視を開始する"""
+        if self.watcher is not None:
+            if str(self.watcher.path) == str(Path(config_path)):
+                return
+            self.watcher.stop()
+        self.watcher = FileWatcher(config_path, self._on_config_changed)
+        self.watcher.start()
+    
+    def _on_config_changed(self, config_path):
+        """外部で変更された設定を読み込む（監視スレッド上で実行される）"""
+        try:
+            new_data = config.load_config(config_path)
+        except Exception:
+            # 書き込み途中などで読み込めない場合は次の変更通知を待つ
+            return
+        self.root.after(0, self._apply_external_change, str(config_path), new_data)
+    
+    def _apply_external_change(self, config_path, new_data):
+        """外部で変更された設定を画面に反映する（メインスレッド上で実行される）"""
+        if str(Path(self.config_path_var.get())) != str(Path(config_path)):
+            return
+        if not config.validate_config(new_data):
+            self.status_var.set("警告: 外部で変更された設定ファイルの形式が正しくありません。")
+            return
+        
+        old_data = self.config_data or {}
+        old_subtree = old_data.get('mcpServers', {}).get('filesystem')
+        new_subtree = new_data['mcpServers']['filesystem']
+        
+        # 保存時に新しい内容を上書きしないよう、設定データは常に最新に置き換える
+        self.config_data = new_data
+        if old_subtree == new_subtree:
+            return
+        
+        old_path = self.current_path_var.get()
+        current_path = config.get_mcp_path(new_data)
+        self.current_path_var.set(current_path)
+        # 新しいパスが未編集であれば追従させる
+        if self.new_path_var.get() == old_path:
+            self.new_path_var.set(current_path)
+        self.status_var.set("外部で変更された設定を再読み込みしました。")
+    
+    def _on_new_path_changed(self, *args):
+        """新しいパスの入力が止まってから存在を確認する"""
+        if self._path_check_after is not None:
+            self.root.after_cancel(self._path_check_after)
+        self._path_check_after = self.root.after(PATH_CHECK_DELAY_MS, self._check_new_path)
+    
+    def _check_new_path(self):
+        """新しいパスの存在をバックグラウンドで確認する"""
+        self._path_check_after = None
+        new_path = self.new_path_var.get()
+        if not new_path:
+            self.path_status_var.set("")
+            return
+        verdict = self.path_checker.cached(new_path)
+        if verdict is not None:
+            self._show_path_verdict(new_path, verdict)
+            return
+        self.path_status_var.set("確認中...")
+        self.path_checker.check_async(
+            new_path, lambda path, verdict: self.root.after(0, self._show_path_verdict, path, verdict))
+    
+    def _show_path_verdict(self, path, verdict):
+        """存在確認の結果を表示する（メインスレッド上で実行される）"""
+        # 確認中に入力が変わった場合は古い結果を表示しない
+        if path != self.new_path_var.get():
+            return
+        self.path_status_var.set(PATH_VERDICT_LABELS[verdict])
+    
     def _browse_config(self):
         """設定ファイルの参照ダイアログを表示"""
         file_path = filedialog.askopenfilename(
@@ -138,6 +347,14 @@ class ConfigEditorApp:
             dir_path = Path(dir_path).as_posix().replace('/', '\\')
             self.new_path_var.set(dir_path)
     
+    def _browse_tree(self):
+        """大きなディレクトリツリー向けのアプリ内ブラウザを表示"""
+        # 存在が確認済みであれば新しいパスから、そうでなければホームディレクトリから開く
+        new_path = self.new_path_var.get()
+        if not new_path or self.path_checker.cached(new_path) != pathcheck.EXISTS:
+            new_path = os.path.expanduser('~')
+        DirectoryBrowser(self.root, new_path, self.new_path_var.set)
+    
     def _save_profile(self):
         """現在のパス設定をプロファイルとして保存"""
         name = self.profile_name_var.get()
@@ -151,92 +368,192 @@ class ConfigEditorApp:
             return
         
         # プロファイルを保存
-        self.profiles[name] = path
-        self._update_profile_list()
+        try:
+            self.profile_store.save(name, path)
+        except Exception as e:
+            messagebox.showerror("エラー", f"プロファイルを保存できませんでした: {str(e)}")
+            return
         messagebox.showinfo("成功", f"プロファイル '{name}' を保存しました。")
     
     def _load_profile(self, event=None):
         """選択されたプロファイルを読み込む"""
         name = self.profile_combobox.get()
-        if name in self.profiles:
-            self.new_path_var.set(self.profiles[name])
+        path = self.profile_store.get(name) if name else None
+        if path is not None:
+            self.new_path_var.set(path)
             self.status_var.set(f"プロファイル '{name}' を読み込みました。")
     
+    def _on_profile_typed(self, event=None):
+        """入力が止まってからプロファイルの候補を絞り込む"""
+        if event is not None and event.keysym in ('Return', 'Up', 'Down', 'Escape'):
+            return
+        if self._profile_search_after is not None:
+            self.root.after_cancel(self._profile_search_after)
+        self._profile_search_after = self.root.after(PROFILE_SEARCH_DELAY_MS, self._update_profile_list)
+    
     def _update_profile_list(self):
-        """プロファイルリストを更新"""
-        self.profile_combobox['values'] = list(self.profiles.keys())
+        """入力中の名前で始まるプロファイルを候補として表示する"""
+        self._profile_search_after = None
+        prefix = self.profile_combobox.get()
+        self.profile_combobox['values'] = [name for name, _ in self.profile_store.search(prefix)]
     
     def load_config(self):
-        """設定ファイルを読み込む"""
-        try:
-            # 設定ファイルのパスを取得
-            config_path = self.config_path_var.get()
-            if not config_path:
-                raise ValueError("設定ファイルのパスが指定されていません。")
-            
+        """設定ファイルを読み込む（ファイル操作はバックグラウンドで行う）"""
+        # 設定ファイルのパスを取得
+        config_path = self.config_path_var.get()
+        if not config_path:
+            self._show_load_error(ValueError("設定ファイルのパスが指定されていません。"))
+            return
+        
+        def work(cancel):
             # 設定を読み込む
-            self.config_data = config.load_config(config_path)
+            data = config.load_config(config_path)
+            if cancel.is_set():
+                raise TaskCancelled
             
-            # 設定を検証
-            if not config.validate_config(self.config_data):
-                raise ValueError("設定ファイルの形式が正しくありません。")
+            # 設定を検証（無効な場合はすべての違反をまとめて表示する）
+            if not config.validate_config(data):
+                errors = config.structure_errors(data)
+                raise ValueError("設定ファイルの形式が正しくありません。\n" + schema.format_violations(errors))
+            if cancel.is_set():
+                raise TaskCancelled
             
-            # 現在のパスを取得して表示
-            current_path = config.get_mcp_path(self.config_data)
-            self.current_path_var.set(current_path)
+            # 現在のパスを取得
+            return data, config.get_mcp_path(data)
+        
+        def done(result):
+            self.config_data, current_path = result
             
-            # 新しいパスの初期値を現在の値に設定
+            # 現在のパスを表示し、新しいパスの初期値を現在の値に設定
+            self.current_path_var.set(current_path)
             self.new_path_var.set(current_path)
             
+            # 外部での変更を監視
+            self._watch_config(config_path)
+            
             self.status_var.set("設定を読み込みました。")
-        except FileNotFoundError:
+        
+        self._run_task("読み込み", "設定を読み込んでいます...", work, done, self._show_load_error)
+    
+    def _show_load_error(self, error):
+        """読み込みエラーを表示する"""
+        if isinstance(error, FileNotFoundError):
+            # 次回の既定パスの解決で候補を確認し直す
+            locator.default_locator.invalidate()
             messagebox.showerror("エラー", "設定ファイルが見つかりません。")
             self.status_var.set("エラー: ファイルが見つかりません。")
-        except json.JSONDecodeError:
+        elif isinstance(error, json.JSONDecodeError):
             messagebox.showerror("エラー", "設定ファイルの形式が正しくありません。")
             self.status_var.set("エラー: JSONの形式が不正です。")
-        except ValueError as e:
-            messagebox.showerror("エラー", str(e))
-            self.status_var.set(f"エラー: {str(e)}")
-        except Exception as e:
-            messagebox.showerror("エラー", f"予期せぬエラーが発生しました: {str(e)}")
-            self.status_var.set(f"エラー: {str(e)}")
+        elif isinstance(error, ValueError):
+            messagebox.showerror("エラー", str(error))
+            self.status_var.set(f"エラー: {str(error)}")
+        else:
+            messagebox.showerror("エラー", f"予期せぬエラーが発生しました: {str(error)}")
+            self.status_var.set(f"エラー: {str(error)}")
     
     def save_config(self):
-        """設定ファイルを保存する"""
-        try:
-            # 新しいパスを取得
-            new_path = self.new_path_var.get()
-            if not new_path:
-                raise ValueError("新しいパスが指定されていません。")
-            
-            # パスが存在するか確認
-            if not os.path.exists(new_path):
-                if not messagebox.askyesno("警告", f"パス '{new_path}' は存在しません。続行しますか？"):
+        """設定ファイルを保存する（ファイル操作はバックグラウンドで行う）"""
+        # 新しいパスを取得
+        new_path = self.new_path_var.get()
+        if not new_path:
+            self._show_save_error(ValueError("新しいパスが指定されていません。"))
+            return
+        config_path = self.config_path_var.get()
+        
+        def confirmed(verdict):
+            if verdict != pathcheck.EXISTS:
+                if verdict == pathcheck.TIMEOUT:
+                    message = f"パス '{new_path}' から応答がありません。続行しますか？"
+                else:
+                    message = f"パス '{new_path}' は存在しません。続行しますか？"
+                if not messagebox.askyesno("警告", message):
+                    self.status_var.set("保存を取り消しました。")
                     return
-            
-            # 設定を更新
-            updated_config = config.set_mcp_path(self.config_data, new_path)
-            
-            # 設定を保存
-            config_path = self.config_path_var.get()
-            config.save_config(updated_config, config_path)
-            
+            self._write_config(config_path, new_path)
+        
+        # 入力中に確認した結果があればそれを使い、なければ時間制限つきで確認する
+        verdict = self.path_checker.cached(new_path)
+        if verdict is not None:
+            confirmed(verdict)
+            return
+        self._run_task("保存", "パスを確認しています...", lambda cancel: self.path_checker.check(new_path),
+                       confirmed, self._show_save_error)
+    
+    def _write_config(self, config_path, new_path):
+        """設定を更新してバックグラウンドで保存する"""
+        try:
+            # 設定を更新（保存が完了するまで画面上の設定データは変更しない）
+            updated_config = config.set_mcp_path(clone(self.config_data), new_path)
+        except Exception as e:
+            self._show_save_error(e)
+            return
+        
+        def work(cancel):
+            # 書き込みを始める前であれば中止できる（書き込んだ後は結果を反映する）
+            if cancel.is_set():
+                raise TaskCancelled
+            return config.save_config(updated_config, config_path)
+        
+        def done(result):
             # 現在の設定を更新
+            self.config_data = updated_config
             self.current_path_var.set(new_path)
             
             # 成功メッセージ
+            if not result.written:
+                self.status_var.set("変更がないため保存を省略しました。")
+                return
             messagebox.showinfo("成功", "設定を保存しました。")
             self.status_var.set("設定を保存しました。")
-        except KeyError:
+        
+        self._run_task("保存", "設定を保存しています...", work, done, self._show_save_error)
+    
+    def _show_history(self):
+        """バックアップ履歴を表示する"""
+        config_path = self.config_path_var.get()
+        if not config_path:
+            messagebox.showerror("エラー", "設定ファイルのパスが指定されていません。")
+            return
+        backup_history = history.BackupHistory(config_path)
+        BackupBrowser(self.root, backup_history, lambda entry: self._restore_backup(backup_history, entry),
+                      executor=self.tasks.executor)
+    
+    def _restore_backup(self, backup_history, entry):
+        """バックアップの内容を、通常の保存と同じ手順で設定ファイルに書き戻す"""
+        config_path = str(backup_history.config_path)
+        
+        def work(cancel):
+            document = backup_history.load(entry)
+            # 書き込みを始める前であれば中止できる（書き込んだ後は結果を反映する）
+            if cancel.is_set():
+                raise TaskCancelled
+            config.save_config(document, config_path)
+            return document
+        
+        def done(document):
+            self.config_data = document
+            try:
+                current_path = config.get_mcp_path(document)
+            except KeyError:
+                current_path = ""
+            self.current_path_var.set(current_path)
+            self.new_path_var.set(current_path)
+            self.status_var.set(f"{entry.timestamp:%Y-%m-%d %H:%M:%S} のバックアップを復元しました。")
+        
+        self._run_task("復元", "バックアップを復元しています...", work, done, self._show_save_error)
+    
+    def _show_save_error(self, error):
+        """保存エラーを表示する"""
+        if isinstance(error, KeyError):
             messagebox.showerror("エラー", "設定ファイルの形式が正しくありません。")
             self.status_var.set("エラー: 設定ファイルの形式が不正です。")
-        except PermissionError:
+        elif isinstance(error, PermissionError):
             messagebox.showerror("エラー", "ファイルに書き込む権限がありません。")
             self.status_var.set("エラー: 権限がありません。")
-        except Exception as e:
-            messagebox.showerror("エラー", f"予期せぬエラーが発生しました: {str(e)}")
-            self.status_var.set(f"エラー: {str(e)}")
+        else:
+            messagebox.showerror("エラー", f"予期せぬエラーが発生しました: {str(error)}")
+            self.status_var.set(f"エラー: {str(error)}")
 
 
 def show_error(title, message):
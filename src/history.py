@@ -0,0 +1,193 @@
+"""
+バックアップ履歴モジュール。
+通常形式のカタログ（index.jsonl）とパック形式のインデックス（config.pack.idx）から
+バックアップの一覧を作り、ページ単位で表示・復元できるようにします。
+
+一覧の作成ではバックアップの本体を読み込まず、ディレクトリも走査しません
+（ストア導入前のバックアップを最初に一度だけカタログへ取り込むときを除く）。
+filesystemのパスのプレビューは、表示するページの版についてだけ取り出します。
+"""
+
+import json
+import os
+from collections import namedtuple
+from datetime import datetime
+from pathlib import Path
+
+from . import lazyjson
+from .backup_pack import BackupPack
+from .backup_store import BackupStore, entry_time
+
+
+# バックアップの形式
+SOURCE_STORE = 'store'
+SOURCE_PACK = 'pack'
+
+# パック形式の版のIDの接頭辞（続けて版の番号）
+PACK_ID_PREFIX = 'pack-'
+
+# 1ページに表示する件数の既定値
+DEFAULT_PAGE_SIZE = 20
+
+# プレビューで取り出す値（mcpServers.filesystem.argsの最後の要素）
+_PREVIEW_KEYS = ['mcpServers', 'filesystem', 'args', -1]
+
+# 履歴の1件（id: バックアップID, timestamp: 作成日時, source: 形式, size: 保存サイズ,
+# ref: 通常形式では内容のハッシュ、パック形式では版の番号）
+HistoryEntry = namedtuple('HistoryEntry', ['id', 'timestamp', 'source', 'size', 'ref'])
+
+
+def _preview_of(document):
+    """設定データからfilesystemのパスを取り出します（取り出せない場合はNone）"""
+    try:
+        path = document['mcpServers']['filesystem']['args'][-1]
+    except (KeyError, IndexError, TypeError):
+        return None
+    return path if isinstance(path, str) else None
+
+
+def _file_signature(path):
+    """ファイルの変更を検出するための値（更新時刻とサイズ）を返します"""
+    try:
+        stat_result = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat_result.st_mtime_ns, stat_result.st_size
+
+
+class BackupHistory:
+    """設定ファイルのバックアップ履歴"""
+
+    def __init__(self, config_path):
+        """
+        初期化メソッド
+
+        Args:
+            config_path (str or Path): 設定ファイルのパス（バックアップは同じディレクトリのbackup内）
+        """
+        self.config_path = Path(config_path)
+        self.backup_dir = self.config_path.parent / 'backup'
+        self.store = BackupStore(self.backup_dir)
+        self.pack = BackupPack(self.backup_dir)
+        self._entries = []
+        self._signature = None
+        self._previews = {}
+        self._imported = False
+
+    def entries(self):
+        """
+        すべてのバックアップを新しい順に返します。
+
+        最初の呼び出しでは、ストア導入前のバックアップをカタログに取り込みます（取り込みは
+        バックアップディレクトリごとに一度だけ行われます）。結果はインデックスファイルが
+        変更されるまでキャッシュされます。
+
+        Returns:
+            list: HistoryEntryのリスト
+        """
+        if not self._imported:
+            self.store.import_legacy()
+            self._imported = True
+        signature = (_file_signature(self.store.index_path), _file_signature(self.pack.index_path))
+        if signature != self._signature:
+            self._entries = self._read_entries()
+            self._signature = signature
+        return self._entries
+
+    def _read_entries(self):
+        """カタログとパックのインデックスから一覧を作ります"""
+        entries = []
+        for entry in self.store.entries():
+            moment = entry_time(entry)
+            if moment is not None:
+                entries.append(HistoryEntry(entry.id, moment, SOURCE_STORE, entry.size, entry.digest))
+        for entry in self.pack.entries():
+            entries.append(HistoryEntry(f"{PACK_ID_PREFIX}{entry.number}", datetime.fromtimestamp(entry.timestamp),
+                                        SOURCE_PACK, entry.size, entry.number))
+        # 同じ時刻のものは記録された順を保つ
+        entries.reverse()
+        entries.sort(key=lambda entry: entry.timestamp, reverse=True)
+        return entries
+
+    def count(self):
+        """バックアップの件数を返します"""
+        return len(self.entries())
+
+    def page_count(self, page_size=DEFAULT_PAGE_SIZE):
+        """ページ数を返します（バックアップがない場合も1）"""
+        return max(1, -(-self.count() // page_size))
+
+    def page(self, number, page_size=DEFAULT_PAGE_SIZE):
+        """
+        指定したページのバックアップを返します。
+
+        Args:
+            number (int): ページ番号（1から）
+            page_size (int): 1ページの件数
+
+        Returns:
+            list: HistoryEntryのリスト（新しい順）
+        """
+        start = (max(1, number) - 1) * page_size
+        return self.entries()[start:start + page_size]
+
+    def find(self, backup_id):
+        """
+        IDを指定してバックアップを探します。
+
+        Args:
+            backup_id (str): バックアップID
+
+        Returns:
+            HistoryEntry: 見つかったバックアップ。存在しない場合はNone。
+        """
+        for entry in self.entries():
+            if entry.id == backup_id:
+                return entry
+        return None
+
+    def previews(self, entries):
+        """
+        各バックアップのfilesystemのパスを返します。
+
+        通常形式は本体の該当部分だけを解析し、パック形式は連続した版をまとめて復元します。
+        取り出した値はキャッシュされます（バックアップの内容は変わらないため）。
+
+        Args:
+            entries (list): HistoryEntryのリスト
+
+        Returns:
+            dict: IDをキー、パス（取り出せない場合はNone）を値とする辞書
+        """
+        pending = [entry for entry in entries if (entry.source, entry.ref) not in self._previews]
+
+        for entry in pending:
+            if entry.source == SOURCE_STORE:
+                try:
+                    value = lazyjson.extract(self.store.blob_path(entry.ref), _PREVIEW_KEYS)
+                except (OSError, ValueError, KeyError, IndexError, TypeError):
+                    value = None
+                self._previews[(entry.source, entry.ref)] = value if isinstance(value, str) else None
+
+        numbers = [entry.ref for entry in pending if entry.source == SOURCE_PACK]
+        if numbers:
+            wanted = set(numbers)
+            for number, document in self.pack.iter_versions(min(numbers), max(numbers) + 1):
+                if number in wanted:
+                    self._previews[(SOURCE_PACK, number)] = _preview_of(document)
+
+        return {entry.id: self._previews.get((entry.source, entry.ref)) for entry in entries}
+
+    def load(self, entry):
+        """
+        バックアップの内容を読み込みます。
+
+        Args:
+            entry (HistoryEntry): バックアップ
+
+        Returns:
+            dict: 設定データ
+        """
+        if entry.source == SOURCE_PACK:
+            return self.pack.restore_version(entry.ref)
+        return json.loads(self.store.read(entry.ref))
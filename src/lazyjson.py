@@ -0,0 +1,433 @@
+"""
+遅延JSONアクセスモジュール。
+JSON文書全体を解析せずに、指定したキーの値の位置を特定して取り出します。
+
+ファイルはmmapで開き、先頭から必要な分だけを段階的にデコードします。目的の値が
+見つかった時点で処理を打ち切るため、それより後ろの部分は読み込まれません（その場合、
+余分なデータがないことは、ファイルの末尾が最上位の値の閉じ括弧であることだけで確認します）。
+目的の値より前にある兄弟要素は、括弧の対応と文字列の終わりだけをたどって読み飛ばし、
+値のオブジェクトは作りません。
+"""
+
+import json
+import json.decoder
+import mmap
+import re
+
+from . import parse_cache
+
+
+# 最初にデコードする先頭部分の大きさ（バイト）。この範囲に値がなければファイル全体をデコードする
+INITIAL_WINDOW = 64 * 1024
+
+# 空白
+_WHITESPACE = re.compile(r'[ \t\r\n]*')
+
+# 文字列（エスケープされた引用符を含む）
+_STRING = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+
+# 数値・true・false・null
+_SCALAR = re.compile(r'-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][-+]?[0-9]+)?|true|false|null')
+
+# 括弧
+_BRACKETS = '{}[]'
+
+# 開き括弧と対応する閉じ括弧
+_CLOSING = {'{': '}', '[': ']'}
+
+# 末尾の空白を確認するときに一度に読む大きさ（バイト）
+_TAIL_CHUNK = 4096
+
+_decoder = json.JSONDecoder()
+_scanstring = json.decoder.scanstring
+
+
+class _Truncated(Exception):
+    """デコード済みの範囲の終端に達したことを表す内部例外"""
+
+
+class _Brackets:
+    """
+    括弧の次の位置を探すクラス
+
+    括弧の種類ごとに str.find で探した次の位置を覚えておき、読み進めて通り過ぎた種類だけを
+    探し直すため、文書全体を1回たどる間に各文字を調べる回数はおよそ1回になります。
+    """
+
+    __slots__ = ('text', '_position', '_next')
+
+    def __init__(self, text):
+        self.text = text
+        self._position = len(text)
+        self._next = []
+
+    def next(self, position):
+        """
+        position以降で最初の括弧の位置を返します。
+
+        Raises:
+            _Truncated: 括弧がない場合
+        """
+        text = self.text
+        found = self._next
+        if position < self._position:
+            # 戻って読む場合は探し直す
+            found[:] = [_find(text, character, position) for character in _BRACKETS]
+        self._position = position
+        nearest = min(found)
+        while nearest < position:
+            kind = found.index(nearest)
+            index = text.find(_BRACKETS[kind], position)
+            found[kind] = len(text) if index < 0 else index
+            nearest = min(found)
+        if nearest >= len(text):
+            raise _Truncated()
+        return nearest
+
+
+def _find(text, character, position):
+    """文字の位置を返します（ない場合は文書の長さ）"""
+    index = text.find(character, position)
+    return len(text) if index < 0 else index
+
+
+def _skip_whitespace(text, position):
+    """空白を読み飛ばした位置を返します"""
+    return _WHITESPACE.match(text, position).end()
+
+
+def _expect(text, position, characters):
+    """指定した文字のいずれかがあることを確認して、その文字を返します"""
+    if position >= len(text):
+        raise _Truncated()
+    character = text[position]
+    if character not in characters:
+        expected = ' または '.join(repr(c) for c in characters)
+        raise json.JSONDecodeError(f"{expected} が必要です", text, position)
+    return character
+
+
+def _skip_string(text, position):
+    """文字列を1つ読み飛ばし、その直後の位置を返します"""
+    match = _STRING.match(text, position)
+    if match is None:
+        raise _Truncated()
+    return match.end()
+
+
+def _count_quotes(text, start, end):
+    """範囲内の、エスケープされていない引用符の数を返します"""
+    count = text.count('"', start, end)
+    if count and '\\"' in text[start:end]:
+        # 直前の連続したバックスラッシュが奇数個の引用符だけがエスケープされている
+        sign, length = 1, 1
+        while True:
+            escaped = text.count('\\' * length + '"', start, end)
+            if not escaped:
+                break
+            count -= sign * escaped
+            sign, length = -sign, length + 1
+    return count
+
+
+def _skip_value(text, position, brackets):
+    """
+    値を1つ読み飛ばし、その直後の位置を返します。
+
+    値のオブジェクトは作らず、オブジェクト・配列の中の構文は括弧の対応だけを確認します。
+    """
+    if position >= len(text):
+        raise _Truncated()
+    character = text[position]
+    if character == '"':
+        return _skip_string(text, position)
+    if character not in _CLOSING:
+        match = _SCALAR.match(text, position)
+        if match is None:
+            raise json.JSONDecodeError("値が必要です", text, position)
+        return match.end()
+    return _skip_containers(text, position + 1, [_CLOSING[character]], brackets)
+
+
+def _skip_containers(text, position, closing, brackets):
+    """
+    開いているオブジェクト・配列の残りを読み飛ばし、すべてが閉じた直後の位置を返します。
+
+    括弧だけを探し、その手前の引用符の数の偶奇で文字列の中の括弧かどうかを判定します。
+
+    Args:
+        text (str): 文書
+        position (int): 読み始める位置
+        closing (list): 開いているオブジェクト・配列の閉じ括弧（内側が末尾）
+        brackets (_Brackets): 括弧の検索
+    """
+    quotes = 0
+    while closing:
+        bracket = brackets.next(position)
+        quotes += _count_quotes(text, position, bracket)
+        position = bracket + 1
+        if quotes % 2:
+            # 文字列の中の括弧
+            continue
+        character = text[bracket]
+        if character in _CLOSING:
+            closing.append(_CLOSING[character])
+        elif character == closing[-1]:
+            closing.pop()
+        else:
+            raise json.JSONDecodeError("括弧が対応していません", text, bracket)
+    return position
+
+
+def _root(text):
+    """文書の最上位の値の先頭位置を返します"""
+    return _skip_whitespace(text, 1 if text.startswith('\ufeff') else 0)
+
+
+def _find_member(text, position, key, brackets):
+    """オブジェクトからキーに対応する値の先頭位置を探します"""
+    if _expect(text, position, '{[') != '{':
+        raise KeyError(key)
+    position = _skip_whitespace(text, position + 1)
+    if _expect(text, position, '"}') == '}':
+        raise KeyError(key)
+
+    while True:
+        _expect(text, position, '"')
+        try:
+            name, position = _scanstring(text, position + 1)
+        except json.JSONDecodeError:
+            raise _Truncated()
+        position = _skip_whitespace(text, position)
+        _expect(text, position, ':')
+        value_start = _skip_whitespace(text, position + 1)
+        if name == key:
+            return value_start
+
+        position = _skip_whitespace(text, _skip_value(text, value_start, brackets))
+        if _expect(text, position, ',}') == '}':
+            raise KeyError(key)
+        position = _skip_whitespace(text, position + 1)
+
+
+def _find_element(text, position, index, brackets):
+    """配列からインデックスに対応する要素の先頭位置を探します（負のインデックスも可）"""
+    if _expect(text, position, '{[') != '[':
+        raise KeyError(index)
+    position = _skip_whitespace(text, position + 1)
+    if position >= len(text):
+        raise _Truncated()
+    if text[position] == ']':
+        raise IndexError(index)
+
+    starts = []
+    while True:
+        if index >= 0 and len(starts) == index:
+            return position
+        starts.append(position)
+        position = _skip_whitespace(text, _skip_value(text, position, brackets))
+        if _expect(text, position, ',]') == ']':
+            break
+        position = _skip_whitespace(text, position + 1)
+
+    try:
+        return starts[index]
+    except IndexError:
+        raise IndexError(index)
+
+
+def _locate(text, keys, complete=True):
+    """
+    デコード済みの範囲で値の位置を特定します。
+
+    completeがTrueの場合は、文書の全体として最上位の値の後ろに余分なデータがないことも確認します。
+    """
+    brackets = _Brackets(text)
+    position = _root(text)
+    # たどったオブジェクト・配列の閉じ括弧
+    closing = []
+    for key in keys:
+        opening = text[position:position + 1]
+        if isinstance(key, int):
+            position = _find_element(text, position, key, brackets)
+        else:
+            position = _find_member(text, position, key, brackets)
+        closing.append(_CLOSING[opening])
+    end = _skip_value(text, position, brackets)
+    # 数値などは範囲の終端で切れている可能性がある
+    if end >= len(text):
+        raise _Truncated()
+    if complete:
+        # 残りを読み飛ばし、最上位の値の後ろに余分なデータがないことを確認する
+        rest = _skip_whitespace(text, _skip_containers(text, end, closing, brackets))
+        if rest < len(text):
+            raise json.JSONDecodeError("余分なデータがあります", text, rest)
+    return position, end
+
+
+def locate(text, keys):
+    """
+    キーの列で指定した値の位置を特定します。
+
+    Args:
+        text (str): JSON文書全体
+        keys (list): キー（文字列）または配列のインデックス（整数）の列
+
+    Returns:
+        tuple: 値の (開始位置, 終了位置)（文字単位）
+
+    Raises:
+        KeyError: キーが存在しない場合
+        IndexError: インデックスが範囲外の場合
+        json.JSONDecodeError: 文書が不正な場合（最上位の値の後ろに余分なデータがある場合を含む）
+    """
+    try:
+        # 末尾の値が終端で切れていないことを判定できるよう、空白を1つ補う
+        return _locate(text + ' ', keys)
+    except _Truncated:
+        raise json.JSONDecodeError("文書が途中で終わっています", text, len(text))
+
+
+def _decode_prefix(buffer, size):
+    """先頭sizeバイトを、マルチバイト文字の途中で切らないようにデコードします"""
+    if size >= len(buffer):
+        return buffer[:].decode('utf-8-sig')
+    # UTF-8の継続バイト（0b10xxxxxx）の手前まで戻す
+    while size > 0 and buffer[size] & 0xC0 == 0x80:
+        size -= 1
+    return buffer[:size].decode('utf-8-sig')
+
+
+def _last_byte(buffer):
+    """末尾の空白を除いた最後の1バイトを返します（すべて空白の場合は空）"""
+    end = len(buffer)
+    while end > 0:
+        chunk = buffer[max(0, end - _TAIL_CHUNK):end].rstrip(b' \t\r\n')
+        if chunk:
+            return chunk[-1:]
+        end -= _TAIL_CHUNK
+    return b''
+
+
+class LazyDocument:
+    """必要な値だけを取り出すための、JSONファイルの遅延ビュー"""
+
+    def __init__(self, path):
+        """
+        初期化メソッド
+
+        Args:
+            path (str or Path): JSONファイルのパス
+        """
+        self.path = path
+        self._file = None
+        self._buffer = None
+        self._text = ''
+        self._complete = False
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def open(self):
+        """
+        ファイルをmmapで開きます。
+
+        Raises:
+            FileNotFoundError: ファイルが存在しない場合
+            json.JSONDecodeError: ファイルが空の場合
+        """
+        if self._buffer is not None:
+            return
+        self._file = open(self.path, 'rb')
+        try:
+            self._buffer = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            self._file = None
+            raise json.JSONDecodeError("ファイルが空です", '', 0)
+
+    def close(self):
+        """ファイルを閉じます"""
+        if self._buffer is not None:
+            self._buffer.close()
+            self._buffer = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def span(self, keys):
+        """
+        値の位置を返します。必要に応じてデコードする範囲を広げます。
+
+        Args:
+            keys (list): キーまたはインデックスの列
+
+        Returns:
+            tuple: 値の (開始位置, 終了位置)（デコード済みの文字列上の文字単位）
+        """
+        self.open()
+        if not self._text:
+            self._text = _decode_prefix(self._buffer, INITIAL_WINDOW)
+            self._complete = len(self._buffer) <= INITIAL_WINDOW
+        if not self._complete:
+            try:
+                span = _locate(self._text, keys, complete=False)
+            except (_Truncated, json.JSONDecodeError):
+                # 先頭部分で見つからなければ、全体をデコードして最初からやり直す
+                # （やり直しの無駄は先頭部分の大きさまでに抑えられる）
+                self._text = _decode_prefix(self._buffer, len(self._buffer))
+                self._complete = True
+            else:
+                # 残りは読まないため、最上位の値がファイルの末尾で閉じていることだけを確認する
+                root = _root(self._text)
+                closing = _CLOSING.get(self._text[root], '').encode('ascii')
+                if closing and _last_byte(self._buffer) != closing:
+                    raise json.JSONDecodeError("余分なデータがあるか、文書が途中で終わっています",
+                                               self._text, len(self._text))
+                return span
+        return locate(self._text, keys)
+
+    def get(self, keys):
+        """
+        値を取り出します。取り出した部分だけが解析されます。
+
+        Args:
+            keys (list): キーまたはインデックスの列
+
+        Returns:
+            値
+
+        Raises:
+            KeyError: キーが存在しない場合
+            IndexError: インデックスが範囲外の場合
+        """
+        start, _ = self.span(keys)
+        return _decoder.raw_decode(self._text, start)[0]
+
+    def materialize(self):
+        """
+        文書全体を解析して返します。書き込みのために完全な設定データが必要な場合に使います。
+
+        Returns:
+            dict: 設定データ
+        """
+        return parse_cache.default_cache.load(self.path)
+
+
+def extract(path, keys):
+    """
+    JSONファイルから指定した値だけを取り出します。
+
+    Args:
+        path (str or Path): JSONファイルのパス
+        keys (list): キーまたはインデックスの列
+
+    Returns:
+        値
+    """
+    with LazyDocument(path) as document:
+        return document.get(keys)
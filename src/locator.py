@@ -0,0 +1,178 @@
+"""
+設定ファイルの場所を解決するモジュール。
+OSごとの候補パスの存在確認を1か所にまとめ、結果を有効期限つきでキャッシュします。
+
+ネットワーク上のプロファイル（SMBなど）では1回のstatに時間がかかることがあるため、
+キャッシュされていない候補はスレッドで並行して確認します。
+"""
+
+import os
+import platform
+import threading
+import time
+from pathlib import Path
+
+
+CONFIG_FILENAME = 'claude_desktop_config.json'
+
+# 存在する（positive）・存在しない（negative）という結果をキャッシュする秒数
+DEFAULT_TTL = 30.0
+DEFAULT_NEGATIVE_TTL = 5.0
+
+# 並行してstatを行うスレッド数の上限
+DEFAULT_MAX_WORKERS = 8
+
+
+def candidate_paths(system=None):
+    """
+    OSごとの設定ファイルの候補パスを、優先度の高い順に返します。
+
+    先頭の候補は、どれも存在しない場合の既定のパスとして使われます。
+
+    Args:
+        system (str, optional): platform.system()の値。Noneの場合は実行中のOS。
+
+    Returns:
+        list: Pathのリスト
+    """
+    system = system or platform.system()
+    home_dir = Path(os.path.expanduser('~'))
+
+    if system == 'Windows':
+        appdata = Path(os.environ.get('APPDATA', ''))
+        localappdata = Path(os.environ.get('LOCALAPPDATA', ''))
+        directories = [
+            appdata / 'Claude',  # 新しいパス形式
+            appdata / 'Claude Desktop',  # 以前の形式
+            home_dir / 'AppData' / 'Roaming' / 'Claude',  # 明示的なパス
+            localappdata / 'Claude',
+            localappdata / 'Claude Desktop',
+        ]
+    elif system == 'Darwin':
+        directories = [
+            home_dir / 'Library' / 'Application Support' / 'Claude',
+            home_dir / 'Library' / 'Application Support' / 'Claude Desktop',
+        ]
+    else:
+        directories = [
+            home_dir / '.config' / 'Claude',
+            home_dir / '.config' / 'Claude Desktop',
+        ]
+
+    # 環境変数が未設定の場合などに同じパスが重複しないようにする
+    paths = []
+    for directory in directories:
+        path = directory / CONFIG_FILENAME
+        if path not in paths:
+            paths.append(path)
+    return paths
+
+
+class ConfigLocator:
+    """候補パスの存在確認の結果をキャッシュする、設定ファイルの場所の解決器"""
+
+    def __init__(self, candidates=candidate_paths, ttl=DEFAULT_TTL, negative_ttl=DEFAULT_NEGATIVE_TTL,
+                 max_workers=DEFAULT_MAX_WORKERS, clock=time.monotonic):
+        """
+        初期化メソッド
+
+        Args:
+            candidates (callable): 候補パスのリストを返す関数（呼び出しごとに環境変数を反映する）
+            ttl (float): 存在するという結果をキャッシュする秒数
+            negative_ttl (float): 存在しないという結果をキャッシュする秒数
+            max_workers (int): 並行してstatを行うスレッド数の上限
+            clock (callable): 現在時刻（秒）を返す関数
+        """
+        self.candidates = candidates
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_workers = max_workers
+        self.clock = clock
+        self.stats = 0
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def find(self):
+        """
+        存在する最初の候補パスを返します。
+
+        Returns:
+            Path: 見つかった設定ファイルのパス、見つからない場合はNone
+        """
+        paths = self.candidates()
+        found = self._exists_many(paths)
+        for path in paths:
+            if found[path]:
+                return path
+        return None
+
+    def resolve(self):
+        """
+        設定ファイルのパスを返します。どの候補も存在しない場合は先頭の候補を返します。
+
+        Returns:
+            Path: 設定ファイルのパス
+        """
+        return self.find() or self.candidates()[0]
+
+    def exists(self, path):
+        """
+        パスが存在するかを、キャッシュを使って返します。
+
+        Args:
+            path (str or Path): 確認するパス
+
+        Returns:
+            bool: 存在するかどうか
+        """
+        path = Path(path)
+        return self._exists_many([path])[path]
+
+    def invalidate(self, path=None):
+        """
+        キャッシュを破棄します。ファイルを作成・削除・移動した後に呼び出してください。
+
+        Args:
+            path (str or Path, optional): 破棄するパス。Noneの場合はすべて破棄。
+        """
+        with self._lock:
+            if path is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(Path(path), None)
+
+    def _exists_many(self, paths):
+        """複数のパスの存在を確認します（期限切れ・未確認のものだけを並行してstatする）"""
+        now = self.clock()
+        results = {}
+        missing = []
+        with self._lock:
+            for path in paths:
+                entry = self._cache.get(path)
+                if entry is not None and entry[1] > now:
+                    results[path] = entry[0]
+                else:
+                    missing.append(path)
+
+        if len(missing) == 1:
+            checked = [os.path.exists(missing[0])]
+        elif missing:
+            # 起動時間を短くするため、並行して確認が必要になったときに読み込む
+            from concurrent.futures import ThreadPoolExecutor
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(missing))) as executor:
+                checked = list(executor.map(os.path.exists, missing))
+        else:
+            return results
+
+        now = self.clock()
+        with self._lock:
+            self.stats += len(missing)
+            for path, exists in zip(missing, checked):
+                expires = now + (self.ttl if exists else self.negative_ttl)
+                self._cache[path] = (exists, expires)
+                results[path] = exists
+        return results
+
+
+# アプリケーション全体で共有する解決器
+default_locator = ConfigLocator()
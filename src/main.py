@@ -3,54 +3,178 @@
 アプリケーションのエントリーポイントです。
 """
 
-import tkinter as tk
 import sys
 import argparse
-import os
-from pathlib import Path
 
-# GUI関連のインポート
-from . import gui
-from . import config
+from . import startup
 
-def parse_arguments():
+# バックアップ形式の選択肢（config.BACKUP_MODE_STORE, config.BACKUP_MODE_PACKと同じ値）。
+# --helpの表示でconfigを読み込まないよう、ここで定義する
+BACKUP_MODES = ('store', 'pack')
+
+
+def parse_arguments(argv=None):
     """
     コマンドライン引数を解析します。
     
+    Args:
+        argv (list, optional): 解析する引数のリスト。Noneの場合はsys.argvを使用。
+    
     Returns:
         argparse.Namespace: 解析された引数
     """
     parser = argparse.ArgumentParser(description='Claude Desktop 設定エディタ')
     parser.add_argument('--config', type=str, help='設定ファイルのパス')
     parser.add_argument('--no-backup', action='store_true', help='バックアップを作成しない')
+    parser.add_argument('--backup-mode', choices=BACKUP_MODES,
+                        default=None, help='バックアップ形式（store: ファイルごと / pack: 差分を圧縮）')
+    parser.add_argument(startup.TRACE_OPTION, action='store_true',
+                        help='モジュールごとのインポート時間を標準エラー出力に表示する')
+    parser.add_argument('--list-backups', action='store_true', help='設定ファイルのバックアップを新しい順に表示する')
+    parser.add_argument('--page', type=int, default=1, help='--list-backupsで表示するページ（既定: 1）')
+    parser.add_argument('--page-size', type=int, default=20, help='--list-backupsの1ページの件数（既定: 20）')
+    parser.add_argument('--restore', metavar='ID', help='指定したIDのバックアップを設定ファイルに書き戻す')
+    parser.add_argument('--diff', nargs='+', metavar='ID',
+                        help='バックアップから現在の設定ファイルへの違いを表示する（2つ指定するとその間の違い）')
+    parser.add_argument('--profile', action='store_true',
+                        help='終了時に設定ファイルの操作の処理時間の内訳を標準エラー出力に表示する')
+    
+    # GUIを起動しないサブコマンド（--startup-traceはサブコマンドの後ろにも書ける）
+    subparsers = parser.add_subparsers(dest='command')
+    trace_parent = argparse.ArgumentParser(add_help=False)
+    trace_parent.add_argument(startup.TRACE_OPTION, action='store_true', default=argparse.SUPPRESS,
+                              help='モジュールごとのインポート時間を標準エラー出力に表示する')
+    
+    batch_parser = subparsers.add_parser('batch', parents=[trace_parent], help='複数の設定ファイルのパスを一括で変更する')
+    batch_parser.add_argument('files', nargs='+', help='設定ファイルのパスまたはglobパターン')
+    batch_parser.add_argument('--path', required=True, help='新しく設定するパス')
+    batch_parser.add_argument('--workers', type=int, default=None, help='ワーカープロセス数（既定: CPU数）')
+    batch_parser.add_argument('--no-backup', action='store_true', default=argparse.SUPPRESS,
+                              help='バックアップを作成しない')
+    
+    txn_parser = subparsers.add_parser('txn', parents=[trace_parent], help='複数の設定ファイルのパスを、すべて変更するか1つも変更しないかで変更する')
+    txn_parser.add_argument('files', nargs='+', help='設定ファイルのパスまたはglobパターン')
+    txn_parser.add_argument('--path', required=True, help='新しく設定するパス')
+    txn_parser.add_argument('--workers', type=int, default=None, help='準備を並行して行うスレッド数')
+    txn_parser.add_argument('--no-backup', action='store_true', default=argparse.SUPPRESS,
+                            help='バックアップを作成しない')
+    
+    daemon_parser = subparsers.add_parser('daemon', parents=[trace_parent], help='設定ファイルの解析結果を保持して依頼に答えるデーモンを起動する')
+    daemon_parser.add_argument('--socket', default=None, help='待ち受けるソケットのパスまたは名前付きパイプの名前')
+    daemon_parser.add_argument('--no-backup', action='store_true', default=argparse.SUPPRESS,
+                               help='setで保存する前にバックアップを作成しない')
+    
+    client_parser = subparsers.add_parser('client', parents=[trace_parent], help='起動中のデーモンに値の読み取り・変更・検証を依頼する')
+    client_parser.add_argument('action', choices=('get', 'set', 'validate', 'ping', 'stats', 'stop'),
+                               help='依頼する処理')
+    client_parser.add_argument('--selector', default=None,
+                               help='値の位置（既定: mcpServers.filesystem.args[-1]）')
+    client_parser.add_argument('--value', default=None, help='setで設定する値')
+    client_parser.add_argument('--socket', default=None, help='デーモンのソケットのパスまたは名前付きパイプの名前')
+    
+    verify_parser = subparsers.add_parser('verify-backups', parents=[trace_parent], help='バックアップの破損を検査し、チェックサムのマニフェストを更新する')
+    verify_parser.add_argument('dirs', nargs='*', help='バックアップディレクトリ（既定: 設定ファイルのバックアップ）')
+    verify_parser.add_argument('--full', action='store_true', help='前回から変更のないファイルも含めてすべて検査する')
+    verify_parser.add_argument('--workers', type=int, default=None, help='ワーカープロセス数（既定: CPU数）')
+    
+    validate_parser = subparsers.add_parser('validate', parents=[trace_parent], help='設定ファイルを検証し、すべての違反を表示する')
+    validate_parser.add_argument('files', nargs='+', help='設定ファイルのパスまたはglobパターン')
     
-    return parser.parse_args()
+    return parser.parse_args(argv)
 
 
-def main():
+def main(argv=None):
     """
     アプリケーションのメインエントリーポイント
+
+    起動を速くするため、tkinterとGUIはGUIを起動する場合にだけ読み込みます。
+    サブコマンドでは読み込まれません。
+
+    Args:
+        argv (list, optional): コマンドライン引数。Noneの場合はsys.argvを使用。
+
+    Returns:
+        int: 終了コード
     """
-    # コマンドライン引数の解析
-    args = parse_arguments()
-    
+    # 引数の解析より前に計測を始め、以降のインポートをすべて記録する
+    tracer = startup.start_trace(argv)
+    try:
+        # コマンドライン引数の解析
+        args = parse_arguments(argv)
+
+        # クライアントは設定処理のモジュールを読み込まずにデーモンへ依頼する
+        if args.command == 'client':
+            from . import daemon_client
+            return daemon_client.run_client_command(args)
+
+        if args.profile:
+            import atexit
+            from . import tracing
+            tracing.enable()
+            atexit.register(tracing.print_report)
+
+        from . import config
+        if args.backup_mode:
+            config.DEFAULT_BACKUP_MODE = args.backup_mode
+
+        # サブコマンドが指定された場合はGUIを起動しない
+        if args.command == 'batch':
+            from . import cli
+            return cli.run_batch_command(args)
+        if args.command == 'txn':
+            from . import cli
+            return cli.run_txn_command(args)
+        if args.command == 'daemon':
+            from . import daemon
+            return daemon.run_daemon_command(args)
+        if args.command == 'verify-backups':
+            from . import cli
+            return cli.run_verify_command(args)
+        if args.command == 'validate':
+            from . import cli
+            return cli.run_validate_command(args)
+        if args.list_backups:
+            from . import cli
+            return cli.run_list_backups_command(args)
+        if args.diff:
+            from . import cli
+            return cli.run_diff_command(args)
+        if args.restore:
+            from . import cli
+            return cli.run_restore_command(args)
+
+        root, app = _create_window(args)
+    finally:
+        startup.finish_trace(tracer)
+
+    # メインループの実行
+    root.mainloop()
+    return 0
+
+
+def _create_window(args):
+    """
+    ルートウィンドウとアプリを作成します。
+
+    Args:
+        args (argparse.Namespace): 解析された引数
+
+    Returns:
+        tuple: (ルートウィンドウ, ConfigEditorApp)
+    """
+    import tkinter as tk
+    from . import gui
+
     # tkinterのルートウィンドウを作成
     root = tk.Tk()
     # アイコンファイルがまだ存在しないためコメントアウト
     # root.iconbitmap(default=os.path.join(os.path.dirname(__file__), '../assets/icon.ico'))
-    
-    # アプリのインスタンスを作成
-    app = gui.ConfigEditorApp(root)
-    
-    # コマンドライン引数から設定ファイルのパスが指定されている場合
-    if args.config:
-        app.config_path_var.set(args.config)
-        app.load_config()
-    
-    # メインループの実行
-    root.mainloop()
+
+    # アプリのインスタンスを作成（コマンドライン引数で指定された設定ファイルを最初に読み込む）
+    app = gui.ConfigEditorApp(root, config_path=args.config)
+    return root, app
 
 
 if __name__ == "__main__":
     # モジュールとして実行された場合
-    main()
+    sys.exit(main())
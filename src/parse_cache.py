@@ -0,0 +1,143 @@
+"""
+解析結果キャッシュモジュール。
+設定ファイルの解析結果を、ファイルの状態（更新時刻・サイズ・inode）と組にして保持し、
+変更されていないファイルの再解析を省略します。
+"""
+
+import json
+import os
+import threading
+from collections import OrderedDict
+
+
+# キャッシュが保持するファイルの合計サイズの既定の上限（バイト）
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def clone(value):
+    """
+    JSONの値を複製します。
+
+    JSONの値は辞書・リスト・不変なスカラー値のみで構成されるため、
+    copy.deepcopyより高速に複製できます。
+
+    Args:
+        value: 複製する値
+
+    Returns:
+        複製された値
+    """
+    if type(value) is dict:
+        return {key: clone(item) for key, item in value.items()}
+    if type(value) is list:
+        return [clone(item) for item in value]
+    return value
+
+
+def _file_key(stat_result):
+    """ファイルの変更を検出するためのキーを作ります"""
+    return (stat_result.st_mtime_ns, stat_result.st_size, stat_result.st_ino)
+
+
+class ParseCache:
+    """ファイルの状態で検証する、LRU方式の解析結果キャッシュ"""
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        初期化メソッド
+
+        Args:
+            max_bytes (int): 保持するファイルの合計サイズの上限（バイト）
+        """
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    def load(self, path):
+        """
+        設定ファイルを読み込みます。変更されていなければキャッシュから返します。
+
+        返される値は常に複製のため、呼び出し元が変更してもキャッシュには影響しません。
+
+        Args:
+            path (str or Path): 設定ファイルのパス
+
+        Returns:
+            dict: 設定データ
+
+        Raises:
+            FileNotFoundError: 設定ファイルが見つからない場合
+            json.JSONDecodeError: JSONの解析エラーがある場合
+        """
+        return clone(self.load_shared(path))
+
+    def load_shared(self, path):
+        """
+        設定ファイルを読み込み、キャッシュ内の値をそのまま返します。
+
+        返される値は変更してはいけません（読み取り専用の呼び出し元向け）。
+
+        Args:
+            path (str or Path): 設定ファイルのパス
+
+        Returns:
+            dict: 設定データ（共有）
+        """
+        resolved = os.path.realpath(path)
+        key = _file_key(os.stat(resolved))
+
+        with self._lock:
+            entry = self._entries.get(resolved)
+            if entry is not None and entry[0] == key:
+                self._entries.move_to_end(resolved)
+                self.hits += 1
+                return entry[1]
+
+        with open(resolved, 'rb') as file:
+            data = file.read()
+        document = json.loads(data)
+
+        with self._lock:
+            self.misses += 1
+            self._store(resolved, key, document, len(data))
+        return document
+
+    def invalidate(self, path=None):
+        """
+        キャッシュを破棄します。
+
+        Args:
+            path (str or Path, optional): 破棄するファイルのパス。Noneの場合はすべて破棄。
+        """
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+                self._total_bytes = 0
+                return
+            entry = self._entries.pop(os.path.realpath(path), None)
+            if entry is not None:
+                self._total_bytes -= entry[2]
+
+    def __len__(self):
+        """キャッシュされているファイル数を返します"""
+        return len(self._entries)
+
+    def _store(self, resolved, key, document, size):
+        """エントリを追加し、上限を超えた分を古いものから破棄します"""
+        previous = self._entries.pop(resolved, None)
+        if previous is not None:
+            self._total_bytes -= previous[2]
+        if size > self.max_bytes:
+            return
+        self._entries[resolved] = (key, document, size)
+        self._total_bytes += size
+        while self._total_bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._total_bytes -= evicted[2]
+
+
+# アプリケーション全体で共有するキャッシュ
+default_cache = ParseCache()
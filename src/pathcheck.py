@@ -0,0 +1,143 @@
+"""
+パスの存在確認モジュール。
+到達できないネットワーク共有（UNCパス）へのstatはOSのタイムアウトまで数十秒かかることがあるため、
+存在確認を別スレッドで行い、呼び出し元は決められた時間だけ待ちます。
+確認結果は短い有効期限つきでキャッシュされます。
+"""
+
+import os
+import threading
+import time
+
+
+# 確認結果
+EXISTS = 'exists'      # 存在する
+MISSING = 'missing'    # 存在しない
+TIMEOUT = 'timeout'    # 時間内に応答がない（到達できない共有など）
+
+# 確認を待つ秒数
+DEFAULT_TIMEOUT = 2.0
+
+# 確認結果をキャッシュする秒数
+DEFAULT_TTL = 10.0
+
+
+class _Probe:
+    """実行中の存在確認"""
+
+    __slots__ = ('done', 'verdict')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.verdict = None
+
+
+class PathChecker:
+    """時間制限とキャッシュつきでパスの存在を確認するクラス"""
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT, ttl=DEFAULT_TTL, clock=time.monotonic):
+        """
+        初期化メソッド
+
+        Args:
+            timeout (float): 確認を待つ秒数
+            ttl (float): 確認結果をキャッシュする秒数
+            clock (callable): 現在時刻（秒）を返す関数
+        """
+        self.timeout = timeout
+        self.ttl = ttl
+        self.clock = clock
+        self._cache = {}
+        self._probes = {}
+        self._lock = threading.Lock()
+
+    def cached(self, path):
+        """
+        有効期限内の確認結果を返します。
+
+        Args:
+            path (str): 確認するパス
+
+        Returns:
+            str: EXISTS, MISSING, TIMEOUTのいずれか。キャッシュにない場合はNone。
+        """
+        with self._lock:
+            entry = self._cache.get(path)
+            if entry is not None and entry[1] > self.clock():
+                return entry[0]
+        return None
+
+    def check(self, path, timeout=None):
+        """
+        パスの存在を確認します。最大でtimeout秒だけ待ちます。
+
+        時間内に終わらなかった確認はバックグラウンドで続けられ、終わった時点で
+        キャッシュが更新されます。同じパスの確認が実行中の場合はその結果を待ちます。
+
+        Args:
+            path (str): 確認するパス
+            timeout (float, optional): 待つ秒数。Noneの場合はself.timeout。
+
+        Returns:
+            str: EXISTS, MISSING, TIMEOUTのいずれか
+        """
+        if not path:
+            return MISSING
+        verdict = self.cached(path)
+        if verdict is not None:
+            return verdict
+
+        with self._lock:
+            probe = self._probes.get(path)
+            if probe is None:
+                probe = self._probes[path] = _Probe()
+                # 応答のないstatがプロセスの終了を妨げないよう、デーモンスレッドで実行する
+                threading.Thread(target=self._run_probe, args=(path, probe), name='path-check',
+                                 daemon=True).start()
+
+        if probe.done.wait(self.timeout if timeout is None else timeout):
+            return probe.verdict
+
+        with self._lock:
+            # 確認が終わるまでは、同じパスで再び待たされないようにする
+            if not probe.done.is_set():
+                self._cache[path] = (TIMEOUT, self.clock() + self.ttl)
+        return probe.verdict or TIMEOUT
+
+    def check_async(self, path, callback, timeout=None):
+        """
+        パスの存在を別スレッドで確認し、結果をコールバックに渡します。
+
+        Args:
+            path (str): 確認するパス
+            callback (callable): 確認後に別スレッド上で呼ばれる関数（引数はパスと確認結果）
+            timeout (float, optional): 待つ秒数。Noneの場合はself.timeout。
+        """
+        def run():
+            callback(path, self.check(path, timeout))
+        threading.Thread(target=run, name='path-check-async', daemon=True).start()
+
+    def invalidate(self, path=None):
+        """
+        キャッシュを破棄します。
+
+        Args:
+            path (str, optional): 破棄するパス。Noneの場合はすべて破棄。
+        """
+        with self._lock:
+            if path is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(path, None)
+
+    def _run_probe(self, path, probe):
+        """存在確認を実行します（確認用のスレッド上で実行される）"""
+        try:
+            verdict = EXISTS if os.path.exists(path) else MISSING
+        except Exception:
+            verdict = MISSING
+        with self._lock:
+            probe.verdict = verdict
+            self._cache[path] = (verdict, self.clock() + self.ttl)
+            self._probes.pop(path, None)
+        probe.done.set()
@@ -0,0 +1,167 @@
+"""
+プロファイル保存モジュール。
+プロファイル（名前とパスの組）をSQLiteのファイルに保存し、名前とパスの前方一致で
+インデックスを使って検索します。
+
+データベースは最初の問い合わせまで開かないため、プロファイルの数によらず
+アプリケーションの起動時間は変わりません。
+"""
+
+import os
+import sqlite3
+import threading
+import time
+
+from . import utils
+
+
+# データベースのファイル名
+DATABASE_FILENAME = 'profiles.sqlite3'
+
+# 検索で返す件数の既定値
+DEFAULT_LIMIT = 50
+
+# 前方一致の範囲検索の上限に使う文字（すべての文字より大きい）
+_MAX_CHAR = '\U0010ffff'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS profiles (
+    name TEXT PRIMARY KEY,
+    name_key TEXT NOT NULL,
+    path TEXT NOT NULL,
+    path_key TEXT NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS profiles_name_key ON profiles (name_key);
+CREATE INDEX IF NOT EXISTS profiles_path_key ON profiles (path_key);
+"""
+
+
+def _name_key(name):
+    """名前の検索用キー（大文字・小文字を区別しない）"""
+    return name.casefold()
+
+
+def _path_key(path):
+    """パスの検索用キー（区切り文字をそろえ、大文字・小文字を区別しない）"""
+    return path.replace('\\', '/').casefold()
+
+
+class ProfileStore:
+    """SQLiteによるプロファイルの保存先"""
+
+    def __init__(self, path=None):
+        """
+        初期化メソッド（データベースはまだ開きません）
+
+        Args:
+            path (str or Path, optional): データベースファイルのパス。
+                Noneの場合はアプリケーションデータのディレクトリ内。':memory:'も指定できる。
+        """
+        self.path = path if path is not None else utils.get_app_data_dir() / DATABASE_FILENAME
+        self._connection = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        """データベースを開きます（初回のみ）"""
+        if self._connection is None:
+            if str(self.path) != ':memory:':
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            connection = sqlite3.connect(str(self.path), check_same_thread=False)
+            connection.executescript(_SCHEMA)
+            self._connection = connection
+        return self._connection
+
+    def _query(self, sql, parameters=()):
+        """問い合わせを実行して、すべての行を返します"""
+        with self._lock:
+            return self._connect().execute(sql, parameters).fetchall()
+
+    def _update(self, sql, parameters=()):
+        """更新を実行してコミットし、変更された行数を返します"""
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                return connection.execute(sql, parameters).rowcount
+
+    def save(self, name, path):
+        """
+        プロファイルを保存します。同じ名前のプロファイルは上書きされます。
+
+        Args:
+            name (str): プロファイル名
+            path (str): パス
+        """
+        self._update(
+            "INSERT INTO profiles (name, name_key, path, path_key, updated) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET path = excluded.path, path_key = excluded.path_key, "
+            "updated = excluded.updated",
+            (name, _name_key(name), path, _path_key(path), time.time()))
+
+    def get(self, name):
+        """
+        プロファイルのパスを返します。
+
+        Args:
+            name (str): プロファイル名
+
+        Returns:
+            str: パス。存在しない場合はNone。
+        """
+        rows = self._query("SELECT path FROM profiles WHERE name = ?", (name,))
+        return rows[0][0] if rows else None
+
+    def delete(self, name):
+        """
+        プロファイルを削除します。
+
+        Args:
+            name (str): プロファイル名
+
+        Returns:
+            bool: 削除したかどうか
+        """
+        return self._update("DELETE FROM profiles WHERE name = ?", (name,)) > 0
+
+    def search(self, prefix='', limit=DEFAULT_LIMIT):
+        """
+        名前の前方一致でプロファイルを検索します（大文字・小文字を区別しない）。
+
+        Args:
+            prefix (str): 名前の先頭
+            limit (int): 返す件数の上限
+
+        Returns:
+            list: (名前, パス) のリスト（名前順）
+        """
+        key = _name_key(prefix)
+        return self._query(
+            "SELECT name, path FROM profiles WHERE name_key >= ? AND name_key < ? ORDER BY name_key LIMIT ?",
+            (key, key + _MAX_CHAR, limit))
+
+    def search_path(self, prefix, limit=DEFAULT_LIMIT):
+        """
+        パスの前方一致でプロファイルを検索します。
+
+        Args:
+            prefix (str): パスの先頭（区切り文字は / と \\ のどちらでもよい）
+            limit (int): 返す件数の上限
+
+        Returns:
+            list: (名前, パス) のリスト（パス順）
+        """
+        key = _path_key(prefix)
+        return self._query(
+            "SELECT name, path FROM profiles WHERE path_key >= ? AND path_key < ? ORDER BY path_key LIMIT ?",
+            (key, key + _MAX_CHAR, limit))
+
+    def count(self):
+        """プロファイルの数を返します"""
+        return self._query("SELECT COUNT(*) FROM profiles")[0][0]
+
+    def close(self):
+        """データベースを閉じます"""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
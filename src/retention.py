@@ -0,0 +1,182 @@
+"""
+バックアップ保持ポリシーモジュール。
+保持件数・世代別の間引き（GFS方式）・容量上限に基づいて古いバックアップを整理します。
+整理はバックグラウンドスレッドで実行され、保存処理を待たせることはありません。
+"""
+
+import threading
+import time
+from collections import namedtuple
+from pathlib import Path
+
+from .backup_store import BackupStore, entry_time
+
+
+# 保持ポリシー
+#   keep_last: 無条件に残す最新の件数
+#   hourly/daily/weekly/monthly: 直近の各期間ごとに最新の1件を残す期間数
+#   max_bytes: 残す本体の合計サイズの上限（Noneで無制限）
+RetentionPolicy = namedtuple(
+    'RetentionPolicy',
+    ['keep_last', 'hourly', 'daily', 'weekly', 'monthly', 'max_bytes'],
+    defaults=(50, 24, 30, 12, 12, 50 * 1024 * 1024),
+)
+
+DEFAULT_POLICY = RetentionPolicy()
+
+# 同じバックアップディレクトリを整理する最小間隔（秒）
+DEFAULT_MIN_INTERVAL = 60.0
+
+
+def _bucket_keys(moment):
+    """各世代の期間を表すキーを返します"""
+    year, week, _ = moment.isocalendar()
+    return {
+        'hourly': moment.strftime('%Y%m%d%H'),
+        'daily': moment.strftime('%Y%m%d'),
+        'weekly': f'{year}W{week:02d}',
+        'monthly': moment.strftime('%Y%m'),
+    }
+
+
+def select_entries(entries, policy=DEFAULT_POLICY):
+    """
+    ポリシーに従って残すエントリを選びます。
+
+    Args:
+        entries (list): 古い順に並んだBackupEntryのリスト
+        policy (RetentionPolicy): 保持ポリシー
+
+    Returns:
+        list: 残すエントリ（古い順）
+    """
+    newest_first = list(reversed(entries))
+    keep = set(entry.id for entry in newest_first[:max(1, policy.keep_last)])
+
+    # 世代ごとに、直近の期間から順に各期間の最新エントリを残す
+    for generation in ('hourly', 'daily', 'weekly', 'monthly'):
+        limit = getattr(policy, generation)
+        seen = set()
+        for entry in newest_first:
+            if len(seen) >= limit:
+                break
+            moment = entry_time(entry)
+            if moment is None:
+                continue
+            key = _bucket_keys(moment)[generation]
+            if key not in seen:
+                seen.add(key)
+                keep.add(entry.id)
+
+    kept = [entry for entry in entries if entry.id in keep]
+
+    # 容量上限を超える場合は古いものから外す（最新の1件は必ず残す）
+    if policy.max_bytes is not None:
+        sizes = {}
+        for entry in kept:
+            sizes[entry.digest] = entry.size
+        total = sum(sizes.values())
+        while total > policy.max_bytes and len(kept) > 1:
+            oldest = kept.pop(0)
+            if all(entry.digest != oldest.digest for entry in kept):
+                total -= sizes.pop(oldest.digest)
+
+    return kept
+
+
+def prune(backup_dir, policy=DEFAULT_POLICY):
+    """
+    バックアップディレクトリをポリシーに従って整理します。
+
+    Args:
+        backup_dir (Path): バックアップディレクトリ
+        policy (RetentionPolicy): 保持ポリシー
+
+    Returns:
+        tuple: (削除したエントリ数, 解放したバイト数)
+    """
+    store = BackupStore(backup_dir)
+    entries = store.entries()
+    kept_ids = set(entry.id for entry in select_entries(entries, policy))
+    dropped = [entry.id for entry in entries if entry.id not in kept_ids]
+    freed = store.drop(dropped)
+    return len(dropped), freed
+
+
+class BackgroundPruner:
+    """バックアップの整理をバックグラウンドで実行するクラス"""
+
+    def __init__(self, policy=DEFAULT_POLICY, min_interval=DEFAULT_MIN_INTERVAL):
+        """
+        初期化メソッド
+
+        Args:
+            policy (RetentionPolicy): 保持ポリシー
+            min_interval (float): 同じディレクトリを整理する最小間隔（秒）
+        """
+        self.policy = policy
+        self.min_interval = min_interval
+        self.last_error = None
+        self._pending = set()
+        self._last_run = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def schedule(self, backup_dir):
+        """
+        ディレクトリの整理を予約します。呼び出し元をブロックしません。
+
+        Args:
+            backup_dir (Path): バックアップディレクトリ
+        """
+        with self._lock:
+            self._pending.add(str(Path(backup_dir)))
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='backup-pruner', daemon=True)
+                self._thread.start()
+        self._wakeup.set()
+
+    def _run(self):
+        """予約されたディレクトリを最小間隔を守りながら整理します"""
+        while True:
+            self._wakeup.wait()
+            self._wakeup.clear()
+
+            now = time.monotonic()
+            with self._lock:
+                due = [d for d in self._pending
+                       if now - self._last_run.get(d, float('-inf')) >= self.min_interval]
+                self._pending.difference_update(due)
+                # 整理中に予約されても間隔を守るよう、開始時点で実行時刻を記録する
+                for backup_dir in due:
+                    self._last_run[backup_dir] = now
+                waiting = [self._last_run[d] + self.min_interval - now
+                           for d in self._pending]
+
+            for backup_dir in due:
+                try:
+                    prune(backup_dir, self.policy)
+                except Exception as e:
+                    self.last_error = e
+                with self._lock:
+                    self._last_run[backup_dir] = time.monotonic()
+
+            # 間隔待ちのディレクトリがあれば、その時刻に起きる
+            if waiting:
+                self._wakeup.wait(min(waiting))
+                self._wakeup.set()
+
+
+# アプリケーション全体で共有する整理スレッド
+_pruner = BackgroundPruner()
+
+
+def schedule_prune(backup_dir):
+    """
+    共有の整理スレッドにディレクトリの整理を予約します。
+
+    Args:
+        backup_dir (Path): バックアップディレクトリ
+    """
+    _pruner.schedule(backup_dir)
@@ -0,0 +1,151 @@
+"""
+書式を保つ書き込みモジュール。
+設定ファイルの元のテキストのうち、変更された値の範囲だけを書き換えます。
+
+変更のない部分のインデント・キーの順序・改行コードはそのまま残るため、
+手で整形された設定ファイルを保存しても差分は変更した値の行だけになります。
+"""
+
+import json
+import re
+
+from . import lazyjson
+from . import parse_cache
+from .backup_pack import diff_documents
+
+
+_BOM = '\ufeff'
+
+# 最初の字下げされた行（インデントの単位の推定に使う）
+_FIRST_INDENT = re.compile(r'\n([ \t]+)\S')
+
+
+def _exists(document, path):
+    """文書内に経路が存在するかを返します"""
+    value = document
+    for key in path:
+        if isinstance(value, dict) and key in value:
+            value = value[key]
+        elif isinstance(value, list) and isinstance(key, int) and -len(value) <= key < len(value):
+            value = value[key]
+        else:
+            return False
+    return True
+
+
+def changed_paths(old, new):
+    """
+    書き換えが必要な既存の値の経路を求めます。
+
+    キーの追加・削除は、親のオブジェクトを丸ごと置き換える変更として扱います。
+    他の経路の内側にある経路は除かれます。
+
+    Args:
+        old (dict): ディスク上の設定データ
+        new (dict): 保存する設定データ
+
+    Returns:
+        list: 経路（タプル）のリスト
+    """
+    paths = set()
+    for op in diff_documents(old, new):
+        path = tuple(op[1])
+        if op[0] == 'del' or not _exists(old, path):
+            path = path[:-1]
+        paths.add(path)
+    return [
+        path for path in paths
+        if not any(path[:length] in paths for length in range(len(path)))
+    ]
+
+
+def _line_indent(text, position):
+    """位置を含む行の先頭の空白を返します"""
+    line_start = text.rfind('\n', 0, position) + 1
+    return re.match(r'[ \t]*', text[line_start:position]).group()
+
+
+def _render_value(value, text, start, end, indent, newline):
+    """
+    元のテキストの書式に合わせて値をJSONに変換します。
+
+    1行に書かれていたオブジェクト・配列は1行のまま、複数行のものは元の字下げに合わせます。
+    """
+    original = text[start:end]
+    inline = '\n' not in original and len(re.sub(r'\s', '', original)) > 2
+    if indent is None or inline or not isinstance(value, (dict, list)) or not value:
+        return json.dumps(value)
+    rendered = json.dumps(value, indent=indent)
+    return rendered.replace('\n', newline + _line_indent(text, start))
+
+
+def patch_text(text, old, new):
+    """
+    元のテキストの変更された値の範囲だけを書き換えます。
+
+    Args:
+        text (str): ディスク上のJSONテキスト
+        old (dict): textを解析した設定データ
+        new (dict): 保存する設定データ
+
+    Returns:
+        str: 書き換えたテキスト。部分的な書き換えができない場合はNone。
+    """
+    paths = changed_paths(old, new)
+    if () in paths:
+        return None
+
+    match = _FIRST_INDENT.search(text)
+    indent = match.group(1) if match else None
+    newline = '\r\n' if '\r\n' in text else '\n'
+
+    try:
+        spans = sorted((lazyjson.locate(text, list(path)), path) for path in paths)
+    except (KeyError, IndexError, json.JSONDecodeError):
+        return None
+
+    pieces = []
+    position = 0
+    for (start, end), path in spans:
+        value = new
+        for key in path:
+            value = value[key]
+        pieces.append(text[position:start])
+        pieces.append(_render_value(value, text, start, end, indent, newline))
+        position = end
+    pieces.append(text[position:])
+    return ''.join(pieces)
+
+
+def render(path, document):
+    """
+    設定ファイルの書式を保ったまま、保存する内容のバイト列を作ります。
+
+    書き換えたテキストは解析し直して保存する内容と一致することを確認します
+    （重複したキーなど、部分的な書き換えが正しくない場合に備える）。
+
+    Args:
+        path (str or Path): 設定ファイルのパス
+        document (dict): 保存する設定データ
+
+    Returns:
+        bytes: 保存する内容。ファイルが存在しない、または書式を保てない場合はNone。
+    """
+    try:
+        old = parse_cache.default_cache.load_shared(path)
+        with open(path, 'rb') as file:
+            raw = file.read()
+        text = raw.decode('utf-8')
+    except (OSError, ValueError):
+        return None
+
+    bom = _BOM if text.startswith(_BOM) else ''
+    patched = patch_text(text[len(bom):], old, document)
+    if patched is None:
+        return None
+    try:
+        if json.loads(patched) != document:
+            return None
+    except json.JSONDecodeError:
+        return None
+    return (bom + patched).encode('utf-8')
@@ -0,0 +1,208 @@
+"""
+保存キューモジュール。
+短い間隔で続けて行われる設定の変更をまとめ、1回のバックアップと1回の書き込みで保存します。
+
+変更は設定データを受け取って書き換える関数として登録します。最後の登録から一定時間
+（デバウンス時間）変更がなければ、設定ファイルを1回読み込み、登録された順にすべての変更を
+適用してから save_config で保存します。変更が途切れなく続く場合も、最初の登録から
+max_delay秒以内には保存されます。すぐに保存が必要な場合は flush() を呼び出します。
+I/Oエラーで保存できなかった変更はキューに戻り、次の保存で再び適用されます。
+適用できない変更は取り除かれ、on_error で通知されます。
+"""
+
+import json
+import threading
+import time
+
+from . import config
+from . import selector
+from . import tracing
+
+
+# 最後の変更から保存するまでの秒数
+DEFAULT_DELAY = 0.5
+
+# 最初の変更から保存するまでの最大の秒数
+DEFAULT_MAX_DELAY = 2.0
+
+
+class SaveQueue:
+    """設定の変更をまとめて保存するキュー"""
+
+    def __init__(self, config_path=None, delay=DEFAULT_DELAY, max_delay=DEFAULT_MAX_DELAY, backup=True,
+                 backup_mode=None, on_error=None, clock=time.monotonic):
+        """
+        初期化メソッド
+
+        Args:
+            config_path (Path, optional): 設定ファイルのパス。Noneの場合は保存時のデフォルトパス。
+            delay (float): 最後の変更から保存するまでの秒数（デバウンス時間）
+            max_delay (float): 最初の変更から保存するまでの最大の秒数
+            backup (bool): 保存前にバックアップを作成するかどうか
+            backup_mode (str, optional): バックアップ形式
+            on_error (callable, optional): 時間経過による保存が失敗したときに呼ばれる関数（引数は例外）
+            clock (callable): 現在時刻（秒）を返す関数
+        """
+        self.config_path = config_path
+        self.delay = delay
+        self.max_delay = max(delay, max_delay)
+        self.backup = backup
+        self.backup_mode = backup_mode
+        self.on_error = on_error
+        self.clock = clock
+        self.last_error = None
+        self._pending = []
+        self._first_submitted = None
+        self._timer = None
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    @property
+    def pending(self):
+        """保存されていない変更の数"""
+        with self._lock:
+            return len(self._pending)
+
+    def submit(self, mutation):
+        """
+        変更を登録します。保存はデバウンス時間の経過後に行われます。
+
+        Args:
+            mutation (callable): 設定データ（dict）を受け取り、その場で書き換える関数
+        """
+        with self._lock:
+            self._pending.append(mutation)
+            now = self.clock()
+            if self._first_submitted is None:
+                self._first_submitted = now
+            wait = min(self.delay, max(0.0, self._first_submitted + self.max_delay - now))
+            if self._timer is not None:
+                self._timer.cancel()
+            # 終了時にも保存が済むよう、デーモンではないスレッドで待つ
+            self._timer = threading.Timer(wait, self._on_timer)
+            self._timer.start()
+
+    def set_mcp_path(self, new_path):
+        """
+        mcpServers.filesystem.argsの最後の要素（パス）の変更を登録します。
+
+        Args:
+            new_path (str): 新しいパス
+        """
+        self.submit(lambda document: config.set_mcp_path(document, new_path))
+
+    def apply_edits(self, edits):
+        """
+        セレクタによる変更を登録します。
+
+        Args:
+            edits (dict or list): セレクタ文字列と値の組（selector.apply_editsと同じ形式）
+        """
+        self.submit(lambda document: selector.apply_edits(document, edits))
+
+    @tracing.traced
+    def flush(self):
+        """
+        保存されていない変更をすぐに保存します。
+
+        設定ファイルを1回読み込み、登録された順にすべての変更を適用して、1回のバックアップと
+        1回の書き込みで保存します。適用できない変更（KeyError・ValueErrorなど）はそれだけを
+        取り除いて last_error と on_error で通知し、残りの変更を保存します（失敗し続ける変更が
+        後の変更を妨げないよう、キューには戻しません）。読み込みや書き込みのI/Oエラーで保存
+        できなかった場合は、まとめた変更は失われないようキューの先頭に戻され、次の flush() または
+        変更の登録による保存で再び適用されます。保存を諦める場合は discard() で破棄してください。
+
+        Returns:
+            SaveResult: 保存の結果。保存する変更がない場合はNone。
+
+        Raises:
+            FileNotFoundError: 設定ファイルが見つからない場合
+            PermissionError: ファイルへの書き込み権限がない場合
+        """
+        with self._flush_lock:
+            with self._lock:
+                mutations, self._pending = self._pending, []
+                first_submitted, self._first_submitted = self._first_submitted, None
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+            if not mutations:
+                return None
+
+            try:
+                config_path = self.config_path or config.get_default_config_path()
+                document = self._apply(config_path, mutations)
+                if not mutations:
+                    return None
+                return config.save_config(document, config_path, backup=self.backup, backup_mode=self.backup_mode)
+            except (OSError, json.JSONDecodeError):
+                # 保存中に登録された変更より前に戻し、登録された順を保つ
+                with self._lock:
+                    self._pending[:0] = mutations
+                    self._first_submitted = first_submitted
+                raise
+
+    def _apply(self, config_path, mutations):
+        """
+        設定ファイルを読み込み、変更を順に適用します。
+
+        適用できなかった変更は mutations から取り除いて通知します。失敗した変更が設定データを
+        途中まで書き換えている可能性があるため、その場合は読み込み直して残りの変更を適用し直します。
+
+        Args:
+            config_path (Path): 設定ファイルのパス
+            mutations (list): 変更の関数のリスト（適用できなかったものはその場で取り除かれる）
+
+        Returns:
+            dict: 変更を適用した設定データ
+        """
+        while True:
+            document = config.load_config(config_path)
+            for index, mutation in enumerate(mutations):
+                try:
+                    mutation(document)
+                except (KeyError, IndexError, TypeError, ValueError) as e:
+                    del mutations[index]
+                    self._report(e)
+                    break
+            else:
+                return document
+
+    def _report(self, error):
+        """保存の失敗を last_error と on_error で通知します"""
+        self.last_error = error
+        if self.on_error is not None:
+            self.on_error(error)
+
+    def discard(self):
+        """
+        保存されていない変更を破棄します。
+
+        Returns:
+            list: 破棄した変更（登録された順）
+        """
+        with self._lock:
+            mutations, self._pending = self._pending, []
+            self._first_submitted = None
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        return mutations
+
+    def close(self):
+        """保存されていない変更を保存し、待機を終了します"""
+        self.flush()
+
+    def _on_timer(self):
+        """デバウンス時間が経過したら保存します（タイマーのスレッド上で実行される）"""
+        try:
+            self.flush()
+        except Exception as e:
+            self._report(e)
@@ -0,0 +1,256 @@
+"""
+スキーマ検証モジュール。
+JSON Schemaのサブセットで書かれたスキーマを、入れ子のクロージャからなる検査関数に
+一度だけコンパイルし、設定データのすべての違反をJSONポインタとともに報告します。
+
+対応するキーワード:
+    type, properties, required, additionalProperties, items, minItems, minLength
+"""
+
+from collections import namedtuple
+
+
+# 違反（pointer: 違反のある位置のJSONポインタ, message: 内容）
+Violation = namedtuple('Violation', ['pointer', 'message'])
+
+# typeキーワードの値と、それに該当するPythonの型
+_TYPES = {
+    'object': (dict,),
+    'array': (list,),
+    'string': (str,),
+    'number': (int, float),
+    'integer': (int,),
+    'boolean': (bool,),
+    'null': (type(None),),
+}
+
+_STRING_ARRAY = {'type': 'array', 'items': {'type': 'string'}}
+
+# サーバー1件分のスキーマ
+SERVER_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'command': {'type': 'string', 'minLength': 1},
+        'args': _STRING_ARRAY,
+        'env': {'type': 'object', 'additionalProperties': {'type': 'string'}},
+    },
+}
+
+# 設定ファイル全体のスキーマ（filesystemサーバーはパスを含むargsが必須）
+CONFIG_SCHEMA = {
+    'type': 'object',
+    'required': ['mcpServers'],
+    'properties': {
+        'mcpServers': {
+            'type': 'object',
+            'required': ['filesystem'],
+            'properties': {
+                'filesystem': {
+                    'type': 'object',
+                    'required': ['args'],
+                    'properties': dict(SERVER_SCHEMA['properties'], args=dict(_STRING_ARRAY, minItems=1)),
+                },
+            },
+            'additionalProperties': SERVER_SCHEMA,
+        },
+    },
+}
+
+
+# エディタが必要とする構造だけのスキーマ（filesystemサーバーの空でないargs）。
+# 他のサーバーの内容は問わないため、エディタが触れないサーバーの違反で読み込みや保存を拒否しない。
+STRUCTURE_SCHEMA = {
+    'type': 'object',
+    'required': ['mcpServers'],
+    'properties': {
+        'mcpServers': {
+            'type': 'object',
+            'required': ['filesystem'],
+            'properties': {
+                'filesystem': {
+                    'type': 'object',
+                    'required': ['args'],
+                    'properties': {'args': {'type': 'array', 'minItems': 1}},
+                },
+            },
+        },
+    },
+}
+
+
+def _pointer(location):
+    """
+    位置からJSONポインタを作ります。
+
+    検査中の位置は (親の位置, キー) の組を連ねたもので表し、文字列にするのは
+    違反を報告するときだけにします（違反のない大多数の値で文字列を作らないため）。
+    """
+    tokens = []
+    while location is not None:
+        location, key = location
+        tokens.append(str(key).replace('~', '~0').replace('/', '~1'))
+    return ''.join('/' + token for token in reversed(tokens))
+
+
+def _type_name(value):
+    """値のJSONでの型名を返します"""
+    for name, types in _TYPES.items():
+        if type(value) in types:
+            return name
+    return type(value).__name__
+
+
+def _compile(schema):
+    """
+    スキーマを検査関数にコンパイルします。
+
+    検査関数は (値, 位置, 違反のリスト) を受け取り、違反をリストに追加します。
+    """
+    checks = []
+
+    if 'type' in schema:
+        names = schema['type'] if isinstance(schema['type'], list) else [schema['type']]
+        types = tuple(t for name in names for t in _TYPES[name])
+        # boolはintのサブクラスのため、型は完全一致で比較する
+        message = f"型が正しくありません（{' または '.join(names)} が必要です）"
+
+        def check_type(value, location, errors):
+            if type(value) not in types:
+                errors.append(Violation(_pointer(location), f"{message}: {_type_name(value)}"))
+                return False
+            return True
+    else:
+        check_type = None
+
+    if 'required' in schema:
+        required = tuple(schema['required'])
+
+        def check_required(value, location, errors):
+            for key in required:
+                if key not in value:
+                    errors.append(Violation(_pointer((location, key)), "必須のキーがありません"))
+        checks.append(check_required)
+
+    if 'properties' in schema or 'additionalProperties' in schema:
+        properties = {key: _compile(sub) for key, sub in schema.get('properties', {}).items()}
+        additional = schema.get('additionalProperties', True)
+        additional_check = _compile(additional) if isinstance(additional, dict) else None
+
+        def check_properties(value, location, errors):
+            for key, item in value.items():
+                check = properties.get(key, additional_check)
+                if check is not None:
+                    check(item, (location, key), errors)
+                elif additional is False:
+                    errors.append(Violation(_pointer((location, key)), "許可されていないキーです"))
+        checks.append(check_properties)
+
+    if 'minItems' in schema:
+        min_items = schema['minItems']
+
+        def check_min_items(value, location, errors):
+            if len(value) < min_items:
+                errors.append(Violation(_pointer(location), f"要素が少なすぎます（{min_items}個以上必要です）"))
+        checks.append(check_min_items)
+
+    if 'items' in schema:
+        item_check = _compile(schema['items'])
+
+        def check_items(value, location, errors):
+            for index, item in enumerate(value):
+                item_check(item, (location, index), errors)
+        checks.append(check_items)
+
+    if 'minLength' in schema:
+        min_length = schema['minLength']
+
+        def check_min_length(value, location, errors):
+            if len(value) < min_length:
+                errors.append(Violation(_pointer(location), f"文字列が短すぎます（{min_length}文字以上必要です）"))
+        checks.append(check_min_length)
+
+    checks = tuple(checks)
+
+    def check(value, location, errors):
+        # 型が違う場合は、その型を前提とする残りの検査を行わない
+        if check_type is not None and not check_type(value, location, errors):
+            return
+        for sub_check in checks:
+            sub_check(value, location, errors)
+    return check
+
+
+class Validator:
+    """スキーマをコンパイルした、再利用できる検証器"""
+
+    def __init__(self, schema):
+        """
+        初期化メソッド
+
+        Args:
+            schema (dict): スキーマ
+        """
+        self.schema = schema
+        self._check = _compile(schema)
+
+    def errors(self, document):
+        """
+        すべての違反を返します。
+
+        Args:
+            document: 検証するデータ
+
+        Returns:
+            list: Violationのリスト（違反がなければ空）
+        """
+        errors = []
+        self._check(document, None, errors)
+        return errors
+
+    def is_valid(self, document):
+        """
+        違反がないかどうかを返します。
+
+        Args:
+            document: 検証するデータ
+
+        Returns:
+            bool: 違反がなければTrue
+        """
+        return not self.errors(document)
+
+    def validate_many(self, documents):
+        """
+        複数の文書を順に検証します。
+
+        Args:
+            documents (iterable): 検証するデータの列（ジェネレータでも可）
+
+        Yields:
+            list: 文書ごとのViolationのリスト
+        """
+        check = self._check
+        for document in documents:
+            errors = []
+            check(document, None, errors)
+            yield errors
+
+
+def format_violations(violations):
+    """
+    違反を1行ずつの文字列にします。
+
+    Args:
+        violations (list): Violationのリスト
+
+    Returns:
+        str: 「JSONポインタ: 内容」の行を改行でつないだ文字列
+    """
+    return '\n'.join(f"{violation.pointer or '/'}: {violation.message}" for violation in violations)
+
+
+# 設定ファイルの検証器
+config_validator = Validator(CONFIG_SCHEMA)
+
+# エディタが必要とする構造の検証器
+structure_validator = Validator(STRUCTURE_SCHEMA)
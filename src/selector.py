@@ -0,0 +1,269 @@
+"""
+セレクタモジュール。
+`mcpServers.*.args[-1]` や `mcpServers.github.env.TOKEN` のような文字列で
+設定データ内の値を指定し、読み取り・書き換えを行います。
+
+セレクタは一度だけコンパイルされ、キャッシュされます。複数のセレクタによる変更は
+`apply_edits()` で共通の経路をまとめ、文書を1回たどるだけで適用します。
+
+書式:
+    - `name`: オブジェクトのキー（`.` で区切る）
+    - `*`: オブジェクトのすべての値、または配列のすべての要素
+    - `[n]`: 配列のインデックス（負の値は末尾から数える）
+    - `[*]`: 配列のすべての要素
+    - `["key"]`: `.` や `[` を含むキー（JSONの文字列として書く）
+"""
+
+import json
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+
+# 経路の1段分（kind: 'key', 'index', 'any' のいずれか）
+Step = namedtuple('Step', ['kind', 'value'])
+
+# 値が見つかった位置（path: 具体的なキー・インデックスの列）と値
+Match = namedtuple('Match', ['path', 'value'])
+
+_ANY = Step('any', None)
+
+# セレクタの字句（名前, [インデックス], [*], ["キー"]）
+_TOKEN = re.compile(r'''
+    (?P<name>[^.\[\]]+)
+  | \[(?P<index>-?\d+)\]
+  | \[(?P<any>\*)\]
+  | \[(?P<quoted>"(?:[^"\\]|\\.)*")\]
+''', re.VERBOSE)
+
+
+class Selector:
+    """コンパイル済みのセレクタ"""
+
+    def __init__(self, text, steps):
+        """
+        初期化メソッド（compile_selectorを使って作成してください）
+
+        Args:
+            text (str): セレクタの文字列
+            steps (tuple): 経路の列
+        """
+        self.text = text
+        self.steps = steps
+        self.has_wildcard = _ANY in steps
+
+    def __repr__(self):
+        return f"Selector({self.text!r})"
+
+    def select(self, document):
+        """
+        一致するすべての値を返します。
+
+        Args:
+            document (dict): 設定データ
+
+        Returns:
+            list: Matchのリスト（見つからない経路は含まれない）
+        """
+        matches = [((), document)]
+        for step in self.steps:
+            matches = [
+                (path + (key,), container[key])
+                for path, container in matches
+                for key in _resolve(container, step)
+            ]
+        return [Match(path, value) for path, value in matches]
+
+    def select_many(self, documents):
+        """
+        複数の文書に適用します。
+
+        Args:
+            documents (iterable): 設定データの列
+
+        Returns:
+            list: 文書ごとのMatchのリスト
+        """
+        return [self.select(document) for document in documents]
+
+    def get(self, document):
+        """
+        ワイルドカードを含まないセレクタの値を返します。
+
+        Args:
+            document (dict): 設定データ
+
+        Returns:
+            値
+
+        Raises:
+            KeyError: 値が存在しない場合
+            ValueError: セレクタがワイルドカードを含む場合
+        """
+        if self.has_wildcard:
+            raise ValueError(f"ワイルドカードを含むセレクタには select() を使ってください: {self.text}")
+        value = document
+        for step in self.steps:
+            keys = _resolve(value, step)
+            if not keys:
+                raise KeyError(self.text)
+            value = value[keys[0]]
+        return value
+
+
+def _resolve(container, step):
+    """1段分の経路に一致する具体的なキー・インデックスの列を返します"""
+    if step.kind == 'key':
+        if isinstance(container, dict) and step.value in container:
+            return [step.value]
+        return []
+    if step.kind == 'index':
+        if isinstance(container, list) and -len(container) <= step.value < len(container):
+            return [step.value]
+        return []
+    if isinstance(container, dict):
+        return list(container)
+    if isinstance(container, list):
+        return list(range(len(container)))
+    return []
+
+
+@lru_cache(maxsize=256)
+def compile_selector(text):
+    """
+    セレクタをコンパイルします。同じ文字列のコンパイル結果はキャッシュされます。
+
+    Args:
+        text (str): セレクタの文字列
+
+    Returns:
+        Selector: コンパイル済みのセレクタ
+
+    Raises:
+        ValueError: セレクタの書式が不正な場合
+    """
+    steps = []
+    position = 0
+    expect_name = True
+    while position < len(text):
+        if text[position] == '.' and not expect_name:
+            position += 1
+            expect_name = True
+            continue
+        match = _TOKEN.match(text, position)
+        if match is None or (match.group('name') is not None and not expect_name):
+            raise ValueError(f"セレクタが不正です: {text!r}（{position}文字目）")
+        if match.group('name') is not None:
+            name = match.group('name')
+            steps.append(_ANY if name == '*' else Step('key', name))
+        elif match.group('index') is not None:
+            steps.append(Step('index', int(match.group('index'))))
+        elif match.group('any') is not None:
+            steps.append(_ANY)
+        else:
+            steps.append(Step('key', json.loads(match.group('quoted'))))
+        position = match.end()
+        expect_name = False
+    if not steps or expect_name:
+        raise ValueError(f"セレクタが不正です: {text!r}")
+    return Selector(text, tuple(steps))
+
+
+def _as_selector(selector):
+    """文字列であればコンパイルして返します"""
+    return compile_selector(selector) if isinstance(selector, str) else selector
+
+
+class _EditNode:
+    """apply_editsで共通の経路をまとめるための木の節"""
+
+    __slots__ = ('children', 'has_value', 'value', 'selector')
+
+    def __init__(self, selector):
+        self.children = {}
+        self.has_value = False
+        self.value = None
+        self.selector = selector
+
+
+def _build_edit_tree(edits):
+    """変更の列を、経路を共有する木にまとめます"""
+    root = _EditNode(None)
+    for selector, value in edits:
+        selector = _as_selector(selector)
+        node = root
+        for step in selector.steps:
+            child = node.children.get(step)
+            if child is None:
+                child = node.children[step] = _EditNode(selector)
+            node = child
+        # 同じセレクタが複数回指定された場合は後のものが優先される
+        node.has_value = True
+        node.value = value
+        node.selector = selector
+    return root
+
+
+def _apply_node(container, node, strict=True):
+    """
+    木の節に従って変更を適用し、変更された値の数を返します。
+
+    ワイルドカードより下では、経路の途中が存在しない要素を読み飛ばします（strict=False）。
+    """
+    changed = 0
+    for step, child in node.children.items():
+        keys = _resolve(container, step)
+        if not keys and child.has_value:
+            keys = _missing_leaf(container, step)
+        if not keys and strict and step.kind != 'any':
+            raise KeyError(child.selector.text)
+        for key in keys:
+            if child.has_value:
+                changed += _assign(container, key, child.value)
+            if child.children:
+                changed += _apply_node(container[key], child, strict and step.kind != 'any')
+    return changed
+
+
+def _assign(container, key, value):
+    """値を書き込み、変更があれば1を返します"""
+    if isinstance(container, list) and key == len(container):
+        container.append(value)
+        return 1
+    if isinstance(container, dict) and key not in container or container[key] != value:
+        container[key] = value
+        return 1
+    return 0
+
+
+def _missing_leaf(container, step):
+    """
+    存在しない末端の値の書き込み先を返します。
+
+    オブジェクトにはキーを追加し、空の配列への `[-1]`・`[0]` は要素の追加として扱います。
+    """
+    if step.kind == 'key' and isinstance(container, dict):
+        return [step.value]
+    if step.kind == 'index' and isinstance(container, list) and not container and step.value in (0, -1):
+        return [0]
+    return []
+
+
+def apply_edits(document, edits):
+    """
+    複数の変更を1回の走査で適用します。
+
+    Args:
+        document (dict): 設定データ（直接変更されます）
+        edits (dict or iterable): セレクタ（文字列またはSelector）と新しい値の組
+
+    Returns:
+        int: 実際に変更された値の数
+
+    Raises:
+        KeyError: ワイルドカードより前の経路の途中が存在しない場合
+        ValueError: セレクタの書式が不正な場合
+    """
+    if isinstance(edits, dict):
+        edits = edits.items()
+    return _apply_node(document, _build_edit_tree(edits))
@@ -0,0 +1,162 @@
+"""
+起動時間の計測モジュール。
+`--startup-trace` を指定したときに、モジュールごとのインポート時間を記録し、
+`python -X importtime` と同じ形式で標準エラー出力に表示します。
+
+計測はインポートフックを登録した後に読み込まれたモジュールが対象です。
+フックを登録しない限り、このモジュールは起動時間に影響しません。
+"""
+
+import sys
+import time
+
+
+# 計測を有効にするコマンドライン引数
+TRACE_OPTION = '--startup-trace'
+
+_HEADER = 'import time: self [us] | cumulative | imported package'
+
+
+class _TimedLoader:
+    """exec_moduleの実行時間を計測するローダーのラッパー"""
+
+    def __init__(self, loader, name, tracer):
+        self._loader = loader
+        self._name = name
+        self._tracer = tracer
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        self._tracer._enter()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._tracer._leave(self._name)
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+
+class ImportTracer:
+    """モジュールのインポート時間（自身の時間と、依存を含めた時間）を記録するクラス"""
+
+    def __init__(self, clock=time.perf_counter):
+        """
+        初期化メソッド
+
+        Args:
+            clock (callable): 現在時刻（秒）を返す関数
+        """
+        self.clock = clock
+        self.started = clock()
+        self.records = []
+        self._stack = []
+        self._finding = set()
+
+    def install(self):
+        """インポートフックを登録します"""
+        if self not in sys.meta_path:
+            sys.meta_path.insert(0, self)
+
+    def uninstall(self):
+        """インポートフックを解除します"""
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    def find_spec(self, name, path=None, target=None):
+        """
+        他のファインダーでモジュールを探し、ローダーを計測用のラッパーに置き換えます。
+
+        Args:
+            name (str): モジュール名
+            path (list, optional): パッケージの検索パス
+            target (module, optional): 再読み込みの対象
+
+        Returns:
+            ModuleSpec: 見つかったモジュールの仕様。見つからない場合はNone。
+        """
+        if name in self._finding:
+            return None
+        self._finding.add(name)
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, 'find_spec'):
+                    continue
+                spec = finder.find_spec(name, path, target)
+                if spec is not None:
+                    break
+            else:
+                return None
+        finally:
+            self._finding.discard(name)
+
+        if spec.loader is not None and hasattr(spec.loader, 'exec_module'):
+            spec.loader = _TimedLoader(spec.loader, name, self)
+        return spec
+
+    def _enter(self):
+        """モジュールの実行開始を記録します"""
+        self._stack.append([self.clock(), 0.0])
+
+    def _leave(self, name):
+        """モジュールの実行終了を記録します"""
+        started, children = self._stack.pop()
+        cumulative = self.clock() - started
+        if self._stack:
+            self._stack[-1][1] += cumulative
+        self.records.append((name, cumulative - children, cumulative, len(self._stack)))
+
+    def elapsed(self):
+        """計測を開始してからの秒数を返します"""
+        return self.clock() - self.started
+
+    def report(self):
+        """
+        記録したインポート時間を `-X importtime` と同じ形式の文字列にします。
+
+        Returns:
+            str: インポート時間の一覧（インポートが終わった順）と合計
+        """
+        lines = [_HEADER]
+        for name, self_time, cumulative, depth in self.records:
+            lines.append(f"import time: {self_time * 1e6:>9.0f} | {cumulative * 1e6:>10.0f} | "
+                         f"{'  ' * depth} {name}")
+        top_level = sum(record[2] for record in self.records if record[3] == 0)
+        lines.append(f"インポート合計: {top_level * 1000:.1f} ms  "
+                     f"計測開始からの経過: {self.elapsed() * 1000:.1f} ms  "
+                     f"モジュール数: {len(self.records)}")
+        return '\n'.join(lines)
+
+
+def start_trace(argv=None):
+    """
+    引数に `--startup-trace` が含まれていれば計測を開始します。
+
+    Args:
+        argv (list, optional): コマンドライン引数。Noneの場合はsys.argv[1:]。
+
+    Returns:
+        ImportTracer: 開始した計測。指定がない場合はNone。
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    if TRACE_OPTION not in argv:
+        return None
+    tracer = ImportTracer()
+    tracer.install()
+    return tracer
+
+
+def finish_trace(tracer, stream=None):
+    """
+    計測を終了し、結果を表示します。
+
+    Args:
+        tracer (ImportTracer): start_traceが返した計測（Noneの場合は何もしない）
+        stream (file, optional): 出力先。Noneの場合は標準エラー出力。
+    """
+    if tracer is None:
+        return
+    tracer.uninstall()
+    print(tracer.report(), file=stream or sys.stderr)
@@ -0,0 +1,124 @@
+"""
+バックグラウンド処理モジュール。
+ファイル操作などの時間のかかる処理をワーカースレッドで実行し、結果をTkの
+メインスレッドに `root.after` で渡します。
+"""
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from tkinter import TclError
+
+
+class TaskCancelled(Exception):
+    """処理が中止の要求に応じて打ち切られたことを示す例外（ワーカースレッドの処理で送出する）"""
+
+
+class ImmediateExecutor:
+    """
+    呼び出したスレッド上ですぐに処理を実行するエグゼキュータ。
+
+    テストや、バックグラウンド処理が不要な環境で使います。
+    """
+
+    def submit(self, function, *args, **kwargs):
+        future = Future()
+        try:
+            future.set_result(function(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+        return future
+
+    def shutdown(self, wait=True):
+        pass
+
+
+class Task:
+    """実行中の処理。cancel()で中止を要求できます"""
+
+    def __init__(self, name):
+        """
+        初期化メソッド
+
+        Args:
+            name (str): 処理の名前（表示用）
+        """
+        self.name = name
+        self.cancel_event = threading.Event()
+        self.done = False
+
+    def cancel(self):
+        """
+        中止を要求します。
+
+        処理は cancel_event を確認できる箇所で TaskCancelled を送出して打ち切られます。
+        打ち切られずに最後まで実行された場合は、ファイルの書き込みなどが済んでいるため、
+        結果は通常どおり呼び出し元に渡されます。
+        """
+        self.cancel_event.set()
+
+    @property
+    def cancelled(self):
+        """中止が要求されたかどうか"""
+        return self.cancel_event.is_set()
+
+
+class TaskRunner:
+    """処理をワーカースレッドで実行し、結果をメインスレッドのコールバックに渡すクラス"""
+
+    def __init__(self, root, executor=None):
+        """
+        初期化メソッド
+
+        Args:
+            root (tk.Tk): 結果を渡すためのルートウィンドウ
+            executor (Executor, optional): 処理を実行するエグゼキュータ。
+                Noneの場合は順に処理する1スレッドのプールを使う。
+        """
+        self.root = root
+        self.executor = executor or ThreadPoolExecutor(max_workers=1, thread_name_prefix='config-io')
+
+    def run(self, name, work, on_success, on_error=None, on_cancel=None):
+        """
+        処理をバックグラウンドで実行します。
+
+        Args:
+            name (str): 処理の名前
+            work (callable): ワーカースレッドで実行する関数（引数は中止要求のthreading.Event）。
+                中止する場合はTaskCancelledを送出する。
+            on_success (callable): 成功時にメインスレッドで呼ばれる関数（引数は戻り値）
+            on_error (callable, optional): 例外発生時にメインスレッドで呼ばれる関数（引数は例外）
+            on_cancel (callable, optional): 処理がTaskCancelledで中止された場合にメインスレッドで呼ばれる関数
+
+        Returns:
+            Task: 実行中の処理
+        """
+        task = Task(name)
+        future = self.executor.submit(work, task.cancel_event)
+
+        def deliver(future):
+            try:
+                self.root.after(0, self._finish, task, future, on_success, on_error, on_cancel)
+            except (RuntimeError, TclError):
+                # ウィンドウが既に閉じられている（メインループの終了後はRuntimeError、
+                # ウィンドウの破棄後はTclError）
+                pass
+
+        future.add_done_callback(deliver)
+        return task
+
+    @staticmethod
+    def _finish(task, future, on_success, on_error, on_cancel):
+        """処理の結果をコールバックに渡します（メインスレッド上で実行される）"""
+        task.done = True
+        error = future.exception()
+        if isinstance(error, TaskCancelled):
+            if on_cancel is not None:
+                on_cancel()
+        elif error is None:
+            on_success(future.result())
+        elif on_error is not None:
+            on_error(error)
+
+    def shutdown(self):
+        """エグゼキュータを停止します（実行中の処理の完了は待たない）"""
+        self.executor.shutdown(wait=False)
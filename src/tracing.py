@@ -0,0 +1,265 @@
+"""
+処理時間の計測モジュール。
+設定ファイルの操作を区間（スパン）に分けて時間を記録し、処理ごとの内訳を表示します。
+
+計測は既定で無効です。無効な間は `span()` が何もしない共有のオブジェクトを返し、
+`traced` を付けた関数はフラグを1回確認するだけで元の関数を呼び出します。
+"""
+
+import functools
+import sys
+import threading
+import time
+import unicodedata
+from collections import namedtuple
+
+
+# 区間ごとの集計（count: 回数, total: 合計秒, maximum: 最大秒）
+SpanStats = namedtuple('SpanStats', ['count', 'total', 'maximum'])
+
+_enabled = False
+_stats = {}
+_lock = threading.Lock()
+_local = threading.local()
+
+
+class Span:
+    """計測中・計測済みの区間"""
+
+    __slots__ = ('name', 'path', 'children', 'started', 'duration')
+
+    def __init__(self, name):
+        self.name = name
+        self.path = None
+        self.children = []
+        self.started = None
+        self.duration = 0.0
+
+    def __enter__(self):
+        stack = _stack()
+        parent = stack[-1] if stack else None
+        self.path = parent.path + (self.name,) if parent is not None else (self.name,)
+        if parent is not None:
+            parent.children.append(self)
+        stack.append(self)
+        with _lock:
+            # 入った順に登録しておくと、表示のときに親が子より先に並ぶ
+            _stats.setdefault(self.path, [0, 0.0, 0.0])
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.duration = time.perf_counter() - self.started
+        _stack().pop()
+        with _lock:
+            entry = _stats[self.path]
+            entry[0] += 1
+            entry[1] += self.duration
+            entry[2] = max(entry[2], self.duration)
+        return False
+
+
+class _NullSpan:
+    """計測が無効なときに使う、何もしない区間"""
+
+    __slots__ = ()
+
+    name = None
+    path = ()
+    children = ()
+    duration = 0.0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def _pad(text, width, right=False):
+    """全角文字を2文字分として、表示幅がwidthになるよう空白で埋めます"""
+    shown = sum(2 if unicodedata.east_asian_width(char) in 'WF' else 1 for char in text)
+    padding = ' ' * max(0, width - shown)
+    return padding + text if right else text + padding
+
+
+def _stack():
+    """現在のスレッドで計測中の区間のスタックを返します"""
+    stack = getattr(_local, 'stack', None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+def enable():
+    """計測を有効にします"""
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    """計測を無効にします（記録済みの集計は残ります）"""
+    global _enabled
+    _enabled = False
+
+
+def is_enabled():
+    """計測が有効かどうかを返します"""
+    return _enabled
+
+
+def reset():
+    """記録済みの集計を破棄します"""
+    with _lock:
+        _stats.clear()
+
+
+def start_worker():
+    """
+    ワーカープロセスで計測を始めます。
+
+    親プロセスからfork時に引き継いだ集計と計測中の区間を破棄するため、worker側の集計には
+    そのプロセスで記録した区間だけが含まれます。集計は stats() で取り出して親プロセスに返し、
+    親プロセスで merge() します。
+    """
+    global _enabled
+    _local.stack = []
+    reset()
+    _enabled = True
+
+
+def merge(collected):
+    """
+    別のプロセスで記録された集計を、現在の区間の子として加えます。
+
+    Args:
+        collected (dict): ワーカープロセスの stats() の戻り値
+    """
+    stack = _stack()
+    prefix = stack[-1].path if stack else ()
+    with _lock:
+        for path, entry in collected.items():
+            target = _stats.setdefault(prefix + path, [0, 0.0, 0.0])
+            target[0] += entry.count
+            target[1] += entry.total
+            target[2] = max(target[2], entry.maximum)
+
+
+def span(name):
+    """
+    区間を計測するコンテキストマネージャを返します。
+
+    Args:
+        name (str): 区間の名前。計測中の区間の中で使うと、その子として記録される。
+
+    Returns:
+        Span: with文で使う区間。計測が無効な場合は何もしない区間。
+    """
+    if not _enabled:
+        return _NULL_SPAN
+    return Span(name)
+
+
+def traced(function):
+    """
+    関数の呼び出しを、関数名の区間として計測するデコレータ。
+
+    Args:
+        function (callable): 計測する関数
+
+    Returns:
+        callable: 計測が有効なときだけ区間を記録する関数
+    """
+    name = function.__name__
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        if not _enabled:
+            return function(*args, **kwargs)
+        with Span(name):
+            return function(*args, **kwargs)
+    return wrapper
+
+
+def stats():
+    """
+    記録済みの集計を返します。
+
+    Returns:
+        dict: 区間の経路（名前のタプル）をキー、SpanStatsを値とする辞書（区間に入った順）
+    """
+    with _lock:
+        return {path: SpanStats(*entry) for path, entry in _stats.items() if entry[0]}
+
+
+def report():
+    """
+    記録済みの集計を、区間の入れ子を字下げで表した表にします。
+
+    Returns:
+        str: 区間ごとの回数・合計・平均・最大（ミリ秒）の表
+    """
+    collected = stats()
+    if not collected:
+        return "処理時間の内訳: 記録された処理はありません"
+
+    # 子の区間を親の直後に並べる
+    children = {}
+    for path in collected:
+        children.setdefault(path[:-1], []).append(path)
+    ordered = []
+
+    def visit(parent):
+        for path in children.get(parent, ()):
+            ordered.append(path)
+            visit(path)
+    visit(())
+
+    width = max(len(path[-1]) + 2 * (len(path) - 1) for path in ordered)
+    width = max(width, 4)
+    lines = ["処理時間の内訳",
+             '  '.join([_pad('処理', width), _pad('回数', 6, True), _pad('合計 ms', 12, True),
+                        _pad('平均 ms', 12, True), _pad('最大 ms', 12, True)])]
+    for path in ordered:
+        entry = collected[path]
+        label = '  ' * (len(path) - 1) + path[-1]
+        lines.append(f"{_pad(label, width)}  {entry.count:>6}  {entry.total * 1000:>12.3f}  "
+                     f"{entry.total / entry.count * 1000:>12.3f}  {entry.maximum * 1000:>12.3f}")
+    return '\n'.join(lines)
+
+
+def print_report(stream=None):
+    """
+    記録済みの集計を表示します。
+
+    Args:
+        stream (file, optional): 出力先。Noneの場合は標準エラー出力。
+    """
+    print(report(), file=stream or sys.stderr)
+
+
+def summarize(finished, limit=3):
+    """
+    計測済みの区間を1行にまとめます（ステータスバーの表示用）。
+
+    Args:
+        finished (Span): 計測済みの区間
+        limit (int): 表示する子の区間の数の上限（時間の長い順）
+
+    Returns:
+        str: 例 "保存 12.3 ms（backup_config 8.1 ms、atomic_write_bytes 3.2 ms）"
+    """
+    text = f"{finished.name} {finished.duration * 1000:.1f} ms"
+    totals = {}
+    for child in finished.children:
+        totals[child.name] = totals.get(child.name, 0.0) + child.duration
+    # 区間が1つだけの場合は、その内訳を表示する
+    if len(finished.children) == 1 and finished.children[0].children:
+        return f"{text} / " + summarize(finished.children[0], limit)
+    if totals:
+        parts = sorted(totals.items(), key=lambda item: item[1], reverse=True)[:limit]
+        text += "（" + "、".join(f"{name} {seconds * 1000:.1f} ms" for name, seconds in parts) + "）"
+    return text
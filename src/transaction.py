@@ -0,0 +1,237 @@
+"""
+トランザクションモジュール。
+複数の設定ファイルを、すべて変更するか1つも変更しないかのどちらかになるように更新します。
+
+準備（prepare）では、各ファイルの読み込み・変更・検証・書き込む内容の一時ファイルへの
+書き出しと、ロールバック用の退避（元のファイルへのハードリンク）をスレッドで並行して行います。
+確定（commit）は一時ファイルを os.replace で順に置き換えるだけのため、ファイルの大きさに
+よらずほぼ一定の時間で終わります。確定の途中で失敗した場合は、置き換え済みのファイルを
+退避しておいた元の内容に自動で戻します。
+"""
+
+import os
+import shutil
+import time
+import uuid
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from . import config
+from . import locator
+from . import tracing
+from . import utils
+
+
+# 準備が済んだ1ファイル（staged: 書き込む内容の一時ファイル, rollback: 元の内容の退避先,
+# signature: 準備時の更新時刻とサイズ, changed: 内容が変わるかどうか）
+PreparedFile = namedtuple('PreparedFile', ['path', 'staged', 'rollback', 'old_path', 'signature', 'changed'])
+
+# トランザクションの結果（committed: 置き換えたファイル, unchanged: 内容が変わらないファイル）
+TransactionResult = namedtuple('TransactionResult', ['committed', 'unchanged', 'prepare_time', 'commit_time'])
+
+
+class TransactionError(Exception):
+    """トランザクションが失敗し、どのファイルも変更されなかったことを表す例外"""
+
+    def __init__(self, phase, failures, rolled_back=()):
+        """
+        初期化メソッド
+
+        Args:
+            phase (str): 失敗した段階（'prepare' または 'commit'）
+            failures (list): (パス, 例外) のリスト
+            rolled_back (list): 元の内容に戻したファイルのパスのリスト
+        """
+        self.phase = phase
+        self.failures = list(failures)
+        self.rolled_back = list(rolled_back)
+        details = "; ".join(f"{path}: {error}" for path, error in self.failures)
+        super().__init__(f"{phase}に失敗しました（{len(self.failures)}件）: {details}")
+
+
+def _signature(path):
+    """ファイルの変更を検出するための値（更新時刻とサイズ）を返します"""
+    stat_result = os.stat(path)
+    return stat_result.st_mtime_ns, stat_result.st_size
+
+
+def _remove_quietly(path):
+    """ファイルを削除します（存在しない場合は何もしない）"""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class Transaction:
+    """複数の設定ファイルへの変更をまとめて適用するトランザクション"""
+
+    def __init__(self, config_paths, mutation, workers=None, backup=True, backup_mode=None):
+        """
+        初期化メソッド
+
+        Args:
+            config_paths (list): 設定ファイルのパスのリスト
+            mutation (callable): 設定データ（dict）を受け取り、その場で書き換える関数
+            workers (int, optional): 準備を並行して行うスレッド数。Noneの場合はCPU数に応じた数。
+            backup (bool): 確定前に各ファイルの通常のバックアップを作成するかどうか
+            backup_mode (str, optional): バックアップ形式
+        """
+        self.config_paths = [str(path) for path in config_paths]
+        self.mutation = mutation
+        self.workers = workers
+        self.backup = backup
+        self.backup_mode = backup_mode
+        self.prepared = None
+        self.prepare_time = 0.0
+        self._tag = f'txn-{uuid.uuid4().hex[:12]}'
+        self._finished = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if not self._finished:
+            self.abort()
+        return False
+
+    @tracing.traced
+    def prepare(self):
+        """
+        すべてのファイルを並行して準備します。
+
+        1件でも失敗した場合は、準備済みの一時ファイルを削除してから例外を送出します。
+
+        Returns:
+            list: PreparedFileのリスト（config_pathsの順）
+
+        Raises:
+            TransactionError: 準備に失敗したファイルがある場合
+        """
+        started = time.perf_counter()
+        workers = self.workers or min(32, (os.cpu_count() or 1) + 4)
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(self.config_paths) or 1))) as executor:
+            futures = [executor.submit(self._prepare_file, path) for path in self.config_paths]
+        prepared, failures = [], []
+        for path, future in zip(self.config_paths, futures):
+            error = future.exception()
+            if error is None:
+                prepared.append(future.result())
+            else:
+                failures.append((path, error))
+
+        self.prepared = prepared
+        self.prepare_time = time.perf_counter() - started
+        if failures:
+            self.abort()
+            raise TransactionError('prepare', failures)
+        return prepared
+
+    def _prepare_file(self, path):
+        """1つのファイルを準備します（ワーカースレッド上で実行される）"""
+        signature = _signature(path)
+        document = config.load_config(path, use_cache=False)
+        old_path = config.get_mcp_path(document)
+        self.mutation(document)
+        if not config.validate_config(document):
+            raise ValueError("変更後の設定が正しくありません: " + "; ".join(
+                f"{violation.pointer or '/'} {violation.message}" for violation in config.structure_errors(document)))
+
+        data = config.render_config(document, path)
+        if utils.file_content_equals(path, data):
+            return PreparedFile(path, None, None, old_path, signature, False)
+
+        if self.backup:
+            config.backup_config(path, mode=self.backup_mode)
+        staged = utils.write_temp_file(path, data, self._tag)
+        rollback = path + f'.{self._tag}.orig'
+        try:
+            # ハードリンクであれば大きさによらず一瞬で退避できる（使えない場合はコピー）
+            try:
+                os.link(path, rollback)
+            except OSError:
+                shutil.copy2(path, rollback)
+        except BaseException:
+            _remove_quietly(staged)
+            raise
+        return PreparedFile(path, str(staged), rollback, old_path, signature, True)
+
+    @tracing.traced
+    def commit(self):
+        """
+        準備した一時ファイルで各ファイルを置き換えます。
+
+        準備の後に別のプロセスがファイルを変更していた場合や置き換えに失敗した場合は、
+        置き換え済みのファイルを元の内容に戻してから例外を送出します。
+
+        Returns:
+            TransactionResult: トランザクションの結果
+
+        Raises:
+            TransactionError: 確定に失敗した場合（変更はすべて元に戻されている）
+        """
+        if self.prepared is None:
+            self.prepare()
+        changed = [item for item in self.prepared if item.changed]
+
+        started = time.perf_counter()
+        committed = []
+        try:
+            for item in changed:
+                if _signature(item.path) != item.signature:
+                    raise RuntimeError("準備の後にファイルが変更されました")
+                os.replace(item.staged, item.path)
+                committed.append(item)
+        except Exception as e:
+            failed_path = changed[len(committed)].path
+            rolled_back = self._rollback(committed)
+            self.abort()
+            raise TransactionError('commit', [(failed_path, e)], rolled_back) from e
+        commit_time = time.perf_counter() - started
+
+        for item in changed:
+            _remove_quietly(item.rollback)
+            locator.default_locator.invalidate(item.path)
+        self._finished = True
+        return TransactionResult([item.path for item in changed],
+                                 [item.path for item in self.prepared if not item.changed],
+                                 self.prepare_time, commit_time)
+
+    def _rollback(self, committed):
+        """置き換え済みのファイルを、退避しておいた元の内容に戻します"""
+        rolled_back = []
+        for item in reversed(committed):
+            os.replace(item.rollback, item.path)
+            rolled_back.append(item.path)
+        return rolled_back
+
+    def abort(self):
+        """準備した一時ファイルと退避したファイルを削除します（設定ファイルは変更しない）"""
+        for item in self.prepared or ():
+            if item.changed:
+                _remove_quietly(item.staged)
+                _remove_quietly(item.rollback)
+        self._finished = True
+
+
+def apply_path(config_paths, new_path, workers=None, backup=True, backup_mode=None):
+    """
+    複数の設定ファイルのパスを、すべて変更するか1つも変更しないかのどちらかで変更します。
+
+    Args:
+        config_paths (list): 設定ファイルのパスのリスト
+        new_path (str): 新しいパス
+        workers (int, optional): 準備を並行して行うスレッド数
+        backup (bool): 確定前に各ファイルの通常のバックアップを作成するかどうか
+        backup_mode (str, optional): バックアップ形式
+
+    Returns:
+        TransactionResult: トランザクションの結果
+
+    Raises:
+        TransactionError: 失敗した場合（どのファイルも変更されていない）
+    """
+    with Transaction(config_paths, lambda document: config.set_mcp_path(document, new_path),
+                     workers=workers, backup=backup, backup_mode=backup_mode) as transaction:
+        transaction.prepare()
+        return transaction.commit()
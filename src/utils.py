@@ -7,58 +7,51 @@ import os
 import datetime
 import platform
 import json
+import stat
+import threading
 from pathlib import Path
 
+from . import locator
+from . import tracing
 
+
+# アプリケーションデータのディレクトリ名
+APP_DIR_NAME = 'claude-config-editor'
+
+
+@tracing.traced
 def find_config_file():
     """
     デフォルトの場所から設定ファイルを探します。
     
+    候補パスはlocator.candidate_paths()がOSごとに返し、存在確認の結果はキャッシュされます。
+    
     Returns:
-        Path: 見つかった設定ファイルのパス、見つからない場合はNone
-    """
-    # ユーザーのホームディレクトリを取得
-    home_dir = os.path.expanduser('~')
-    
-    # OS別のデフォルトパスを確認
-    if platform.system() == 'Windows':
-        # Windows
-        appdata = os.environ.get('APPDATA', '')
-        localappdata = os.environ.get('LOCALAPPDATA', '')
-        paths = [
-            Path(appdata) / 'Claude' / 'claude_desktop_config.json',
-            Path(appdata) / 'Claude Desktop' / 'claude_desktop_config.json',
-            Path(home_dir) / 'AppData' / 'Roaming' / 'Claude' / 'claude_desktop_config.json',
-            Path(localappdata) / 'Claude' / 'claude_desktop_config.json',
-            Path(localappdata) / 'Claude Desktop' / 'claude_desktop_config.json',
-        ]
-    elif platform.system() == 'Darwin':
-        # macOS
-        paths = [
-            Path.home() / 'Library' / 'Application Support' / 'Claude' / 'claude_desktop_config.json',
-            Path.home() / 'Library' / 'Application Support' / 'Claude Desktop' / 'claude_desktop_config.json',
-        ]
-    else:
-        # Linux/その他
-        paths = [
-            Path.home() / '.config' / 'Claude' / 'claude_desktop_config.json',
-            Path.home() / '.config' / 'Claude Desktop' / 'claude_desktop_config.json',
-        ]
-    
-    # 存在するパスを返す
-    for path in paths:
-        if path.exists():
-            return path
-    
-    # Windowsの場合のデフォルト設定
-    if platform.system() == 'Windows':
-        return Path(appdata) / 'Claude' / 'claude_desktop_config.json'
-    elif platform.system() == 'Darwin':
-        return Path.home() / 'Library' / 'Application Support' / 'Claude' / 'claude_desktop_config.json'
+        Path: 見つかった設定ファイルのパス。見つからない場合はOSごとの既定のパス。
+    """
+    return locator.default_locator.resolve()
+
+
+def get_app_data_dir():
+    """
+    アプリケーション自身のデータ（プロファイルなど）を保存するディレクトリを返します。
+    
+    ディレクトリは作成しません。
+    
+    Returns:
+        Path: OSごとのアプリケーションデータのディレクトリ
+    """
+    system = platform.system()
+    if system == 'Windows':
+        base = Path(os.environ.get('APPDATA') or Path.home() / 'AppData' / 'Roaming')
+    elif system == 'Darwin':
+        base = Path.home() / 'Library' / 'Application Support'
     else:
-        return Path.home() / '.config' / 'Claude' / 'claude_desktop_config.json'
+        base = Path(os.environ.get('XDG_CONFIG_HOME') or Path.home() / '.config')
+    return base / APP_DIR_NAME
 
 
+@tracing.traced
 def create_backup_dir(base_dir):
     """
     バックアップディレクトリを作成します。
@@ -84,6 +77,31 @@ def get_timestamp():
     return datetime.datetime.now().strftime('%Y%m%d%H%M%S')
 
 
+# new_backup_idが最後に返したID（マイクロ秒単位の時刻の整数）
+_last_backup_id = 0
+_backup_id_lock = threading.Lock()
+
+
+def new_backup_id():
+    """
+    重複しない、作成順に並ぶバックアップIDを生成します。
+    
+    IDは現在時刻をマイクロ秒まで表した20桁の数字（YYYYMMDDHHMMSSffffff）です。
+    同じマイクロ秒に複数回呼ばれた場合や時計が戻った場合も、前回より大きいIDを返します。
+    先頭14桁はget_timestampと同じ形式のため、作成日時として読み取れます。
+    
+    Returns:
+        str: バックアップID
+    """
+    global _last_backup_id
+    now = int(datetime.datetime.now().strftime('%Y%m%d%H%M%S%f'))
+    with _backup_id_lock:
+        if now <= _last_backup_id:
+            now = _last_backup_id + 1
+        _last_backup_id = now
+    return str(now)
+
+
 def generate_backup_filename(original_filename):
     """
     オリジナルのファイル名からバックアップファイル名を生成します。
@@ -99,6 +117,7 @@ def generate_backup_filename(original_filename):
     return f"{base_name}_backup_{timestamp}.json"
 
 
+@tracing.traced
 def ensure_directory_exists(directory_path):
     """
     ディレクトリが存在することを確認し、存在しない場合は作成します。
@@ -119,6 +138,82 @@ def ensure_directory_exists(directory_path):
     return True
 
 
+@tracing.traced
+def file_content_equals(path, data):
+    """
+    ファイルの内容が指定したバイト列と一致するかどうかを確認します。
+    
+    サイズが異なる場合はファイルを読まずに判定します。
+    
+    Args:
+        path (str or Path): 確認するファイルのパス
+        data (bytes): 比較するバイト列
+    
+    Returns:
+        bool: 内容が一致するかどうか（ファイルが存在しない場合はFalse）
+    """
+    try:
+        if os.path.getsize(path) != len(data):
+            return False
+        with open(path, 'rb') as f:
+            return f.read() == data
+    except OSError:
+        return False
+
+
+def write_temp_file(path, data, tag):
+    """
+    書き込み先と同じディレクトリの一時ファイルに内容を書き込み、fsyncで確定させます。
+    
+    書き込み先が存在する場合はそのパーミッションを一時ファイルに引き継ぎます。
+    一時ファイルはos.replaceで書き込み先と置き換えられる状態になります。
+    
+    Args:
+        path (str or Path): 書き込み先のパス
+        data (bytes): 書き込むバイト列
+        tag (str): 一時ファイル名に含める識別子（同時に書き込む処理ごとに異なる値）
+    
+    Returns:
+        Path: 一時ファイルのパス
+    """
+    path = Path(path)
+    temp_path = path.with_name(f'.{path.name}.{tag}.tmp')
+    try:
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        try:
+            os.chmod(temp_path, stat.S_IMODE(os.stat(path).st_mode))
+        except FileNotFoundError:
+            pass
+    except BaseException:
+        if temp_path.exists():
+            os.remove(temp_path)
+        raise
+    return temp_path
+
+
+@tracing.traced
+def atomic_write_bytes(path, data):
+    """
+    一時ファイルに書き込んでから置き換えることで、ファイルを不可分に更新します。
+    
+    一時ファイルは同じディレクトリに作成し、fsyncで内容を確定させてから
+    os.replaceで置き換えます。既存ファイルのパーミッションは引き継がれます。
+    
+    Args:
+        path (str or Path): 書き込み先のパス
+        data (bytes): 書き込むバイト列
+    """
+    temp_path = write_temp_file(path, data, f'{os.getpid()}.{threading.get_ident()}')
+    try:
+        os.replace(temp_path, path)
+    finally:
+        if temp_path.exists():
+            os.remove(temp_path)
+
+
 def is_valid_directory(path):
     """
     指定されたパスが有効なディレクトリかどうかを確認します。
@@ -0,0 +1,335 @@
+"""
+バックアップの検証モジュール。
+バックアップディレクトリ内のすべてのファイルを読み、途中で切れたファイルや壊れたファイルを見つけます。
+
+検証では各ファイルをmmapで読み込んでSHA-256を計算し、ファイルの種類に応じて内容も確認します。
+    objects/xx/<ハッシュ>.json  内容のハッシュがファイル名と一致すること（JSONとして解析できない
+                               設定もそのまま保存されるため、内容は解析しない）
+    *.json                     JSONとして読めること
+    index.jsonl                すべての行がJSONとして読めること
+    config.pack(.idx)          インデックスが固定長の倍数で、すべてのレコードを展開できること
+
+結果はバックアップディレクトリの隣のマニフェスト（backup.manifest.json）に、ファイルごとの
+サイズ・更新時刻・ハッシュとして記録します。次回からは、サイズか更新時刻が変わったファイルと、
+前回問題が見つかったファイルだけを検証します。full=True の場合はすべてのファイルを読み直し、更新時刻とサイズが
+変わっていないのにハッシュが記録と異なるファイル（記録後に壊れたファイル）も見つけます。
+ファイルの読み込みと検証はプロセスプールで並列に行います。
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import time
+import zlib
+from collections import namedtuple
+from pathlib import Path
+
+from . import tracing
+from . import utils
+from .backup_pack import _INDEX_FORMAT, BackupPack
+from .backup_store import LOCK_SUFFIX, BackupStore
+
+
+# マニフェストの形式のバージョン
+MANIFEST_VERSION = 1
+
+# マニフェストのファイル名の接尾辞（バックアップディレクトリ名に続ける）
+MANIFEST_SUFFIX = '.manifest.json'
+
+# 検証しないファイルの接尾辞（書き込み途中の一時ファイルと、中身のないロックファイル）
+_SKIPPED_SUFFIXES = ('.tmp', LOCK_SUFFIX)
+
+# 1ファイルの検証結果（path: バックアップディレクトリからの相対パス, digest: SHA-256,
+# error: 問題の内容（問題がなければNone））
+FileCheck = namedtuple('FileCheck', ['path', 'size', 'mtime_ns', 'digest', 'error'])
+
+# 検証全体の結果（files: ファイル数, checked: 読み込んだファイル数, skipped: 変更がなく省略した数,
+# problems: (相対パス, 内容) のリスト, bytes_read: 読み込んだバイト数）
+VerifyReport = namedtuple('VerifyReport', ['files', 'checked', 'skipped', 'problems', 'bytes_read', 'elapsed'])
+
+
+def manifest_path(backup_dir):
+    """
+    バックアップディレクトリのマニフェストのパスを返します。
+
+    Args:
+        backup_dir (str or Path): バックアップディレクトリ
+
+    Returns:
+        Path: 例: backup → backup.manifest.json（同じ親ディレクトリ）
+    """
+    backup_dir = Path(backup_dir)
+    return backup_dir.with_name(backup_dir.name + MANIFEST_SUFFIX)
+
+
+def load_manifest(backup_dir):
+    """
+    マニフェストを読み込みます。
+
+    Args:
+        backup_dir (str or Path): バックアップディレクトリ
+
+    Returns:
+        tuple: (相対パスをキー、[サイズ, 更新時刻(ns), ハッシュ] を値とする辞書,
+            前回問題が見つかったファイルの相対パスをキー、内容を値とする辞書)。
+            マニフェストがない・読めない場合はどちらも空。
+    """
+    try:
+        with open(manifest_path(backup_dir), 'rb') as file:
+            manifest = json.load(file)
+    except (OSError, ValueError):
+        return {}, {}
+    if not isinstance(manifest, dict) or manifest.get('version') != MANIFEST_VERSION:
+        return {}, {}
+    return manifest.get('files', {}), manifest.get('problems', {})
+
+
+def save_manifest(backup_dir, files, problems):
+    """
+    マニフェストを書き込みます。
+
+    Args:
+        backup_dir (str or Path): バックアップディレクトリ
+        files (dict): load_manifestと同じ形式の、ファイルごとの記録
+        problems (dict): 問題が見つかったファイルの相対パスをキー、内容を値とする辞書
+    """
+    data = json.dumps({'version': MANIFEST_VERSION, 'algorithm': 'sha256', 'files': files, 'problems': problems},
+                      ensure_ascii=False, sort_keys=True).encode('utf-8')
+    utils.atomic_write_bytes(manifest_path(backup_dir), data)
+
+
+def _list_files(backup_dir):
+    """
+    バックアップディレクトリ内のファイルを列挙します。
+
+    書き込み途中の一時ファイルとロックファイルは除きます。
+
+    Returns:
+        dict: 相対パス（区切りは/）をキー、os.stat_resultを値とする辞書
+    """
+    files = {}
+    pending = [(str(backup_dir), '')]
+    while pending:
+        directory, prefix = pending.pop()
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append((entry.path, prefix + entry.name + '/'))
+                elif entry.is_file(follow_symlinks=False) and not entry.name.endswith(_SKIPPED_SUFFIXES):
+                    files[prefix + entry.name] = entry.stat()
+    return files
+
+
+def _read_order(relative_path):
+    """ハードリンクのうち本体（objects/以下）のパスを先にする並び順のキー"""
+    return not relative_path.startswith(BackupStore.OBJECTS_DIR + '/'), relative_path
+
+
+def _check_content(relative_path, data, digest):
+    """
+    ファイルの種類に応じて内容を確認します。
+
+    Returns:
+        str: 問題の内容。問題がなければNone。
+    """
+    name = relative_path.rsplit('/', 1)[-1]
+    if relative_path.startswith(BackupStore.OBJECTS_DIR + '/') and name.endswith('.json'):
+        # ストアにはJSONとして解析できない設定もそのまま保存されるため、内容が
+        # ファイル名のハッシュと一致することだけを確認する
+        if name[:-len('.json')] != digest:
+            return "内容のハッシュがファイル名と一致しません"
+        return None
+    if name == BackupPack.INDEX_FILE:
+        if len(data) % _INDEX_FORMAT.size:
+            return f"インデックスの長さが{_INDEX_FORMAT.size}バイトの倍数ではありません（途中で切れています）"
+        return None
+    if name == BackupPack.PACK_FILE:
+        return None
+    try:
+        if name.endswith('.json'):
+            json.loads(data[:])
+        elif name.endswith('.jsonl'):
+            for number, line in enumerate(data[:].splitlines(), 1):
+                if line.strip():
+                    try:
+                        json.loads(line)
+                    except ValueError as e:
+                        return f"{number}行目をJSONとして読めません: {e}"
+    except ValueError as e:
+        return f"JSONとして読めません: {e}"
+    return None
+
+
+def _check_pack(pack_path, data):
+    """パックのすべてのレコードが展開できるかを、インデックスに従って確認します"""
+    index_path = pack_path.with_name(BackupPack.INDEX_FILE)
+    try:
+        with open(index_path, 'rb') as file:
+            index = file.read()
+    except FileNotFoundError:
+        return "パックのインデックスがありません"
+    count = len(index) // _INDEX_FORMAT.size
+    for number in range(count):
+        _, offset, length, _ = _INDEX_FORMAT.unpack_from(index, number * _INDEX_FORMAT.size)
+        if offset + length > len(data):
+            return f"{number}番目の版がパックの末尾を超えています（途中で切れています）"
+        try:
+            zlib.decompress(data[offset:offset + length])
+        except zlib.error as e:
+            return f"{number}番目の版を展開できません: {e}"
+    return None
+
+
+def check_file(backup_dir, relative_path):
+    """
+    1つのファイルをmmapで読み込み、ハッシュを計算して内容を確認します（ワーカープロセス上で実行される）。
+
+    Args:
+        backup_dir (str): バックアップディレクトリ
+        relative_path (str): バックアップディレクトリからの相対パス
+
+    Returns:
+        FileCheck: 検証結果
+    """
+    path = Path(backup_dir) / relative_path
+    try:
+        with open(path, 'rb') as file:
+            stat_result = os.fstat(file.fileno())
+            if stat_result.st_size == 0:
+                # 長さ0のファイルはmmapできない
+                return FileCheck(relative_path, 0, stat_result.st_mtime_ns, hashlib.sha256().hexdigest(),
+                                 "ファイルが空です")
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                digest = hashlib.sha256(data).hexdigest()
+                if relative_path == BackupPack.PACK_FILE:
+                    error = _check_pack(path, data)
+                else:
+                    error = _check_content(relative_path, data, digest)
+    except OSError as e:
+        return FileCheck(relative_path, None, None, None, f"読み込めません: {e}")
+    return FileCheck(relative_path, stat_result.st_size, stat_result.st_mtime_ns, digest, error)
+
+
+def _check_chunk(backup_dir, relative_paths):
+    """複数のファイルを検証します（プロセス間通信の回数を減らすため、まとめて渡す）"""
+    return [check_file(backup_dir, relative_path) for relative_path in relative_paths]
+
+
+def _chunk_size(total, workers):
+    """プロセス間通信の回数を抑えつつ、各ワーカーに均等に配るチャンクサイズを決めます"""
+    return max(1, min(256, total // (workers * 8)))
+
+
+def _run_checks(backup_dir, relative_paths, workers):
+    """ファイルを並列に検証し、完了した順に結果を返します"""
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(relative_paths)))
+    if workers == 1:
+        for relative_path in relative_paths:
+            yield check_file(backup_dir, relative_path)
+        return
+
+    # プロセスプールは他のコマンドの起動時間に影響しないよう、ここで読み込む
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    size = _chunk_size(len(relative_paths), workers)
+    chunks = [relative_paths[i:i + size] for i in range(0, len(relative_paths), size)]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_check_chunk, str(backup_dir), chunk) for chunk in chunks]
+        for future in as_completed(futures):
+            yield from future.result()
+
+
+@tracing.traced
+def verify_backups(backup_dir, full=False, workers=None, on_problem=None):
+    """
+    バックアップディレクトリを検証し、マニフェストを更新します。
+
+    問題が見つかったファイルはマニフェストの記録（前回までのハッシュ）を更新せず、
+    次回も変更の有無によらず検証します。
+
+    Args:
+        backup_dir (str or Path): バックアップディレクトリ
+        full (bool): 変更のないファイルも含めてすべて検証するかどうか
+        workers (int, optional): ワーカープロセス数。Noneの場合はCPU数。1の場合は逐次実行。
+        on_problem (callable, optional): 問題が見つかるたびに (相対パス, 内容) で呼ばれる関数
+
+    Returns:
+        VerifyReport: 検証の結果
+
+    Raises:
+        FileNotFoundError: バックアップディレクトリが存在しない場合
+    """
+    started = time.perf_counter()
+    backup_dir = Path(backup_dir)
+    manifest, previous_problems = load_manifest(backup_dir)
+    files = _list_files(backup_dir)
+    problems = []
+
+    def report(relative_path, message):
+        problems.append((relative_path, message))
+        if on_problem is not None:
+            on_problem(relative_path, message)
+
+    # 前回から変わっていないファイルは省略する。ハードリンク（スナップショットと本体）は、
+    # ハッシュとファイル名を照合できる本体のパスで1回だけ読む
+    pending, same_file = [], {}
+    for relative_path in sorted(files, key=_read_order):
+        stat_result = files[relative_path]
+        recorded = manifest.get(relative_path)
+        if (not full and recorded is not None and relative_path not in previous_problems
+                and recorded[:2] == [stat_result.st_size, stat_result.st_mtime_ns]):
+            continue
+        inode = (stat_result.st_dev, stat_result.st_ino) if stat_result.st_ino else relative_path
+        if inode in same_file:
+            same_file[inode].append(relative_path)
+        else:
+            same_file[inode] = [relative_path]
+            pending.append(relative_path)
+    linked = {paths[0]: paths for paths in same_file.values()}
+
+    checked = bytes_read = 0
+    for check in _run_checks(backup_dir, pending, workers):
+        bytes_read += check.size or 0
+        for relative_path in linked[check.path]:
+            checked += 1
+            recorded = manifest.get(relative_path)
+            if check.error is not None:
+                report(relative_path, check.error)
+            elif (recorded is not None and recorded[:2] == [check.size, check.mtime_ns]
+                  and recorded[2] != check.digest):
+                report(relative_path, "更新時刻とサイズが記録と同じなのに、内容のハッシュが異なります")
+            else:
+                manifest[relative_path] = [check.size, check.mtime_ns, check.digest]
+
+    # カタログに記録されたバックアップの本体が残っているか確認する
+    store = BackupStore(backup_dir)
+    for entry in store.entries():
+        relative_path = store.blob_path(entry.digest).relative_to(backup_dir).as_posix()
+        if relative_path not in files:
+            report(relative_path, f"バックアップ {entry.id} の本体がありません")
+
+    # 削除されたファイル（整理されたバックアップなど）の記録を消す
+    for relative_path in [path for path in manifest if path not in files]:
+        del manifest[relative_path]
+    save_manifest(backup_dir, manifest, dict(problems))
+
+    return VerifyReport(len(files), checked, len(files) - checked, problems, bytes_read,
+                        time.perf_counter() - started)
+
+
+def format_report(report):
+    """
+    検証の結果を1行にまとめます。
+
+    Args:
+        report (VerifyReport): 検証の結果
+
+    Returns:
+        str: 表示用の文字列
+    """
+    rate = report.bytes_read / report.elapsed / (1024 * 1024) if report.elapsed > 0 else 0.0
+    return (f"検証: {report.files}件（読み込み {report.checked}件、変更なしで省略 {report.skipped}件）  "
+            f"問題: {len(report.problems)}件  経過: {report.elapsed:.2f}秒 ({rate:.1f} MB/秒)")
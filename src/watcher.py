@@ -0,0 +1,194 @@
+"""
+ファイル監視モジュール。
+設定ファイルの外部での変更を検出し、短時間に連続した変更をまとめて通知します。
+
+Linuxではinotifyでイベントを待ち受けるため、変更がない間はCPUを消費しません。
+その他の環境では、変更がない間は間隔を広げながらファイルの状態をポーリングします。
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+from pathlib import Path
+
+
+# 連続した変更をまとめるための待ち時間（秒）
+DEFAULT_DEBOUNCE = 0.3
+
+# ポーリングの間隔（秒）。変更がない間は最大値まで倍々に広げる
+DEFAULT_POLL_INTERVAL = 1.0
+MAX_POLL_INTERVAL = 4.0
+
+# inotifyのイベント種別
+_IN_MODIFY = 0x00000002
+_IN_ATTRIB = 0x00000004
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_WATCH_MASK = (_IN_MODIFY | _IN_ATTRIB | _IN_CLOSE_WRITE | _IN_MOVED_FROM
+               | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE)
+
+# inotify_event構造体のヘッダ（wd, mask, cookie, len）
+_EVENT_HEADER = struct.Struct('iIII')
+
+
+def _open_inotify(directory):
+    """
+    ディレクトリを監視するinotifyのファイル記述子を作成します。
+
+    Args:
+        directory (Path): 監視するディレクトリ
+
+    Returns:
+        int: ファイル記述子。inotifyが使えない場合はNone。
+    """
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            return None
+        if libc.inotify_add_watch(fd, os.fsencode(str(directory)), _WATCH_MASK) < 0:
+            os.close(fd)
+            return None
+        return fd
+    except (OSError, AttributeError):
+        return None
+
+
+def _file_state(path):
+    """ファイルの変更を検出するための状態を返します（存在しない場合はNone）"""
+    try:
+        stat_result = os.stat(path)
+    except OSError:
+        return None
+    return (stat_result.st_mtime_ns, stat_result.st_size, stat_result.st_ino)
+
+
+class FileWatcher:
+    """1つのファイルの変更を監視するクラス"""
+
+    def __init__(self, path, callback, debounce=DEFAULT_DEBOUNCE, poll_interval=DEFAULT_POLL_INTERVAL,
+                 use_inotify=True):
+        """
+        初期化メソッド
+
+        Args:
+            path (str or Path): 監視するファイルのパス
+            callback (callable): 変更時に監視スレッド上で呼び出される関数（引数はパス）
+            debounce (float): 連続した変更をまとめるための待ち時間（秒）
+            poll_interval (float): ポーリング時の最小間隔（秒）
+            use_inotify (bool): 利用可能な場合にinotifyを使うかどうか
+        """
+        self.path = Path(path)
+        self.callback = callback
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.use_inotify = use_inotify
+        self.backend = None
+        self._stop = threading.Event()
+        self._wake_read = None
+        self._wake_write = None
+        self._thread = None
+
+    def start(self):
+        """監視を開始します"""
+        fd = _open_inotify(self.path.parent) if self.use_inotify else None
+        if fd is not None:
+            self.backend = 'inotify'
+            self._wake_read, self._wake_write = os.pipe()
+            target = lambda: self._run_inotify(fd)
+        else:
+            self.backend = 'polling'
+            target = self._run_polling
+        self._thread = threading.Thread(target=target, name='config-watcher', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """監視を停止します"""
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        if self._wake_write is not None:
+            # 書き込み側はここでのみ閉じる（監視スレッドは読み込み側のみ閉じる）
+            os.write(self._wake_write, b'x')
+            os.close(self._wake_write)
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1.0)
+
+    def _notify(self):
+        """変更を通知します（コールバックの例外で監視が止まらないようにする）"""
+        if self._stop.is_set():
+            return
+        try:
+            self.callback(self.path)
+        except Exception:
+            pass
+
+    def _run_inotify(self, fd):
+        """inotifyでイベントを待ち受けます"""
+        name = os.fsencode(self.path.name)
+        pending = False
+        try:
+            while not self._stop.is_set():
+                # 変更が検出されていなければ無期限に待つ（CPUを消費しない）
+                timeout = self.debounce if pending else None
+                readable, _, _ = select.select([fd, self._wake_read], [], [], timeout)
+                if self._stop.is_set():
+                    break
+                if not readable:
+                    # 待ち時間の間に新しい変更がなければ通知する
+                    pending = False
+                    self._notify()
+                    continue
+                if fd in readable and self._read_events(fd, name):
+                    pending = True
+        finally:
+            os.close(fd)
+            os.close(self._wake_read)
+
+    @staticmethod
+    def _read_events(fd, name):
+        """イベントを読み込み、対象ファイルに関するものが含まれるかを返します"""
+        matched = False
+        while True:
+            try:
+                data = os.read(fd, 65536)
+            except BlockingIOError:
+                return matched
+            if not data:
+                return matched
+            offset = 0
+            while offset + _EVENT_HEADER.size <= len(data):
+                _, _, _, length = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size
+                if data[offset:offset + length].rstrip(b'\0') == name:
+                    matched = True
+                offset += length
+
+    def _run_polling(self):
+        """ファイルの状態を定期的に確認します"""
+        last = _file_state(self.path)
+        interval = self.poll_interval
+        while not self._stop.wait(interval):
+            current = _file_state(self.path)
+            if current == last:
+                # 変更がない間は確認の間隔を広げる
+                interval = min(interval * 2, max(self.poll_interval, MAX_POLL_INTERVAL))
+                continue
+            # 状態が落ち着くまで待ってから通知する
+            while not self._stop.wait(self.debounce):
+                settled = _file_state(self.path)
+                if settled == current:
+                    break
+                current = settled
+            last = current
+            interval = self.poll_interval
+            self._notify()
@@ -0,0 +1,130 @@
+"""
+パック形式のバックアップモジュールのテスト
+"""
+
+import unittest
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# モジュールをインポートできるようにシステムパスを調整
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src import config
+from src import backup_pack
+from src.backup_pack import BackupPack
+
+
+def _document(target, extra=None):
+    """テスト用の設定データを作成します"""
+    document = {
+        "mcpServers": {
+            "filesystem": {"command": "node", "args": ["index.js", target]},
+            "github": {"command": "npx", "env": {"TOKEN": "x" * 200}},
+        }
+    }
+    if extra:
+        document["mcpServers"].update(extra)
+    return document
+
+
+def _append_versions(backup_dir, worker, count):
+    """別プロセスから版を追加します（プロセス間の排他のテスト用）"""
+    pack = BackupPack(backup_dir, keyframe_interval=4)
+    for i in range(count):
+        pack.append_document(_document(f"C:\\{worker}\\{i}"))
+
+
+class TestBackupPack(unittest.TestCase):
+    """パック形式のバックアップのテストケース"""
+
+    def setUp(self):
+        """テスト前の準備"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.temp_path = Path(self.temp_dir.name)
+        self.pack = BackupPack(self.temp_path / 'backup', keyframe_interval=4)
+
+    def tearDown(self):
+        """テスト後のクリーンアップ"""
+        self.temp_dir.cleanup()
+
+    def test_diff_and_apply(self):
+        """差分の計算と適用のテスト"""
+        old = _document("C:\\a")
+        new = _document("C:\\b", {"slack": {"command": "npx"}})
+        del new["mcpServers"]["github"]["env"]
+
+        ops = backup_pack.diff_documents(old, new)
+        restored = backup_pack.apply_delta(json.loads(json.dumps(old)), ops)
+
+        self.assertEqual(restored, new)
+        self.assertEqual(list(restored["mcpServers"]), list(new["mcpServers"]))
+
+        # 値が1つだけ変わった場合の差分はその値のみ
+        ops = backup_pack.diff_documents(old, _document("C:\\b"))
+        self.assertEqual(ops, [['set', ['mcpServers', 'filesystem', 'args', 1], "C:\\b"]])
+
+    def test_keyframes_and_restore(self):
+        """キーフレームの間隔と各版の復元のテスト"""
+        for i in range(10):
+            entry = self.pack.append_document(_document(f"C:\\{i}"), timestamp=1000.0 + i)
+            self.assertEqual(entry.keyframe, i % 4 == 0)
+
+        self.assertEqual(len(self.pack), 10)
+        for i in range(10):
+            self.assertEqual(self.pack.restore_version(i), _document(f"C:\\{i}"))
+
+        # 差分は完全なスナップショットより小さい
+        entries = self.pack.entries()
+        self.assertLess(entries[1].size, entries[0].size)
+        self.assertEqual([entry.number for entry in self.pack.entries(3, 6)], [3, 4, 5])
+
+        # 連続した版の復元は版ごとの復元と一致する
+        paths = [(number, document["mcpServers"]["filesystem"]["args"][-1])
+                 for number, document in self.pack.iter_versions(2, 7)]
+        self.assertEqual(paths, [(i, f"C:\\{i}") for i in range(2, 7)])
+
+    def test_restore_at_timestamp(self):
+        """時刻を指定した復元のテスト"""
+        for i in range(6):
+            self.pack.append_document(_document(f"C:\\{i}"), timestamp=1000.0 + i * 10)
+
+        self.assertEqual(self.pack.restore(at=1025.0), _document("C:\\2"))
+        self.assertEqual(self.pack.restore(), _document("C:\\5"))
+        with self.assertRaises(LookupError):
+            self.pack.restore(at=999.0)
+
+    def test_append_from_processes(self):
+        """複数のプロセスから同時に追加しても、すべての版が復元できるかのテスト"""
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=4) as executor:
+            for future in [executor.submit(_append_versions, self.pack.backup_dir, worker, 25)
+                           for worker in range(4)]:
+                future.result()
+
+        self.assertEqual(len(self.pack), 100)
+        targets = sorted(version["mcpServers"]["filesystem"]["args"][1]
+                         for _, version in self.pack.iter_versions(0, 100))
+        self.assertEqual(targets, sorted(f"C:\\{worker}\\{i}" for worker in range(4) for i in range(25)))
+
+    def test_backup_config_pack_mode(self):
+        """パック形式でのbackup_configとrestore_configのテスト"""
+        config_file = self.temp_path / 'claude_desktop_config.json'
+        for i in range(3):
+            with open(config_file, 'w') as f:
+                json.dump(_document(f"C:\\{i}"), f)
+            config.backup_config(config_file, mode=config.BACKUP_MODE_PACK)
+
+        self.assertEqual(len(BackupPack(self.temp_path / 'backup')), 3)
+        self.assertEqual(config.restore_config(config_file), _document("C:\\2"))
+
+        # 不明な形式はエラー
+        with self.assertRaises(ValueError):
+            config.backup_config(config_file, mode='unknown')
+
+
+if __name__ == '__main__':
+    unittest.main()
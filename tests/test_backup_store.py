@@ -0,0 +1,103 @@
+"""
+バックアップストアモジュールのテスト
+"""
+
+import unittest
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# モジュールをインポートできるようにシステムパスを調整
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src import config
+from src.backup_store import BackupStore
+
+
+def _put_and_drop(backup_dir, source_path, worker, count):
+    """別プロセスからバックアップの追加と削除を繰り返します（プロセス間の排他のテスト用）"""
+    store = BackupStore(backup_dir, link_snapshots=False)
+    for i in range(count):
+        store.put(source_path, f'{worker}-{i}')
+        if i % 2:
+            # 削除記録を増やしてカタログの書き直しも起こす
+            store.drop([f'{worker}-{i}'])
+
+
+class TestBackupStore(unittest.TestCase):
+    """バックアップストアのテストケース"""
+
+    def setUp(self):
+        """テスト前の準備"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.temp_path = Path(self.temp_dir.name)
+        self.config_file = self.temp_path / 'claude_desktop_config.json'
+        self._write({"mcpServers": {"filesystem": {"args": ["index.js", "C:\\a"]}}})
+        self.store = BackupStore(self.temp_path / 'backup')
+
+    def tearDown(self):
+        """テスト後のクリーンアップ"""
+        self.temp_dir.cleanup()
+
+    def _write(self, data):
+        with open(self.config_file, 'w') as f:
+            json.dump(data, f)
+
+    def _blobs(self):
+        return [p for p in (self.temp_path / 'backup' / 'objects').rglob('*.json')]
+
+    def test_concurrent_processes(self):
+        """複数のプロセスから同時に追加・削除してもカタログが壊れないかのテスト"""
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=4) as executor:
+            for future in [executor.submit(_put_and_drop, self.store.backup_dir, self.config_file, worker, 60)
+                           for worker in range(4)]:
+                future.result()
+
+        self.assertEqual(sorted(entry.id for entry in self.store.entries()),
+                         sorted(f'{worker}-{i}' for worker in range(4) for i in range(0, 60, 2)))
+        self.assertTrue((self.store.backup_dir / 'index.jsonl.lock').exists())
+
+    def test_identical_snapshots_are_deduplicated(self):
+        """同一内容のバックアップが1つの本体にまとめられるかのテスト"""
+        first = self.store.put(self.config_file, '1')
+        second = self.store.put(self.config_file, '2')
+
+        self.assertEqual(first.digest, second.digest)
+        self.assertEqual(len(self._blobs()), 1)
+        self.assertEqual([entry.id for entry in self.store.entries()], ['1', '2'])
+
+    def test_changed_content_creates_new_blob(self):
+        """内容が変わった場合に新しい本体が作られるかのテスト"""
+        first = self.store.put(self.config_file, '1')
+        self._write({"mcpServers": {"filesystem": {"args": ["index.js", "C:\\b"]}}})
+        second = self.store.put(self.config_file, '2')
+
+        self.assertNotEqual(first.digest, second.digest)
+        self.assertEqual(len(self._blobs()), 2)
+        self.assertEqual(json.loads(self.store.read(first.digest))['mcpServers']['filesystem']['args'][-1], "C:\\a")
+
+    def test_snapshot_is_hardlink(self):
+        """参照用のスナップショットが本体へのハードリンクになっているかのテスト"""
+        entry = self.store.put(self.config_file, '1')
+        snapshot = self.store.snapshot_path('1')
+
+        self.assertTrue(snapshot.exists())
+        self.assertTrue(os.path.samefile(snapshot, self.store.blob_path(entry.digest)))
+
+    def test_backup_config_uses_store(self):
+        """backup_configがストアを経由するかのテスト"""
+        backup_file = config.backup_config(self.config_file)
+
+        self.assertTrue(backup_file.exists())
+        self.assertEqual(len(self.store.entries()), 1)
+
+        # 存在しないファイルはバックアップしない
+        self.assertIsNone(config.backup_config(self.temp_path / 'missing.json'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+"""
+バッチ処理モジュールのテスト
+"""
+
+import unittest
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# モジュールをインポートできるようにシステムパスを調整
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src import batch
+from src import tracing
+
+
+class TestBatch(unittest.TestCase):
+    """バッチ処理モジュールのテストケース"""
+
+    def setUp(self):
+        """テスト前の準備"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.temp_path = Path(self.temp_dir.name)
+
+        # プロファイルごとの設定ファイルを作成
+        self.config_files = []
+        for i in range(5):
+            profile_dir = self.temp_path / f"user{i}"
+            profile_dir.mkdir()
+            config_file = profile_dir / 'claude_desktop_config.json'
+            with open(config_file, 'w') as f:
+                json.dump({
+                    "mcpServers": {
+                        "filesystem": {
+                            "command": "node",
+                            "args": ["index.js", f"C:\\old\\{i}"]
+                        }
+                    }
+                }, f)
+            self.config_files.append(config_file)
+
+    def tearDown(self):
+        """テスト後のクリーンアップ"""
+        self.temp_dir.cleanup()
+
+    def test_expand_paths(self):
+        """globパターン展開のテスト"""
+        pattern = str(self.temp_path / '**' / 'claude_desktop_config.json')
+        paths = batch.expand_paths([pattern, str(self.config_files[0])])
+
+        # 重複が除かれて全ファイルが含まれているか確認
+        self.assertEqual(len(paths), 5)
+
+        # パターンでないパスは存在しなくてもそのまま残る
+        missing = str(self.temp_path / 'missing.json')
+        self.assertEqual(batch.expand_paths([missing]), [missing])
+
+    def test_run_batch_sequential(self):
+        """逐次実行のテスト"""
+        results = list(batch.run_batch(self.config_files, "D:\\new", workers=1, backup=False))
+
+        self.assertEqual(len(results), 5)
+        self.assertTrue(all(result.ok for result in results))
+        for config_file in self.config_files:
+            with open(config_file) as f:
+                self.assertEqual(json.load(f)['mcpServers']['filesystem']['args'][-1], "D:\\new")
+
+        # 2回目は内容が変わらないため書き込みが省略される
+        summary = batch.timed_batch(self.config_files, "D:\\new", workers=1, backup=False)
+        self.assertEqual(summary.unchanged, 5)
+
+    def test_run_batch_parallel(self):
+        """プロセスプールによる並列実行のテスト"""
+        paths = self.config_files + [self.temp_path / 'missing.json']
+        summary = batch.timed_batch(paths, "D:\\new", workers=2, backup=False)
+
+        # 存在しないファイルだけが失敗として集計される
+        self.assertEqual(summary.total, 6)
+        self.assertEqual(summary.succeeded, 5)
+        self.assertEqual(summary.failed, 1)
+        self.assertIn("件/秒", batch.format_summary(summary))
+
+    def test_run_batch_parallel_profile(self):
+        """ワーカープロセスの処理時間が親プロセスの内訳に加わることのテスト"""
+        was_enabled = tracing.is_enabled()
+        tracing.reset()
+        tracing.enable()
+        try:
+            with tracing.span('batch'):
+                summary = batch.timed_batch(self.config_files, "D:\\new", workers=2, backup=False)
+            collected = tracing.stats()
+        finally:
+            tracing.reset()
+            if not was_enabled:
+                tracing.disable()
+
+        self.assertEqual(summary.succeeded, 5)
+        self.assertEqual(collected[('batch', 'save_config')].count, 5)
+        self.assertEqual(collected[('batch', 'load_config')].count, 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -53,6 +53,54 @@ class TestConfig(unittest.TestCase):
         # 読み込んだ設定が元の設定と一致するか確認
         self.assertEqual(loaded_config, self.test_config)
     
+    def test_save_config(self):
+        """設定保存機能のテスト"""
+        # 変更がある場合は書き込みとバックアップが行われる
+        config.set_mcp_path(self.test_config, "C:\\new\\path")
+        result = config.save_config(self.test_config, self.config_file)
+        self.assertTrue(result.written)
+        self.assertEqual(result.bytes_written, os.path.getsize(self.config_file))
+        self.assertEqual(config.load_config(self.config_file), self.test_config)
+        backups = list((Path(self.temp_dir.name) / 'backup').glob('claude_desktop_config_backup_*.json'))
+        self.assertEqual(len(backups), 1)
+        
+        # 一時ファイルが残っていないか確認
+        self.assertEqual([p.name for p in Path(self.temp_dir.name).glob('*.tmp')], [])
+    
+    def test_save_config_unchanged(self):
+        """内容が変わらない場合に書き込みを省略するかのテスト"""
+        config.save_config(self.test_config, self.config_file, backup=False)
+        mtime = os.stat(self.config_file).st_mtime_ns
+        
+        result = config.save_config(self.test_config, self.config_file)
+        
+        # 書き込みもバックアップも行われない
+        self.assertFalse(result.written)
+        self.assertEqual(result.bytes_written, 0)
+        self.assertEqual(os.stat(self.config_file).st_mtime_ns, mtime)
+        self.assertFalse((Path(self.temp_dir.name) / 'backup').exists())
+    
+    def test_save_config_preserve_format(self):
+        """既存ファイルの書式を保って保存するかのテスト"""
+        original = ('{\r\n  "mcpServers": {\r\n    "filesystem": {"command": "node",\r\n'
+                    '      "args": ["index.js", "C:\\\\old"]}\r\n  }\r\n}\r\n')
+        with open(self.config_file, 'wb') as f:
+            f.write(original.encode('utf-8'))
+        
+        loaded = config.load_config(self.config_file)
+        config.set_mcp_path(loaded, "D:\\new")
+        config.save_config(loaded, self.config_file, backup=False)
+        
+        # 変更した値以外のバイト列はそのまま残る
+        with open(self.config_file, 'rb') as f:
+            saved = f.read().decode('utf-8')
+        self.assertEqual(saved, original.replace('"C:\\\\old"', '"D:\\\\new"'))
+        
+        # preserve_format=Falseの場合は全体を整形する
+        config.save_config(self.test_config, self.config_file, backup=False, preserve_format=False)
+        with open(self.config_file, 'r') as f:
+            self.assertEqual(f.read(), json.dumps(self.test_config, indent=4))
+    
     def test_get_mcp_path(self):
         """パス取得機能のテスト"""
         # 現在のパスを取得
@@ -119,6 +167,29 @@ class TestConfig(unittest.TestCase):
         }
         self.assertFalse(config.validate_config(invalid_config4))
 
+    def test_validate_config_other_servers(self):
+        """エディタが使わないサーバーの内容で拒否しないかのテスト"""
+        other_config = {
+            "mcpServers": {
+                "filesystem": {"args": ["C:\\test"]},
+                "web": {"command": "", "args": ["--port", 8080], "env": {"PORT": 3000}},
+                "broken": "not an object"
+            }
+        }
+        self.assertTrue(config.validate_config(other_config))
+        self.assertEqual(config.structure_errors(other_config), [])
+        # 全体の検査では違反として報告される
+        self.assertEqual(len(config.config_errors(other_config)), 4)
+
+        # 保存も拒否されない
+        with open(self.config_file, 'w') as f:
+            json.dump(other_config, f)
+        result = config.edit_config({'mcpServers.filesystem.args[-1]': 'D:\\new'},
+                                    self.config_file, backup=False)
+        self.assertTrue(result.written)
+        with open(self.config_file) as f:
+            self.assertEqual(json.load(f)['mcpServers']['filesystem']['args'], ['D:\\new'])
+
 
 if __name__ == '__main__':
     unittest.main()
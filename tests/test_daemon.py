@@ -0,0 +1,206 @@
+"""
+設定デーモンモジュールのテスト
+"""
+
+import unittest
+import argparse
+import io
+import json
+import os
+import sys
+import tempfile
+import threading
+from contextlib import redirect_stdout
+from pathlib import Path
+from unittest.mock import patch
+
+# モジュールをインポートできるようにシステムパスを調整
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src import daemon
+from src import daemon_client
+from src.daemon_client import DaemonClient, DaemonError
+
+
+def _write(path, target, command="npx"):
+    with open(path, 'w') as f:
+        json.dump({"mcpServers": {"filesystem": {"command": command, "args": ["-y", target]}}}, f)
+
+
+class TestConfigService(unittest.TestCase):
+    """依頼を処理するサービスのテストケース"""
+
+    def setUp(self):
+        """テスト前の準備"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.config_path = str(Path(self.temp_dir.name) / 'claude_desktop_config.json')
+        _write(self.config_path, "C:\\old")
+        self.service = daemon.ConfigService(backup=False)
+
+    def tearDown(self):
+        """テスト後のクリーンアップ"""
+        self.temp_dir.cleanup()
+
+    def _request(self, op, **fields):
+        return self.service.handle(dict(fields, op=op, config=self.config_path))
+
+    def test_get_uses_cache(self):
+        """読み取りとファイルの変更による読み込み直しのテスト"""
+        self.assertEqual(self._request('get'), {'ok': True, 'value': "C:\\old"})
+        self.assertEqual(self._request('get', selector='mcpServers.*.command')['value'], ["npx"])
+        self.assertEqual(self.service.cache.misses, 1)
+        self.assertEqual(self.service.cache.hits, 1)
+
+        # 外部で変更されたファイルは読み込み直す（サイズが変わる内容にする）
+        _write(self.config_path, "C:\\changed")
+        self.assertEqual(self._request('get')['value'], "C:\\changed")
+        self.assertEqual(self.service.cache.misses, 2)
+
+    def test_set_and_validate(self):
+        """変更と検証のテスト"""
+        self.assertEqual(self._request('set', path="D:\\new")['value']['written'], True)
+        self.assertEqual(self._request('get')['value'], "D:\\new")
+        self.assertEqual(self._request('set', edits={'mcpServers.filesystem.command': "node"})['value']['written'],
+                         True)
+        with open(self.config_path) as f:
+            self.assertEqual(json.load(f)["mcpServers"]["filesystem"], {"command": "node", "args": ["-y", "D:\\new"]})
+
+        self.assertEqual(self._request('validate')['value'], [])
+        response = self._request('set', edits={'mcpServers.filesystem.args': []})
+        self.assertFalse(response['ok'])
+        self.assertIn("無効", response['error'])
+        # エディタが使わない値の型の違反は保存を妨げず、validateで報告される
+        self.assertTrue(self._request('set', edits={'mcpServers.filesystem.command': 1})['ok'])
+        self.assertEqual([v['pointer'] for v in self._request('validate')['value']],
+                         ['/mcpServers/filesystem/command'])
+
+        with open(self.config_path, 'w') as f:
+            json.dump({"mcpServers": {"filesystem": {"command": 1, "args": []}}}, f)
+        violations = self._request('validate')['value']
+        self.assertEqual(violations[0]['pointer'], '/mcpServers/filesystem/command')
+        self.assertIs(self._request('validate')['value'], violations)
+
+    def test_errors(self):
+        """失敗した依頼が応答として返されることのテスト"""
+        self.assertFalse(self.service.handle({'op': 'unknown'})['ok'])
+        self.assertIn("FileNotFoundError", self.service.handle({'op': 'get', 'config': self.config_path + 'x'})['error'])
+        self.assertIn("KeyError", self._request('get', selector='mcpServers.missing')['error'])
+        self.assertEqual(self.service.handle({'op': 'stats'})['value']['requests'], 4)
+
+
+@unittest.skipIf(sys.platform == 'win32', "Unixドメインソケットのテスト")
+class TestDaemon(unittest.TestCase):
+    """ソケット経由の依頼のテストケース"""
+
+    def setUp(self):
+        """テスト前の準備"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.config_path = str(Path(self.temp_dir.name) / 'claude_desktop_config.json')
+        _write(self.config_path, "C:\\old")
+        self.address = os.path.join(self.temp_dir.name, 'daemon.sock')
+        self.daemon = daemon.ConfigDaemon(self.address, daemon.ConfigService(backup=False))
+        self.daemon.listen()
+        self.thread = threading.Thread(target=self.daemon.serve_forever)
+        self.thread.start()
+
+    def tearDown(self):
+        """テスト後のクリーンアップ"""
+        self.daemon.shutdown()
+        self.thread.join(5)
+        self.temp_dir.cleanup()
+
+    def test_client(self):
+        """クライアントからの依頼とデーモンの停止のテスト"""
+        with DaemonClient(self.address) as client:
+            self.assertEqual(client.get(self.config_path), "C:\\old")
+            self.assertTrue(client.set_mcp_path("D:\\new", self.config_path))
+            self.assertFalse(client.set_mcp_path("D:\\new", self.config_path))
+            self.assertEqual(client.validate(self.config_path), [])
+            with self.assertRaises(DaemonError):
+                client.get(self.config_path, 'mcpServers.missing')
+
+            # 複数の接続を同時に処理する
+            results = []
+            def read():
+                with DaemonClient(self.address) as other:
+                    results.extend(other.get(self.config_path) for _ in range(50))
+            threads = [threading.Thread(target=read) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertEqual(results, ["D:\\new"] * 200)
+
+            # 同じアドレスでは2つ目のデーモンを起動できない
+            with self.assertRaises(DaemonError):
+                daemon.ConfigDaemon(self.address).listen()
+
+            client.shutdown()
+        self.thread.join(5)
+        self.assertFalse(self.thread.is_alive())
+        self.assertFalse(os.path.exists(self.address))
+        with self.assertRaises(DaemonError):
+            DaemonClient(self.address)
+
+    def test_client_command(self):
+        """clientサブコマンドのテスト"""
+        args = argparse.Namespace(socket=self.address, config=self.config_path, action='set', selector=None,
+                                  value="D:\\cli")
+        with redirect_stdout(io.StringIO()):
+            self.assertEqual(daemon_client.run_client_command(args), 0)
+        args.action = 'get'
+        output = io.StringIO()
+        with redirect_stdout(output):
+            self.assertEqual(daemon_client.run_client_command(args), 0)
+        self.assertEqual(output.getvalue(), "D:\\cli\n")
+
+        args.socket = os.path.join(self.temp_dir.name, 'missing.sock')
+        with redirect_stdout(io.StringIO()):
+            self.assertEqual(daemon_client.run_client_command(args), 1)
+
+    def test_other_users_socket(self):
+        """他のユーザーのソケットに接続しないことのテスト"""
+        other_uid = os.getuid() + 1
+        with patch('os.getuid', return_value=other_uid):
+            with self.assertRaises(DaemonError) as context:
+                DaemonClient(self.address)
+            self.assertIn("他のユーザー", str(context.exception))
+            # 他のユーザーのソケットは削除せず、デーモンを起動しない
+            with self.assertRaises(DaemonError):
+                daemon.ConfigDaemon(self.address).listen()
+        self.assertTrue(os.path.exists(self.address))
+
+        # ソケットではないファイルにも接続しない
+        path = os.path.join(self.temp_dir.name, 'plain.sock')
+        with open(path, 'w'):
+            pass
+        with self.assertRaises(DaemonError):
+            DaemonClient(path)
+
+    def test_default_address_directory(self):
+        """既定のソケットが所有者だけがアクセスできるディレクトリに作られることのテスト"""
+        environ = {key: value for key, value in os.environ.items() if key != 'XDG_RUNTIME_DIR'}
+        with patch.dict(os.environ, environ, clear=True), \
+                patch('tempfile.gettempdir', return_value=self.temp_dir.name):
+            address = daemon_client.default_address()
+            directory = os.path.dirname(address)
+            self.assertEqual(os.path.dirname(directory), self.temp_dir.name)
+
+            server = daemon.ConfigDaemon(service=daemon.ConfigService(backup=False))
+            server.listen()
+            thread = threading.Thread(target=server.serve_forever)
+            thread.start()
+            self.assertEqual(os.stat(directory).st_mode & 0o777, 0o700)
+            with DaemonClient() as client:
+                self.assertIsNotNone(client.ping())
+            server.shutdown()
+            thread.join(5)
+
+            # 他のユーザーもアクセスできるディレクトリは使わない
+            os.chmod(directory, 0o777)
+            with self.assertRaises(DaemonError):
+                daemon.ConfigDaemon().listen()
+
+
+if __name__ == '__main__':
+    unittest.main()
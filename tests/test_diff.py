@@ -0,0 +1,164 @@
+"""
+構造的な差分モジュールのテスト
+"""
+
+import unittest
+import argparse
+import io
+import json
+import os
+import sys
+import tempfile
+from contextlib import redirect_stdout
+from datetime import datetime
+from pathlib import Path
+from unittest.mock import patch
+
+# モジュールをインポートできるようにシステムパスを調整
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src import cli
+from src import diff
+from src import history
+from src.backup_pack import BackupPack
+from src.backup_store import BackupStore
+
+
+def _document(target, **servers):
+    """テスト用の設定データを作成します"""
+    document = {"mcpServers": {"filesystem": {"command": "npx", "args": ["-y", "server", target]}}}
+    document["mcpServers"].update(servers)
+    return document
+
+
+class TestDiff(unittest.TestCase):
+    """差分の計算のテストケース"""
+
+    def test_compare_documents(self):
+        """追加・削除・変更の検出のテスト"""
+        old = _document("C:\\old", github={"command": "node", "env": {"TOKEN": "a"}})
+        new = _document("C:\\new", memory={"command": "uvx"})
+        new["mcpServers"]["filesystem"]["args"].insert(1, "--verbose")
+
+        changes = diff.compare_documents(old, new)
+        self.assertEqual(changes, [
+            diff.Change('added', ('mcpServers', 'filesystem', 'args', 1), None, "--verbose"),
+            diff.Change('changed', ('mcpServers', 'filesystem', 'args', 3), "C:\\old", "C:\\new"),
+            diff.Change('removed', ('mcpServers', 'github'), old["mcpServers"]["github"], None),
+            diff.Change('added', ('mcpServers', 'memory'), None, {"command": "uvx"}),
+        ])
+        self.assertEqual(diff.format_changes(changes).splitlines()[1],
+                         '~ mcpServers.filesystem.args[3]: "C:\\\\old" -> "C:\\\\new"')
+
+    def test_hashes(self):
+        """部分木のハッシュのテスト"""
+        # キーの順序だけが違う場合は同じ、型が違う場合は別の値として扱う
+        self.assertEqual(diff.build_tree({"a": 1, "b": [2]}).digest, diff.build_tree({"b": [2], "a": 1}).digest)
+        self.assertEqual(diff.compare_documents({"a": 1}, {"a": True}),
+                         [diff.Change('changed', ('a',), 1, True)])
+        self.assertEqual(diff.compare_documents({"a": [1]}, {"a": {"0": 1}})[0].kind, 'changed')
+        self.assertEqual(diff.compare_documents({"a": ["x"]}, {"a": ["x"]}), [])
+
+        # ハッシュが等しい部分木は中をたどらない
+        old = diff.build_tree(_document("C:\\a", github={"command": "node"}))
+        new = diff.build_tree(_document("C:\\b", github={"command": "node"}))
+        with patch.object(diff, '_diff_objects', wraps=diff._diff_objects) as objects:
+            diff.diff_trees(old, new)
+        visited = [call.args[2] for call in objects.call_args_list]
+        self.assertEqual(visited, [(), ('mcpServers',), ('mcpServers', 'filesystem')])
+
+    def test_format_path(self):
+        """経路の表示のテスト"""
+        self.assertEqual(diff.format_path(('mcpServers', 'a.b', 'args', -1)), 'mcpServers["a.b"].args[-1]')
+        self.assertEqual(diff.format_path(()), '(全体)')
+
+
+class TestBackupDiffer(unittest.TestCase):
+    """バックアップとの差分のテストケース"""
+
+    def setUp(self):
+        """テスト前の準備"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.temp_path = Path(self.temp_dir.name)
+        self.config_path = self.temp_path / 'claude_desktop_config.json'
+        backup_dir = self.temp_path / 'backup'
+
+        store = BackupStore(backup_dir)
+        for i in range(3):
+            self._write(_document(f"C:\\store{i}"))
+            store.put(self.config_path, f"2024010100{i:02d}00")
+        pack = BackupPack(backup_dir)
+        for i in range(2):
+            pack.append_document(_document(f"C:\\pack{i}", memory={"command": "uvx"}),
+                                 timestamp=datetime(2024, 1, 2, 0, i).timestamp())
+
+        self._write(_document("C:\\store2"))
+        self.history = history.BackupHistory(self.config_path)
+        self.differ = diff.BackupDiffer(self.history)
+
+    def tearDown(self):
+        """テスト後のクリーンアップ"""
+        self.temp_dir.cleanup()
+
+    def _write(self, document):
+        with open(self.config_path, 'w') as f:
+            json.dump(document, f)
+
+    def test_counts_and_cache(self):
+        """現在との違いの件数とハッシュ木のキャッシュのテスト"""
+        entries = self.history.entries()
+        self.assertEqual(self.differ.counts(entries), {
+            'pack-1': 2, 'pack-0': 2, '20240101000200': 0, '20240101000100': 1, '20240101000000': 1})
+
+        with patch.object(self.history, 'load') as load, \
+                patch.object(self.history.pack, 'iter_versions') as iter_versions:
+            self.differ.counts(entries)
+        load.assert_not_called()
+        iter_versions.assert_not_called()
+
+        # 現在の設定ファイルが変更されると作り直す
+        self._write(_document("C:\\store0", extra={"command": "x"}))
+        self.assertEqual(self.differ.diff(self.history.find('20240101000000')),
+                         [diff.Change('added', ('mcpServers', 'extra'), None, {"command": "x"})])
+
+    def test_pack_versions(self):
+        """パック形式の複数の版との差分のテスト"""
+        pack = self.history.pack
+        for i in range(2, 5):
+            pack.append_document(_document(f"C:\\pack{i}", memory={"command": "uvx"}),
+                                 timestamp=datetime(2024, 1, 2, 0, i).timestamp())
+        entries = [entry for entry in self.history.entries() if entry.source == history.SOURCE_PACK]
+        self.differ.counts(entries)
+
+        for entry in entries:
+            old = self.history.load(entry)["mcpServers"]["filesystem"]["args"][2]
+            self.assertIn(diff.Change('changed', ('mcpServers', 'filesystem', 'args', 2), old, "C:\\store2"),
+                          self.differ.diff(entry))
+        self.assertEqual(len({old for entry in entries
+                              for kind, path, old, new in self.differ.diff(entry) if kind == 'changed'}), 5)
+
+    def test_cli(self):
+        """--diffのテスト"""
+        args = argparse.Namespace(config=str(self.config_path), diff=['pack-0'])
+        output = io.StringIO()
+        with redirect_stdout(output):
+            self.assertEqual(cli.run_diff_command(args), 0)
+        lines = output.getvalue().splitlines()
+        self.assertTrue(lines[0].startswith('--- pack-0'))
+        self.assertIn('~ mcpServers.filesystem.args[2]: "C:\\\\pack0" -> "C:\\\\store2"', lines)
+        self.assertIn('- mcpServers.memory: {"command": "uvx"}', lines)
+        self.assertEqual(lines[-1], "違い: 2件（追加 0、削除 1、変更 1）")
+
+        args.diff = ['20240101000000', str(self.config_path)]
+        output = io.StringIO()
+        with redirect_stdout(output):
+            self.assertEqual(cli.run_diff_command(args), 0)
+        self.assertIn("違い: 1件", output.getvalue())
+
+        args.diff = ['missing']
+        with redirect_stdout(io.StringIO()), patch('sys.stderr', io.StringIO()):
+            self.assertEqual(cli.run_diff_command(args), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
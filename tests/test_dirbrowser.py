@@ -0,0 +1,75 @@
+"""
+ディレクトリ参照モジュールのテスト
+"""
+
+import unittest
+import os
+import sys
+import tempfile
+
+# モジュールをインポートできるようにシステムパスを調整
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.dirbrowser import DirectoryListing, ListingCache, matches_filter
+
+
+class TestDirectoryListing(unittest.TestCase):
+    """ディレクトリ一覧のテストケース"""
+
+    def setUp(self):
+        """テスト前の準備"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        for i in range(25):
+            os.mkdir(os.path.join(self.temp_dir.name, f'dir{i:02d}'))
+        open(os.path.join(self.temp_dir.name, 'file.txt'), 'w').close()
+
+    def tearDown(self):
+        """テスト後のクリーンアップ"""
+        self.temp_dir.cleanup()
+
+    def test_fetch_pages(self):
+        """ページ単位の読み込みのテスト"""
+        listing = DirectoryListing(self.temp_dir.name)
+
+        names, complete = listing.fetch(0, 10)
+        self.assertEqual(len(names), 10)
+        self.assertFalse(complete)
+        # 必要な分だけ読み込まれている
+        self.assertEqual(len(listing.names), 10)
+
+        names, complete = listing.fetch(10, 10)
+        self.assertEqual(len(names), 10)
+        names, complete = listing.fetch(20, 10)
+        self.assertEqual(len(names), 5)
+        self.assertTrue(complete)
+
+        # ファイルは含まれない
+        self.assertEqual(sorted(listing.names), [f'dir{i:02d}' for i in range(25)])
+
+        # 読み込み済みの範囲はキャッシュから返される
+        self.assertEqual(listing.fetch(0, 10)[0], listing.names[:10])
+
+    def test_missing_directory(self):
+        """存在しないディレクトリのテスト"""
+        listing = DirectoryListing(os.path.join(self.temp_dir.name, 'missing'))
+        self.assertEqual(listing.fetch(0, 10), ([], True))
+        self.assertIsInstance(listing.error, FileNotFoundError)
+
+    def test_cache(self):
+        """セッション中のキャッシュのテスト"""
+        cache = ListingCache()
+        listing = cache.get(self.temp_dir.name)
+        self.assertIs(cache.get(os.path.join(self.temp_dir.name, '.')), listing)
+
+        cache.invalidate(self.temp_dir.name)
+        self.assertIsNot(cache.get(self.temp_dir.name), listing)
+
+    def test_matches_filter(self):
+        """絞り込みのテスト"""
+        self.assertTrue(matches_filter("Documents", "doc"))
+        self.assertTrue(matches_filter("Documents", ""))
+        self.assertFalse(matches_filter("Documents", "ments"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -12,6 +12,8 @@ from unittest.mock import MagicMock, patch
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from src import gui
+from src.profiles import ProfileStore
+from src.tasks import ImmediateExecutor
 
 
 class TestGUI(unittest.TestCase):
@@ -19,8 +21,15 @@ class TestGUI(unittest.TestCase):
     
     def setUp(self):
         """テスト前の準備"""
-        # rootウィンドウをモック化
+        # rootウィンドウをモック化（after()で渡された処理はすぐに実行する）
         self.root = MagicMock()
+        self.root.after.side_effect = lambda delay, func, *args: func(*args)
+        
+        # ファイル操作をテストのスレッド上で同期的に実行する
+        self.executor = ImmediateExecutor()
+        
+        # プロファイルはメモリ上のデータベースに保存する
+        self.profile_store = ProfileStore(':memory:')
         
         # configモジュールをパッチ
         self.config_patcher = patch('src.config')
@@ -57,7 +66,7 @@ class TestGUI(unittest.TestCase):
     def test_load_config(self, mock_showerror):
         """設定読み込み機能のテスト"""
         # GUIアプリケーションのインスタンス作成
-        app = gui.ConfigEditorApp(self.root)
+        app = gui.ConfigEditorApp(self.root, executor=self.executor, profile_store=self.profile_store)
         
         # 初期化時に自動的に設定が読み込まれるので、モックが呼び出されたか確認
         self.mock_config.load_config.assert_called_once()
@@ -69,6 +78,18 @@ class TestGUI(unittest.TestCase):
         # エラーメッセージが表示されていないことを確認
         mock_showerror.assert_not_called()
     
+    @patch('tkinter.messagebox.showerror')
+    def test_load_initial_config_path(self, mock_showerror):
+        """指定されたパスの設定が最初に読み込まれるかのテスト"""
+        app = gui.ConfigEditorApp(self.root, executor=self.executor, profile_store=self.profile_store,
+                                  config_path="D:\\other\\config.json")
+        
+        # デフォルトの設定ではなく、指定された設定だけが読み込まれる
+        self.mock_config.load_config.assert_called_once_with("D:\\other\\config.json")
+        self.mock_config.get_default_config_path.assert_not_called()
+        self.assertEqual(app.config_path_var.get(), "D:\\other\\config.json")
+        mock_showerror.assert_not_called()
+    
     @patch('tkinter.messagebox.showerror')
     def test_load_config_error(self, mock_showerror):
         """設定読み込みエラーのテスト"""
@@ -76,11 +97,35 @@ class TestGUI(unittest.TestCase):
         self.mock_config.load_config.side_effect = FileNotFoundError("ファイルが見つかりません")
         
         # GUIアプリケーションのインスタンス作成
-        app = gui.ConfigEditorApp(self.root)
+        app = gui.ConfigEditorApp(self.root, executor=self.executor, profile_store=self.profile_store)
         
         # エラーメッセージが表示されたことを確認
         mock_showerror.assert_called_once()
     
+    @patch('tkinter.messagebox.showerror')
+    def test_load_config_cancelled(self, mock_showerror):
+        """中止を要求した読み込みが画面の設定データを置き換えないかのテスト"""
+        app = gui.ConfigEditorApp(self.root, executor=self.executor, profile_store=self.profile_store)
+        loaded = app.config_data
+        
+        # 中止が要求された状態で処理を実行するエグゼキュータ
+        class CancelledExecutor(ImmediateExecutor):
+            def submit(self, function, cancel_event):
+                cancel_event.set()
+                return super().submit(function, cancel_event)
+        
+        app.tasks.executor = CancelledExecutor()
+        self.mock_config.load_config.return_value = {"mcpServers": {"filesystem": {"args": ["D:\\other"]}}}
+        self.mock_config.get_mcp_path.return_value = "D:\\other"
+        app.config_path_var.set("D:\\other\\config.json")
+        app.load_config()
+        
+        self.assertIs(app.config_data, loaded)
+        self.assertEqual(app.current_path_var.get(), "C:\\test\\target")
+        self.assertEqual(app.status_var.get(), "読み込みを中止しました。")
+        self.assertIsNone(app.current_task)
+        mock_showerror.assert_not_called()
+    
     @patch('tkinter.messagebox.showinfo')
     @patch('tkinter.messagebox.askyesno')
     def test_save_config(self, mock_askyesno, mock_showinfo):
@@ -88,7 +133,7 @@ class TestGUI(unittest.TestCase):
         # ディレクトリが存在するように設定
         with patch('os.path.exists', return_value=True):
             # GUIアプリケーションのインスタンス作成
-            app = gui.ConfigEditorApp(self.root)
+            app = gui.ConfigEditorApp(self.root, executor=self.executor, profile_store=self.profile_store)
             
             # 新しいパスを設定
             app.new_path_var.set("C:\\new\\path")
@@ -109,7 +154,7 @@ class TestGUI(unittest.TestCase):
         # ディレクトリが存在しないように設定
         with patch('os.path.exists', return_value=False):
             # GUIアプリケーションのインスタンス作成
-            app = gui.ConfigEditorApp(self.root)
+            app = gui.ConfigEditorApp(self.root, executor=self.executor, profile_store=self.profile_store)
             
             # 新しいパスを設定
             app.new_path_var.set("C:\\nonexistent\\path")
@@ -128,7 +173,7 @@ class TestGUI(unittest.TestCase):
     def test_browse_directory(self, mock_askdirectory):
         """ディレクトリ参照機能のテスト"""
         # GUIアプリケーションのインスタンス作成
-        app = gui.ConfigEditorApp(self.root)
+        app = gui.ConfigEditorApp(self.root, executor=self.executor, profile_store=self.profile_store)
         
         # 参照ダイアログを呼び出す
         app._browse_directory()
@@ -0,0 +1,146 @@
+"""
+バックアップ履歴モジュールのテスト
+"""
+
+import unittest
+import argparse
+import io
+import json
+import os
+import sys
+import tempfile
+from contextlib import redirect_stdout
+from datetime import datetime
+from pathlib import Path
+
+# モジュールをインポートできるようにシステムパスを調整
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src import cli
+from src import history
+from src.backup_pack import BackupPack
+from src.backup_store import BackupStore
+
+
+def _document(target):
+    """テスト用の設定データを作成します"""
+    return {"mcpServers": {"filesystem": {"command": "node", "args": ["index.js", target]}}}
+
+
+class TestHistory(unittest.TestCase):
+    """バックアップ履歴のテストケース"""
+
+    def setUp(self):
+        """テスト前の準備"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.temp_path = Path(self.temp_dir.name)
+        self.config_path = self.temp_path / 'claude_desktop_config.json'
+        backup_dir = self.temp_path / 'backup'
+
+        # 通常形式: 2024-01-01 00:00:00 から1分ごとに3件
+        store = BackupStore(backup_dir)
+        for i in range(3):
+            self._write(_document(f"C:\\store{i}"))
+            store.put(self.config_path, f"2024010100{i:02d}00")
+
+        # パック形式: 2024-01-02 に2件
+        pack = BackupPack(backup_dir)
+        for i in range(2):
+            pack.append_document(_document(f"C:\\pack{i}"), timestamp=datetime(2024, 1, 2, 0, i).timestamp())
+
+        self._write(_document("C:\\current"))
+        self.history = history.BackupHistory(self.config_path)
+
+    def tearDown(self):
+        """テスト後のクリーンアップ"""
+        self.temp_dir.cleanup()
+
+    def _write(self, document):
+        with open(self.config_path, 'w') as f:
+            json.dump(document, f)
+
+    def test_entries_and_pages(self):
+        """新しい順の一覧とページ分けのテスト"""
+        ids = [entry.id for entry in self.history.entries()]
+        self.assertEqual(ids, ['pack-1', 'pack-0', '20240101000200', '20240101000100', '20240101000000'])
+        self.assertEqual(self.history.page_count(2), 3)
+        self.assertEqual([entry.id for entry in self.history.page(2, 2)], ['20240101000200', '20240101000100'])
+        self.assertEqual(self.history.page(4, 2), [])
+
+        # インデックスが変わると一覧を作り直す
+        BackupStore(self.temp_path / 'backup').put(self.config_path, '20240103000000')
+        self.assertEqual(self.history.entries()[0].id, '20240103000000')
+        self.assertEqual(self.history.count(), 6)
+
+    def test_import_legacy(self):
+        """ストア導入前のバックアップが一度だけカタログに取り込まれることのテスト"""
+        backup_dir = self.temp_path / 'backup'
+        store = BackupStore(backup_dir)
+        legacy = []
+        for i, target in enumerate(["C:\\legacy0", "C:\\legacy1", "C:\\store0"]):
+            path = backup_dir / f'claude_desktop_config_backup_2023120100000{i}.json'
+            with open(path, 'w') as f:
+                json.dump(_document(target), f)
+            legacy.append(path)
+        # 日時形式でないファイルは取り込まない
+        with open(backup_dir / 'claude_desktop_config_backup_manual.json', 'w') as f:
+            f.write('{}')
+
+        ids = [entry.id for entry in self.history.entries()]
+        self.assertEqual(ids[-3:], ['20231201000002', '20231201000001', '20231201000000'])
+        self.assertEqual(self.history.count(), 8)
+        previews = self.history.previews(self.history.entries())
+        self.assertEqual(previews['20231201000001'], "C:\\legacy1")
+        self.assertEqual(self.history.load(self.history.find('20231201000000')), _document("C:\\legacy0"))
+
+        # ファイルはそのまま本体へのハードリンクとして残る（同じ内容の本体があればそのリンクになる）
+        for path in legacy:
+            backup_id = path.stem[len(BackupStore.SNAPSHOT_PREFIX):]
+            self.assertEqual(path, store.snapshot_path(backup_id))
+            digest = self.history.find(backup_id).ref
+            self.assertTrue(os.path.samefile(path, store.blob_path(digest)))
+        self.assertEqual(len(list((backup_dir / 'objects').glob('*/*.json'))), 5)
+
+        # 取り込みは一度だけ
+        self.assertEqual(store.import_legacy(), 0)
+        self.assertEqual(len(history.BackupHistory(self.config_path).entries()), 8)
+
+    def test_previews_and_load(self):
+        """パスのプレビューと内容の読み込みのテスト"""
+        previews = self.history.previews(self.history.entries())
+        self.assertEqual(previews['pack-1'], "C:\\pack1")
+        self.assertEqual(previews['20240101000000'], "C:\\store0")
+
+        entry = self.history.find('pack-0')
+        self.assertEqual(self.history.load(entry), _document("C:\\pack0"))
+        self.assertEqual(self.history.load(self.history.find('20240101000100')), _document("C:\\store1"))
+        self.assertIsNone(self.history.find('missing'))
+
+    def test_cli(self):
+        """--list-backupsと--restoreのテスト"""
+        args = argparse.Namespace(config=str(self.config_path), page=1, page_size=2, restore='20240101000100',
+                                  no_backup=False, backup_mode=None)
+        output = io.StringIO()
+        with redirect_stdout(output):
+            self.assertEqual(cli.run_list_backups_command(args), 0)
+        lines = output.getvalue().splitlines()
+        self.assertIn("5件（1/3ページ）", lines[0])
+        self.assertTrue(lines[1].startswith('pack-1') and lines[1].endswith("C:\\pack1"))
+        self.assertEqual(len(lines), 3)
+
+        with redirect_stdout(io.StringIO()):
+            self.assertEqual(cli.run_restore_command(args), 0)
+        with open(self.config_path) as f:
+            self.assertEqual(json.load(f), _document("C:\\store1"))
+
+        # 復元前の内容はバックアップされている
+        previews = history.BackupHistory(self.config_path).previews(self.history.entries())
+        self.assertIn("C:\\current", previews.values())
+
+        args.restore = 'missing'
+        with redirect_stdout(io.StringIO()):
+            self.assertEqual(cli.run_restore_command(args), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
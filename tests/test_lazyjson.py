@@ -0,0 +1,118 @@
+"""
+遅延JSONアクセスモジュールのテスト
+"""
+
+import unittest
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+# モジュールをインポートできるようにシステムパスを調整
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src import config, lazyjson
+
+
+class TestLazyJson(unittest.TestCase):
+    """遅延JSONアクセスのテストケース"""
+
+    def setUp(self):
+        """テスト前の準備"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.config_file = Path(self.temp_dir.name) / 'config.json'
+        servers = {
+            f"server{i}": {"command": "node", "args": ["a\\\"]"], "env": {"KEY": "値" * 100}}
+            for i in range(200)
+        }
+        servers["filesystem"] = {"command": "node", "args": ["index.js", "C:\\パス\\test"]}
+        self.document = {"mcpServers": servers, "other": [1, 2.5, None, True]}
+        with open(self.config_file, 'w', encoding='utf-8') as f:
+            json.dump(self.document, f, indent=4, ensure_ascii=False)
+
+    def tearDown(self):
+        """テスト後のクリーンアップ"""
+        self.temp_dir.cleanup()
+
+    def test_locate(self):
+        """文字列上での値の位置の特定のテスト"""
+        text = '{"a": {"b\\"": [1, {"c": "x"}, 3]}, "d": 42}'
+        start, end = lazyjson.locate(text, ['a', 'b"', 1, 'c'])
+        self.assertEqual(text[start:end], '"x"')
+        start, end = lazyjson.locate(text, ['a', 'b"', -1])
+        self.assertEqual(text[start:end], '3')
+        start, end = lazyjson.locate(text, ['d'])
+        self.assertEqual(text[start:end], '42')
+
+    def test_locate_missing(self):
+        """存在しないキー・範囲外のインデックスのテスト"""
+        text = '{"a": [1, 2], "b": {}}'
+        with self.assertRaises(KeyError):
+            lazyjson.locate(text, ['c'])
+        with self.assertRaises(KeyError):
+            lazyjson.locate(text, ['b', 'x'])
+        with self.assertRaises(IndexError):
+            lazyjson.locate(text, ['a', 5])
+        with self.assertRaises(json.JSONDecodeError):
+            lazyjson.locate('{"a": [1, ', ['a', 1])
+
+    def test_extract(self):
+        """ファイルからの値の取り出しのテスト"""
+        self.assertEqual(lazyjson.extract(self.config_file, ['mcpServers', 'filesystem', 'args', -1]),
+                         "C:\\パス\\test")
+        self.assertEqual(lazyjson.extract(self.config_file, ['other']), [1, 2.5, None, True])
+
+    def test_extract_with_small_window(self):
+        """先頭部分に値がない場合に全体をデコードするかのテスト"""
+        with patch.object(lazyjson, 'INITIAL_WINDOW', 100):
+            with lazyjson.LazyDocument(self.config_file) as document:
+                self.assertEqual(document.get(['mcpServers', 'server0', 'command']), "node")
+                self.assertEqual(document.get(['mcpServers', 'filesystem', 'args', 1]), "C:\\パス\\test")
+                self.assertEqual(document.get(['other', 3]), True)
+                with self.assertRaises(KeyError):
+                    document.get(['missing'])
+
+    def test_skip_without_decoding(self):
+        """兄弟要素を値を作らずに読み飛ばすかのテスト"""
+        with patch.object(lazyjson._decoder, 'raw_decode', wraps=lazyjson._decoder.raw_decode) as raw_decode:
+            self.assertEqual(lazyjson.extract(self.config_file, ['other', 1]), 2.5)
+        # 取り出す値だけをデコードする
+        self.assertEqual(raw_decode.call_count, 1)
+
+        text = '{"a": ["]", {"b": "}\\\\"}, -1.5e3, null], "c": true}'
+        self.assertEqual(lazyjson.locate(text, ['c']), (text.index('true'), text.index('true') + 4))
+        with self.assertRaises(json.JSONDecodeError):
+            lazyjson.locate('{"a": [1}, "c": 2}', ['c'])
+
+    def test_trailing_data(self):
+        """最上位の値の後ろに余分なデータがある文書のテスト"""
+        with self.assertRaises(json.JSONDecodeError):
+            lazyjson.locate('{"a": 1} x', ['a'])
+        self.assertEqual(lazyjson.locate('{"a": 1}\n', ['a']), (6, 7))
+
+        # 先頭部分で値が見つかる大きなファイルでも検出する
+        with open(self.config_file, 'a', encoding='utf-8') as f:
+            f.write('\nx\n')
+        with patch.object(lazyjson, 'INITIAL_WINDOW', 100):
+            with self.assertRaises(json.JSONDecodeError):
+                lazyjson.extract(self.config_file, ['mcpServers', 'server0', 'command'])
+
+    def test_materialize(self):
+        """完全な設定データへの切り替えのテスト"""
+        with lazyjson.LazyDocument(self.config_file) as document:
+            self.assertEqual(document.materialize(), self.document)
+
+    def test_read_mcp_path(self):
+        """設定ファイル全体を解析しないパスの読み込みのテスト"""
+        self.assertEqual(config.read_mcp_path(self.config_file), "C:\\パス\\test")
+
+        with open(self.config_file, 'w') as f:
+            json.dump({"mcpServers": {"filesystem": {"args": []}}}, f)
+        with self.assertRaises(KeyError):
+            config.read_mcp_path(self.config_file)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+"""
+設定ファイルの場所を解決するモジュールのテスト
+"""
+
+import unittest
+import os
+import sys
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+# モジュールをインポートできるようにシステムパスを調整
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src import locator
+
+
+class TestLocator(unittest.TestCase):
+    """設定ファイルの場所の解決のテストケース"""
+
+    def setUp(self):
+        """テスト前の準備"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.temp_path = Path(self.temp_dir.name)
+        self.paths = [self.temp_path / name / 'config.json' for name in ('first', 'second', 'third')]
+        self.now = 0.0
+        self.locator = locator.ConfigLocator(candidates=lambda: self.paths, ttl=30, negative_ttl=5,
+                                             clock=lambda: self.now)
+
+    def tearDown(self):
+        """テスト後のクリーンアップ"""
+        self.temp_dir.cleanup()
+
+    def _create(self, path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text('{}')
+
+    def test_resolve(self):
+        """存在する候補・既定の候補の解決のテスト"""
+        self.assertIsNone(self.locator.find())
+        self.assertEqual(self.locator.resolve(), self.paths[0])
+
+        self._create(self.paths[1])
+        self.locator.invalidate()
+        self.assertEqual(self.locator.resolve(), self.paths[1])
+
+    def test_cache_and_ttl(self):
+        """結果のキャッシュと有効期限のテスト"""
+        self.locator.resolve()
+        self.assertEqual(self.locator.stats, 3)
+
+        # 有効期限内はstatを行わない
+        self._create(self.paths[2])
+        self.assertEqual(self.locator.resolve(), self.paths[0])
+        self.assertEqual(self.locator.stats, 3)
+
+        # 存在しないという結果は短い期限で確認し直す
+        self.now = 6.0
+        self.assertEqual(self.locator.resolve(), self.paths[2])
+        self.assertEqual(self.locator.stats, 6)
+
+        # 存在するという結果は長くキャッシュされる
+        self.now = 12.0
+        self.locator.resolve()
+        self.assertEqual(self.locator.stats, 8)
+        self.assertTrue(self.locator.exists(self.paths[2]))
+        self.assertEqual(self.locator.stats, 8)
+
+    def test_invalidate_path(self):
+        """パスを指定したキャッシュの破棄のテスト"""
+        self.assertFalse(self.locator.exists(self.paths[0]))
+        self._create(self.paths[0])
+        self.locator.invalidate(self.paths[0])
+        self.assertTrue(self.locator.exists(self.paths[0]))
+
+    def test_candidate_paths(self):
+        """OSごとの候補パスのテスト"""
+        with patch.dict(os.environ, {'APPDATA': str(self.temp_path / 'Roaming'), 'LOCALAPPDATA': ''}):
+            windows = locator.candidate_paths('Windows')
+        self.assertEqual(windows[0], self.temp_path / 'Roaming' / 'Claude' / locator.CONFIG_FILENAME)
+        self.assertEqual(len(windows), len(set(windows)))
+
+        self.assertEqual(locator.candidate_paths('Linux')[0],
+                         Path.home() / '.config' / 'Claude' / locator.CONFIG_FILENAME)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+"""
+解析結果キャッシュモジュールのテスト
+"""
+
+import unittest
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# モジュールをインポートできるようにシステムパスを調整
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.parse_cache import ParseCache, clone
+
+
+class TestParseCache(unittest.TestCase):
+    """解析結果キャッシュのテストケース"""
+
+    def setUp(self):
+        """テスト前の準備"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.temp_path = Path(self.temp_dir.name)
+        self.config_file = self.temp_path / 'config.json'
+        self._write("C:\\a")
+        self.cache = ParseCache()
+
+    def tearDown(self):
+        """テスト後のクリーンアップ"""
+        self.temp_dir.cleanup()
+
+    def _write(self, target, path=None):
+        with open(path or self.config_file, 'w') as f:
+            json.dump({"mcpServers": {"filesystem": {"args": ["index.js", target]}}}, f)
+
+    def test_hit_and_miss(self):
+        """変更されていないファイルがキャッシュから返されるかのテスト"""
+        first = self.cache.load(self.config_file)
+        second = self.cache.load(self.config_file)
+
+        self.assertEqual(first, second)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_returned_value_is_isolated(self):
+        """返された値を変更してもキャッシュが壊れないかのテスト"""
+        document = self.cache.load(self.config_file)
+        document["mcpServers"]["filesystem"]["args"][-1] = "changed"
+
+        self.assertEqual(self.cache.load(self.config_file)["mcpServers"]["filesystem"]["args"][-1], "C:\\a")
+
+    def test_change_is_detected(self):
+        """ファイルの変更が検出されるかのテスト"""
+        self.cache.load(self.config_file)
+        self._write("C:\\longer\\path")
+
+        document = self.cache.load(self.config_file)
+        self.assertEqual(document["mcpServers"]["filesystem"]["args"][-1], "C:\\longer\\path")
+        self.assertEqual(self.cache.misses, 2)
+
+    def test_lru_eviction(self):
+        """上限を超えた場合に古いエントリが破棄されるかのテスト"""
+        paths = []
+        for i in range(3):
+            path = self.temp_path / f'config{i}.json'
+            self._write(f"C:\\{i}", path)
+            paths.append(path)
+        size = os.path.getsize(paths[0])
+
+        cache = ParseCache(max_bytes=size * 2)
+        for path in paths:
+            cache.load(path)
+        self.assertEqual(len(cache), 2)
+
+        # 最初のファイルは破棄されているため再解析される
+        cache.load(paths[0])
+        self.assertEqual(cache.misses, 4)
+
+    def test_invalidate(self):
+        """明示的な破棄のテスト"""
+        self.cache.load(self.config_file)
+        self.cache.invalidate(self.config_file)
+        self.assertEqual(len(self.cache), 0)
+
+    def test_clone(self):
+        """JSON値の複製のテスト"""
+        value = {"a": [1, {"b": "c"}], "d": None}
+        copied = clone(value)
+        self.assertEqual(copied, value)
+        self.assertIsNot(copied["a"][1], value["a"][1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+"""
+パスの存在確認モジュールのテスト
+"""
+
+import unittest
+import os
+import sys
+import tempfile
+import threading
+from unittest.mock import patch
+
+# モジュールをインポートできるようにシステムパスを調整
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src import pathcheck
+
+
+class TestPathCheck(unittest.TestCase):
+    """パスの存在確認のテストケース"""
+
+    def setUp(self):
+        """テスト前の準備"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.now = 0.0
+        self.checker = pathcheck.PathChecker(timeout=1.0, ttl=10.0, clock=lambda: self.now)
+
+    def tearDown(self):
+        """テスト後のクリーンアップ"""
+        self.temp_dir.cleanup()
+
+    def test_check(self):
+        """存在確認とキャッシュのテスト"""
+        missing = os.path.join(self.temp_dir.name, 'missing')
+        self.assertEqual(self.checker.check(self.temp_dir.name), pathcheck.EXISTS)
+        self.assertEqual(self.checker.check(missing), pathcheck.MISSING)
+        self.assertEqual(self.checker.check(''), pathcheck.MISSING)
+
+        # 有効期限内はキャッシュの結果を返す
+        os.mkdir(missing)
+        self.assertEqual(self.checker.cached(missing), pathcheck.MISSING)
+        self.now = 11.0
+        self.assertIsNone(self.checker.cached(missing))
+        self.assertEqual(self.checker.check(missing), pathcheck.EXISTS)
+
+    def test_timeout(self):
+        """応答のないパスで時間制限が守られるかのテスト"""
+        release = threading.Event()
+
+        def slow_exists(path):
+            release.wait(5.0)
+            return True
+
+        with patch('os.path.exists', side_effect=slow_exists):
+            self.assertEqual(self.checker.check('//server/share', timeout=0.05), pathcheck.TIMEOUT)
+            # 確認が終わるまではタイムアウトの結果がキャッシュされ、再び待たされない
+            self.assertEqual(self.checker.cached('//server/share'), pathcheck.TIMEOUT)
+
+            release.set()
+            self.checker.check('//other', timeout=1.0)
+        # 遅れて終わった確認の結果でキャッシュが更新される
+        for _ in range(100):
+            if self.checker.cached('//server/share') == pathcheck.EXISTS:
+                break
+            threading.Event().wait(0.01)
+        self.assertEqual(self.checker.cached('//server/share'), pathcheck.EXISTS)
+
+    def test_check_async(self):
+        """非同期の確認のテスト"""
+        results = []
+        done = threading.Event()
+
+        def callback(path, verdict):
+            results.append((path, verdict))
+            done.set()
+
+        self.checker.check_async(self.temp_dir.name, callback)
+        self.assertTrue(done.wait(2.0))
+        self.assertEqual(results, [(self.temp_dir.name, pathcheck.EXISTS)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+"""
+プロファイル保存モジュールのテスト
+"""
+
+import unittest
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# モジュールをインポートできるようにシステムパスを調整
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.profiles import ProfileStore
+
+
+class TestProfiles(unittest.TestCase):
+    """プロファイル保存のテストケース"""
+
+    def setUp(self):
+        """テスト前の準備"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.database = Path(self.temp_dir.name) / 'data' / 'profiles.sqlite3'
+        self.store = ProfileStore(self.database)
+
+    def tearDown(self):
+        """テスト後のクリーンアップ"""
+        self.store.close()
+        self.temp_dir.cleanup()
+
+    def test_lazy_open(self):
+        """最初の問い合わせまでデータベースを開かないかのテスト"""
+        self.assertFalse(self.database.exists())
+        self.assertEqual(self.store.count(), 0)
+        self.assertTrue(self.database.exists())
+
+    def test_save_and_get(self):
+        """保存・上書き・削除のテスト"""
+        self.store.save("work", "C:\\work")
+        self.store.save("work", "D:\\work")
+        self.assertEqual(self.store.get("work"), "D:\\work")
+        self.assertIsNone(self.store.get("missing"))
+
+        self.assertTrue(self.store.delete("work"))
+        self.assertFalse(self.store.delete("work"))
+        self.assertEqual(self.store.count(), 0)
+
+    def test_persistence(self):
+        """再度開いたときに保存内容が残っているかのテスト"""
+        self.store.save("home", "C:\\Users\\me")
+        self.store.close()
+
+        reopened = ProfileStore(self.database)
+        self.assertEqual(reopened.get("home"), "C:\\Users\\me")
+        reopened.close()
+
+    def test_search(self):
+        """名前・パスの前方一致検索のテスト"""
+        for i in range(30):
+            self.store.save(f"project{i:02d}", f"C:\\Projects\\p{i:02d}")
+        self.store.save("Private", "D:\\private")
+
+        names = [name for name, _ in self.store.search("pr", limit=5)]
+        self.assertEqual(names, ["Private", "project00", "project01", "project02", "project03"])
+        self.assertEqual(len(self.store.search("PROJECT1")), 10)
+        self.assertEqual(len(self.store.search("")), 31)
+        self.assertEqual(self.store.search("x"), [])
+
+        self.assertEqual(self.store.search_path("c:/projects/p2", limit=2),
+                         [("project20", "C:\\Projects\\p20"), ("project21", "C:\\Projects\\p21")])
+
+    def test_index_is_used(self):
+        """前方一致検索でインデックスが使われるかのテスト"""
+        self.store.count()
+        plan = self.store._connection.execute(
+            "EXPLAIN QUERY PLAN SELECT name, path FROM profiles WHERE name_key >= ? AND name_key < ? "
+            "ORDER BY name_key LIMIT 50", ("a", "b")).fetchall()
+        self.assertIn("profiles_name_key", " ".join(str(row) for row in plan))
+
+
+if __name__ == '__main__':
+    unittest.main()
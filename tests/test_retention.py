@@ -0,0 +1,146 @@
+"""
+バックアップ保持ポリシーモジュールのテスト
+"""
+
+import unittest
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest.mock import patch
+
+# モジュールをインポートできるようにシステムパスを調整
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src import retention
+from src.backup_store import BackupEntry, BackupStore
+
+
+def _entries(count, step, start=datetime(2025, 1, 1)):
+    """一定間隔のダミーエントリを古い順に作成します"""
+    return [BackupEntry((start + step * i).strftime('%Y%m%d%H%M%S'), f'h{i}', 10)
+            for i in range(count)]
+
+
+class TestRetention(unittest.TestCase):
+    """保持ポリシーのテストケース"""
+
+    def setUp(self):
+        """テスト前の準備"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.temp_path = Path(self.temp_dir.name)
+        self.config_file = self.temp_path / 'claude_desktop_config.json'
+        self.backup_dir = self.temp_path / 'backup'
+        self.store = BackupStore(self.backup_dir)
+
+    def tearDown(self):
+        """テスト後のクリーンアップ"""
+        self.temp_dir.cleanup()
+
+    def _put(self, backup_id, value):
+        with open(self.config_file, 'w') as f:
+            json.dump({"value": value}, f)
+        return self.store.put(self.config_file, backup_id)
+
+    def test_keep_last(self):
+        """最新N件の保持のテスト"""
+        policy = retention.RetentionPolicy(keep_last=3, hourly=0, daily=0, weekly=0, monthly=0,
+                                           max_bytes=None)
+        kept = retention.select_entries(_entries(10, timedelta(minutes=1)), policy)
+        self.assertEqual([entry.digest for entry in kept], ['h7', 'h8', 'h9'])
+
+    def test_generational_thinning(self):
+        """世代別の間引きのテスト（1日ごとに最新の1件）"""
+        policy = retention.RetentionPolicy(keep_last=1, hourly=0, daily=3, weekly=0, monthly=0,
+                                           max_bytes=None)
+        kept = retention.select_entries(_entries(96, timedelta(hours=1)), policy)
+
+        # 直近3日分の各日の最後のエントリが残る
+        self.assertEqual([entry.id[:10] for entry in kept], ['2025010223', '2025010323', '2025010423'])
+
+    def test_size_cap(self):
+        """容量上限のテスト"""
+        policy = retention.RetentionPolicy(keep_last=10, hourly=0, daily=0, weekly=0, monthly=0,
+                                           max_bytes=35)
+        kept = retention.select_entries(_entries(10, timedelta(minutes=1)), policy)
+        self.assertEqual(len(kept), 3)
+
+    def test_prune_removes_files_and_keeps_catalog_consistent(self):
+        """整理でファイルが削除され、カタログと一致するかのテスト"""
+        for i in range(6):
+            # 同じ内容を2回ずつ保存する
+            self._put(f'2025010100000{i}', i // 2)
+
+        policy = retention.RetentionPolicy(keep_last=3, hourly=0, daily=0, weekly=0, monthly=0,
+                                           max_bytes=None)
+        dropped, freed = retention.prune(self.backup_dir, policy)
+
+        self.assertEqual(dropped, 3)
+        self.assertGreater(freed, 0)
+        ids = [entry.id for entry in self.store.entries()]
+        self.assertEqual(ids, ['20250101000003', '20250101000004', '20250101000005'])
+        self.assertFalse(self.store.snapshot_path('20250101000000').exists())
+
+        # 残ったエントリの本体はすべて存在する
+        for entry in self.store.entries():
+            self.assertTrue(self.store.blob_path(entry.digest).exists())
+        self.assertEqual(len(list((self.backup_dir / 'objects').rglob('*.json'))), 2)
+
+    def test_latest_reads_catalog_tail(self):
+        """カタログ末尾から最新エントリを求めるテスト"""
+        self.assertIsNone(self.store.latest())
+        for i in range(300):
+            self._put(f'{20250101000000 + i}', i)
+        self.assertEqual(self.store.latest().id, '20250101000299')
+
+        # 最新が削除された場合は1つ前のエントリになる
+        self.store.drop(['20250101000299'])
+        self.assertEqual(self.store.latest().id, '20250101000298')
+
+    def test_background_pruner(self):
+        """バックグラウンド整理のテスト"""
+        for i in range(5):
+            self._put(f'2025010100000{i}', i)
+
+        policy = retention.RetentionPolicy(keep_last=2, hourly=0, daily=0, weekly=0, monthly=0,
+                                           max_bytes=None)
+        pruner = retention.BackgroundPruner(policy, min_interval=0)
+        pruner.schedule(self.backup_dir)
+
+        # 整理はスレッド上で実行され、エントリが2件まで減る
+        for _ in range(50):
+            if len(self.store.entries()) == 2:
+                break
+            time.sleep(0.02)
+        self.assertEqual(len(self.store.entries()), 2)
+        self.assertIsNone(pruner.last_error)
+
+    def test_background_pruner_interval(self):
+        """整理中に予約し直しても、最小間隔内に整理が重ねて実行されないことのテスト"""
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def slow_prune(backup_dir, policy):
+            calls.append(backup_dir)
+            started.set()
+            release.wait(2.0)
+            return 0, 0
+
+        pruner = retention.BackgroundPruner(min_interval=60)
+        with patch.object(retention, 'prune', side_effect=slow_prune):
+            pruner.schedule(self.backup_dir)
+            self.assertTrue(started.wait(2.0))
+            pruner.schedule(self.backup_dir)
+            pruner.schedule(self.backup_dir)
+            release.set()
+            time.sleep(0.1)
+        self.assertEqual(len(calls), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
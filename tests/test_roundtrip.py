@@ -0,0 +1,87 @@
+"""
+書式を保つ書き込みモジュールのテスト
+"""
+
+import unittest
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# モジュールをインポートできるようにシステムパスを調整
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src import roundtrip
+
+
+TEXT = """{
+  "mcpServers": {
+    "filesystem": {"command": "npx", "args": ["index.js", "C:\\\\a"]},
+    "other": {
+      "args": [1, 2],
+      "env": {}
+    }
+  },
+  "z": 1
+}
+"""
+
+
+class TestRoundtrip(unittest.TestCase):
+    """書式を保つ書き込みのテストケース"""
+
+    def setUp(self):
+        """テスト前の準備"""
+        self.old = json.loads(TEXT)
+        self.new = json.loads(TEXT)
+
+    def test_changed_paths(self):
+        """書き換えが必要な経路の算出のテスト"""
+        self.new["mcpServers"]["filesystem"]["args"][-1] = "D:\\b"
+        self.new["mcpServers"]["other"]["env"]["A"] = "b"
+        del self.new["z"]
+
+        self.assertEqual(sorted(roundtrip.changed_paths(self.old, self.new), key=len), [
+            (),
+        ])
+
+        self.new["z"] = 1
+        self.assertEqual(sorted(roundtrip.changed_paths(self.old, self.new)), [
+            ('mcpServers', 'filesystem', 'args', 1),
+            ('mcpServers', 'other', 'env'),
+        ])
+
+    def test_patch_scalar(self):
+        """値の書き換えで他の部分が変わらないかのテスト"""
+        self.new["mcpServers"]["filesystem"]["args"][-1] = "D:\\b"
+        patched = roundtrip.patch_text(TEXT, self.old, self.new)
+        self.assertEqual(patched, TEXT.replace('"C:\\\\a"', '"D:\\\\b"'))
+
+    def test_patch_containers(self):
+        """オブジェクト・配列の書き換えが元の書式に合わせられるかのテスト"""
+        self.new["mcpServers"]["other"]["args"].append(3)
+        self.new["mcpServers"]["other"]["env"]["A"] = "b"
+        patched = roundtrip.patch_text(TEXT.replace('\n', '\r\n'), self.old, self.new)
+
+        self.assertEqual(patched, TEXT.replace('[1, 2]', '[1, 2, 3]').replace(
+            '"env": {}', '"env": {\n        "A": "b"\n      }').replace('\n', '\r\n'))
+        self.assertEqual(json.loads(patched), self.new)
+
+    def test_render(self):
+        """ファイルからの書き込み内容の作成のテスト"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            config_file = Path(temp_dir) / 'config.json'
+            self.assertIsNone(roundtrip.render(config_file, self.new))
+
+            config_file.write_bytes(('\ufeff' + TEXT).encode('utf-8'))
+            self.new["z"] = 2
+            data = roundtrip.render(config_file, self.new)
+            self.assertEqual(data, ('\ufeff' + TEXT.replace('"z": 1', '"z": 2')).encode('utf-8'))
+
+            # ルートの置き換えは部分的に書き換えられない
+            self.assertIsNone(roundtrip.render(config_file, {"other": True}))
+
+
+if __name__ == '__main__':
+    unittest.main()
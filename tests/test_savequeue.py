@@ -0,0 +1,151 @@
+"""
+保存キューモジュールのテスト
+"""
+
+import unittest
+import json
+import os
+import sys
+import tempfile
+import threading
+from pathlib import Path
+from unittest.mock import patch
+
+# モジュールをインポートできるようにシステムパスを調整
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src import config
+from src import utils
+from src.backup_store import BackupEntry, BackupStore, entry_time
+from src.savequeue import SaveQueue
+
+
+class TestSaveQueue(unittest.TestCase):
+    """保存キューのテストケース"""
+
+    def setUp(self):
+        """テスト前の準備"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.temp_path = Path(self.temp_dir.name)
+        self.config_path = self.temp_path / 'claude_desktop_config.json'
+        with open(self.config_path, 'w') as f:
+            json.dump({"mcpServers": {"filesystem": {"command": "npx", "args": ["-y", "C:\\old"]}}}, f)
+        self.store = BackupStore(self.temp_path / 'backup')
+
+    def tearDown(self):
+        """テスト後のクリーンアップ"""
+        self.temp_dir.cleanup()
+
+    def _load(self):
+        with open(self.config_path) as f:
+            return json.load(f)
+
+    def test_flush_merges_mutations(self):
+        """複数の変更が1回のバックアップと書き込みにまとめられることのテスト"""
+        queue = SaveQueue(self.config_path, delay=60)
+        queue.set_mcp_path("D:\\first")
+        queue.apply_edits({"mcpServers.filesystem.command": "node"})
+        queue.set_mcp_path("D:\\second")
+        self.assertEqual(queue.pending, 3)
+        self.assertEqual(self._load()["mcpServers"]["filesystem"]["args"][-1], "C:\\old")
+
+        with patch.object(config, 'save_config', wraps=config.save_config) as save:
+            result = queue.flush()
+        self.assertTrue(result.written)
+        self.assertEqual(save.call_count, 1)
+        self.assertEqual(queue.pending, 0)
+        self.assertEqual(self._load()["mcpServers"]["filesystem"],
+                         {"command": "node", "args": ["-y", "D:\\second"]})
+        self.assertEqual(len(self.store.entries()), 1)
+
+        # 保存する変更がなければ何もしない
+        self.assertIsNone(queue.flush())
+
+    def test_debounce(self):
+        """デバウンス時間の経過後に自動で保存されることのテスト"""
+        saved = threading.Event()
+        original = config.save_config
+
+        def save(*args, **kwargs):
+            result = original(*args, **kwargs)
+            saved.set()
+            return result
+
+        queue = SaveQueue(self.config_path, delay=0.05, backup=False)
+        with patch.object(config, 'save_config', side_effect=save):
+            queue.set_mcp_path("D:\\a")
+            queue.set_mcp_path("D:\\b")
+            self.assertTrue(saved.wait(5))
+        self.assertEqual(self._load()["mcpServers"]["filesystem"]["args"][-1], "D:\\b")
+        self.assertEqual(queue.pending, 0)
+
+    def test_error_reported(self):
+        """時間経過による保存の失敗が通知されることのテスト"""
+        errors = []
+        failed = threading.Event()
+        queue = SaveQueue(self.temp_path / 'missing.json', delay=0.01,
+                          on_error=lambda error: (errors.append(error), failed.set()))
+        queue.set_mcp_path("D:\\a")
+        self.assertTrue(failed.wait(5))
+        self.assertIsInstance(errors[0], FileNotFoundError)
+        self.assertIs(queue.last_error, errors[0])
+
+    def test_failed_mutations_requeued(self):
+        """保存に失敗した変更がキューに戻り、次の保存で適用されることのテスト"""
+        queue = SaveQueue(self.config_path, delay=60, backup=False)
+        queue.set_mcp_path("D:\\a")
+        queue.apply_edits({"mcpServers.filesystem.command": "node"})
+        with patch.object(config, 'save_config', side_effect=PermissionError("denied")):
+            with self.assertRaises(PermissionError):
+                queue.flush()
+        self.assertEqual(queue.pending, 2)
+
+        queue.set_mcp_path("D:\\b")
+        queue.flush()
+        self.assertEqual(self._load()["mcpServers"]["filesystem"],
+                         {"command": "node", "args": ["-y", "D:\\b"]})
+
+        # 保存を諦める場合は破棄できる
+        queue.set_mcp_path("D:\\c")
+        self.assertEqual(len(queue.discard()), 1)
+        self.assertIsNone(queue.flush())
+
+    def test_bad_mutation_dropped(self):
+        """適用できない変更が取り除かれ、後の変更を妨げないことのテスト"""
+        with open(self.config_path, 'w') as f:
+            json.dump({"mcpServers": {"other": {"command": "x"}}}, f)
+        errors = []
+        queue = SaveQueue(self.config_path, delay=60, backup=False, on_error=errors.append)
+        queue.set_mcp_path("/new")
+        queue.apply_edits({"mcpServers.other.command": "y"})
+
+        result = queue.flush()
+        self.assertTrue(result.written)
+        self.assertEqual(queue.pending, 0)
+        self.assertEqual(self._load(), {"mcpServers": {"other": {"command": "y"}}})
+        self.assertEqual(len(errors), 1)
+        self.assertIsInstance(errors[0], KeyError)
+        self.assertIs(queue.last_error, errors[0])
+
+        # 適用できない変更だけなら保存しない
+        queue.set_mcp_path("/new")
+        self.assertIsNone(queue.flush())
+        self.assertEqual(queue.pending, 0)
+
+    def test_backup_ids(self):
+        """同じ秒の保存でもバックアップが上書きされないことのテスト"""
+        ids = [utils.new_backup_id() for _ in range(1000)]
+        self.assertEqual(ids, sorted(set(ids)))
+        self.assertEqual(len(ids[0]), 20)
+        moment = entry_time(BackupEntry(ids[0], '', 0))
+        self.assertEqual(moment.strftime('%Y%m%d%H%M%S%f'), ids[0])
+
+        for path in ("D:\\a", "D:\\b", "D:\\c"):
+            document = config.load_config(self.config_path)
+            config.set_mcp_path(document, path)
+            config.save_config(document, self.config_path)
+        self.assertEqual(len(self.store.entries()), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
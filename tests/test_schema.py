@@ -0,0 +1,82 @@
+"""
+スキーマ検証モジュールのテスト
+"""
+
+import unittest
+import os
+import sys
+
+# モジュールをインポートできるようにシステムパスを調整
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src import schema
+
+
+class TestSchema(unittest.TestCase):
+    """スキーマ検証のテストケース"""
+
+    def setUp(self):
+        """テスト前の準備"""
+        self.valid_config = {
+            "mcpServers": {
+                "filesystem": {"command": "npx", "args": ["index.js", "C:\\test"]},
+                "github": {"command": "node", "args": [], "env": {"TOKEN": "x"}}
+            }
+        }
+
+    def test_valid(self):
+        """有効な設定のテスト"""
+        self.assertEqual(schema.config_validator.errors(self.valid_config), [])
+        self.assertTrue(schema.config_validator.is_valid(self.valid_config))
+
+    def test_reports_every_violation(self):
+        """すべての違反がJSONポインタとともに報告されるかのテスト"""
+        invalid_config = {
+            "mcpServers": {
+                "filesystem": {"command": "", "args": []},
+                "github": {"command": 1, "args": ["ok", 2], "env": {"A/B": True}},
+                "broken": "not an object"
+            }
+        }
+        pointers = [violation.pointer for violation in schema.config_validator.errors(invalid_config)]
+        self.assertEqual(pointers, [
+            "/mcpServers/filesystem/command",
+            "/mcpServers/filesystem/args",
+            "/mcpServers/github/command",
+            "/mcpServers/github/args/1",
+            "/mcpServers/github/env/A~1B",
+            "/mcpServers/broken",
+        ])
+
+    def test_required(self):
+        """必須のキーのテスト"""
+        self.assertEqual(schema.config_validator.errors({"mcpServers": {"filesystem": {}}}), [
+            schema.Violation("/mcpServers/filesystem/args", "必須のキーがありません"),
+        ])
+        self.assertEqual([v.pointer for v in schema.config_validator.errors([])], [""])
+
+    def test_additional_properties(self):
+        """許可されていないキーのテスト"""
+        validator = schema.Validator({
+            "type": "object",
+            "properties": {"a": {"type": ["integer", "null"]}},
+            "additionalProperties": False,
+        })
+        self.assertTrue(validator.is_valid({"a": None}))
+        # boolは整数として扱わない
+        self.assertEqual([v.pointer for v in validator.errors({"a": True, "b": 1})], ["/a", "/b"])
+
+    def test_validate_many(self):
+        """複数の文書の検証のテスト"""
+        documents = (document for document in [self.valid_config, {}, self.valid_config])
+        results = list(schema.config_validator.validate_many(documents))
+        self.assertEqual([len(errors) for errors in results], [0, 1, 0])
+
+    def test_format_violations(self):
+        """違反の表示のテスト"""
+        text = schema.format_violations([schema.Violation("", "a"), schema.Violation("/x", "b")])
+        self.assertEqual(text, "/: a\n/x: b")
+
+
+if __name__ == '__main__':
+    unittest.main()
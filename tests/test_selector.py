@@ -0,0 +1,106 @@
+"""
+セレクタモジュールのテスト
+"""
+
+import unittest
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# モジュールをインポートできるようにシステムパスを調整
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src import config
+from src.selector import apply_edits, compile_selector
+
+
+class TestSelector(unittest.TestCase):
+    """セレクタのテストケース"""
+
+    def setUp(self):
+        """テスト前の準備"""
+        self.document = {
+            "mcpServers": {
+                "filesystem": {"command": "npx", "args": ["index.js", "C:\\a"]},
+                "github": {"command": "npx", "args": [], "env": {"TOKEN": "old"}},
+                "local.server": {"command": "python"}
+            }
+        }
+
+    def test_compile(self):
+        """セレクタのコンパイルとキャッシュのテスト"""
+        selector = compile_selector('mcpServers.*.args[-1]')
+        self.assertIs(compile_selector('mcpServers.*.args[-1]'), selector)
+        self.assertTrue(selector.has_wildcard)
+        self.assertEqual(compile_selector('mcpServers["local.server"].command').get(self.document), "python")
+
+        for text in ['', 'a..b', 'a.', '[x]', 'a]']:
+            with self.assertRaises(ValueError):
+                compile_selector(text)
+
+    def test_select(self):
+        """ワイルドカードによる選択のテスト"""
+        matches = compile_selector('mcpServers.*.args[-1]').select(self.document)
+        self.assertEqual(matches, [(('mcpServers', 'filesystem', 'args', -1), "C:\\a")])
+
+        commands = compile_selector('mcpServers.*.command').select_many([self.document, {}])
+        self.assertEqual([value for _, value in commands[0]], ["npx", "npx", "python"])
+        self.assertEqual(commands[1], [])
+
+    def test_get(self):
+        """値の取得のテスト"""
+        self.assertEqual(compile_selector('mcpServers.github.env.TOKEN').get(self.document), "old")
+        with self.assertRaises(KeyError):
+            compile_selector('mcpServers.github.env.MISSING').get(self.document)
+        with self.assertRaises(ValueError):
+            compile_selector('mcpServers.*.command').get(self.document)
+
+    def test_apply_edits(self):
+        """複数の変更の適用のテスト"""
+        changed = apply_edits(self.document, {
+            'mcpServers.filesystem.args[-1]': "D:\\b",
+            'mcpServers.github.env.TOKEN': "new",
+            'mcpServers.github.env.USER': "me",
+            'mcpServers.*.env.DEBUG': "1",
+            'mcpServers.filesystem.command': "npx",
+        })
+
+        servers = self.document["mcpServers"]
+        self.assertEqual(changed, 4)
+        self.assertEqual(servers["filesystem"]["args"], ["index.js", "D:\\b"])
+        self.assertEqual(servers["github"]["env"], {"TOKEN": "new", "USER": "me", "DEBUG": "1"})
+        # ワイルドカードより下で経路が存在しない要素は読み飛ばされる
+        self.assertNotIn("env", servers["filesystem"])
+
+        # 空の配列への[-1]は要素の追加になる
+        apply_edits(self.document, [('mcpServers.github.args[-1]', "x")])
+        self.assertEqual(servers["github"]["args"], ["x"])
+
+        with self.assertRaises(KeyError):
+            apply_edits(self.document, {'mcpServers.missing.args[-1]': "x"})
+
+    def test_edit_config(self):
+        """1回の保存での複数の変更のテスト"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            config_file = Path(temp_dir) / 'config.json'
+            with open(config_file, 'w') as f:
+                json.dump(self.document, f)
+
+            result = config.edit_config({
+                'mcpServers.filesystem.args[-1]': "D:\\b",
+                'mcpServers.github.env.TOKEN': "new",
+            }, config_file, backup=False)
+            self.assertTrue(result.written)
+
+            saved = config.load_config(config_file)
+            self.assertEqual(config.get_mcp_path(saved), "D:\\b")
+            self.assertEqual(saved["mcpServers"]["github"]["env"]["TOKEN"], "new")
+
+            result = config.edit_config({'mcpServers.github.env.TOKEN': "new"}, config_file, backup=False)
+            self.assertFalse(result.written)
+
+
+if __name__ == '__main__':
+    unittest.main()
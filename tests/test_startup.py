@@ -0,0 +1,93 @@
+"""
+起動時間の計測モジュールのテスト
+"""
+
+import unittest
+import io
+import os
+import subprocess
+import sys
+import tempfile
+
+# モジュールをインポートできるようにシステムパスを調整
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+from src import config
+from src import main
+from src import startup
+
+
+class TestStartup(unittest.TestCase):
+    """起動時間の計測のテストケース"""
+
+    def setUp(self):
+        """テスト前の準備"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.module_name = 'startup_trace_sample'
+        with open(os.path.join(self.temp_dir.name, self.module_name + '.py'), 'w') as f:
+            f.write('import json\nVALUE = 1\n')
+        sys.path.insert(0, self.temp_dir.name)
+
+    def tearDown(self):
+        """テスト後のクリーンアップ"""
+        sys.path.remove(self.temp_dir.name)
+        sys.modules.pop(self.module_name, None)
+        self.temp_dir.cleanup()
+
+    def test_trace_imports(self):
+        """インポート時間の記録と表示のテスト"""
+        tracer = startup.start_trace(['--startup-trace', 'validate'])
+        try:
+            module = __import__(self.module_name)
+        finally:
+            output = io.StringIO()
+            startup.finish_trace(tracer, output)
+
+        self.assertEqual(module.VALUE, 1)
+        self.assertNotIn(tracer, sys.meta_path)
+        names = [record[0] for record in tracer.records]
+        self.assertIn(self.module_name, names)
+        name, self_time, cumulative, depth = tracer.records[names.index(self.module_name)]
+        self.assertEqual(depth, 0)
+        self.assertLessEqual(self_time, cumulative)
+
+        lines = output.getvalue().splitlines()
+        self.assertEqual(lines[0], 'import time: self [us] | cumulative | imported package')
+        self.assertTrue(any(line.endswith(' ' + self.module_name) for line in lines))
+        self.assertIn('インポート合計', lines[-1])
+
+    def test_trace_disabled(self):
+        """指定がない場合は計測しないことのテスト"""
+        tracer = startup.start_trace(['validate'])
+        self.assertIsNone(tracer)
+        startup.finish_trace(tracer)
+
+    def test_trace_option_after_subcommand(self):
+        """--startup-traceをサブコマンドの後ろに書けることのテスト"""
+        for argv in (['batch', 'a.json', '--path', 'D:\\new', '--startup-trace'],
+                     ['validate', '--startup-trace', 'a.json'],
+                     ['--startup-trace', 'verify-backups']):
+            self.assertTrue(main.parse_arguments(argv).startup_trace, argv)
+        self.assertFalse(main.parse_arguments(['validate', 'a.json']).startup_trace)
+
+    def test_backup_modes(self):
+        """--backup-modeの選択肢がconfigの定数と一致することのテスト"""
+        self.assertEqual(main.BACKUP_MODES, (config.BACKUP_MODE_STORE, config.BACKUP_MODE_PACK))
+
+    def test_cli_does_not_import_tkinter(self):
+        """サブコマンドがtkinterを読み込まないことのテスト"""
+        path = os.path.join(self.temp_dir.name, 'config.json')
+        with open(path, 'w') as f:
+            f.write('{"mcpServers": {"filesystem": {"command": "npx", "args": ["C:\\\\dir"]}}}')
+        code = ("import sys\n"
+                "from src import main\n"
+                f"code = main.main(['validate', {path!r}])\n"
+                "sys.exit(10 if 'tkinter' in sys.modules else code)\n")
+        result = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True)
+        self.assertEqual(result.returncode, 0, result.stdout + result.stderr)
+        self.assertIn('OK', result.stdout)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+"""
+バックグラウンド処理モジュールのテスト
+"""
+
+import unittest
+import os
+import queue
+import sys
+import threading
+from tkinter import TclError
+from unittest.mock import MagicMock
+
+# モジュールをインポートできるようにシステムパスを調整
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.tasks import ImmediateExecutor, TaskCancelled, TaskRunner
+
+
+class TestTasks(unittest.TestCase):
+    """バックグラウンド処理のテストケース"""
+
+    def setUp(self):
+        """テスト前の準備"""
+        # after()で渡された処理をキューに入れ、テスト側（メインスレッド役）で実行する
+        self.calls = queue.Queue()
+        self.root = MagicMock()
+        self.root.after.side_effect = lambda delay, func, *args: self.calls.put((func, args))
+        self.runner = TaskRunner(self.root)
+        self.results = []
+
+    def tearDown(self):
+        """テスト後のクリーンアップ"""
+        self.runner.shutdown()
+
+    def _pump(self):
+        """メインスレッドに渡された処理を1つ実行する"""
+        func, args = self.calls.get(timeout=2.0)
+        func(*args)
+
+    def test_success_on_main_thread(self):
+        """結果がafter()経由でコールバックに渡されるかのテスト"""
+        worker = []
+        task = self.runner.run("test", lambda cancel: worker.append(threading.current_thread()) or 42,
+                               self.results.append)
+        self._pump()
+
+        self.assertEqual(self.results, [42])
+        self.assertTrue(task.done)
+        self.assertIsNot(worker[0], threading.current_thread())
+
+    def test_error(self):
+        """例外がエラー用のコールバックに渡されるかのテスト"""
+        def work(cancel):
+            raise PermissionError("denied")
+
+        self.runner.run("test", work, self.results.append, on_error=self.results.append)
+        self._pump()
+
+        self.assertIsInstance(self.results[0], PermissionError)
+
+    def _run_cancelled(self, work):
+        """処理の実行中に中止を要求し、コールバックに渡されたものを返す"""
+        started = threading.Event()
+        release = threading.Event()
+
+        def wrapper(cancel):
+            started.set()
+            release.wait(2.0)
+            return work(cancel)
+
+        task = self.runner.run("test", wrapper, self.results.append,
+                               on_cancel=lambda: self.results.append("cancelled"))
+        self.assertTrue(started.wait(2.0))
+        task.cancel()
+        release.set()
+        self._pump()
+        return self.results
+
+    def test_cancel(self):
+        """中止の要求に応じて打ち切られた処理のテスト"""
+        def work(cancel):
+            if cancel.is_set():
+                raise TaskCancelled
+            return "late"
+
+        self.assertEqual(self._run_cancelled(work), ["cancelled"])
+
+    def test_cancel_after_completion(self):
+        """中止を要求しても最後まで実行された処理の結果は渡されるかのテスト"""
+        self.assertEqual(self._run_cancelled(lambda cancel: "written"), ["written"])
+
+    def test_window_closed(self):
+        """ウィンドウが閉じられた後に完了した処理の結果が捨てられるかのテスト"""
+        root = MagicMock()
+        root.after.side_effect = TclError('can\'t invoke "after" command: application has been destroyed')
+        runner = TaskRunner(root, ImmediateExecutor())
+
+        task = runner.run("test", lambda cancel: "late", self.results.append)
+        self.assertFalse(task.done)
+        self.assertEqual(self.results, [])
+
+    def test_immediate_executor(self):
+        """同期的なエグゼキュータのテスト"""
+        root = MagicMock()
+        root.after.side_effect = lambda delay, func, *args: func(*args)
+        runner = TaskRunner(root, ImmediateExecutor())
+
+        task = runner.run("test", lambda cancel: "ok", self.results.append)
+        self.assertTrue(task.done)
+        self.assertEqual(self.results, ["ok"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+"""
+処理時間の計測モジュールのテスト
+"""
+
+import unittest
+import io
+import os
+import sys
+import tempfile
+import json
+
+# モジュールをインポートできるようにシステムパスを調整
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src import config
+from src import tracing
+
+
+class TestTracing(unittest.TestCase):
+    """処理時間の計測のテストケース"""
+
+    def setUp(self):
+        """テスト前の準備"""
+        self.was_enabled = tracing.is_enabled()
+        tracing.disable()
+        tracing.reset()
+
+    def tearDown(self):
+        """テスト後のクリーンアップ"""
+        tracing.reset()
+        if self.was_enabled:
+            tracing.enable()
+
+    def test_disabled(self):
+        """無効な場合は何も記録しないことのテスト"""
+        @tracing.traced
+        def work(value):
+            return value * 2
+
+        with tracing.span('outer') as span:
+            self.assertEqual(work(3), 6)
+        self.assertEqual(span.duration, 0.0)
+        self.assertEqual(tracing.stats(), {})
+        self.assertEqual(work.__name__, 'work')
+
+    def test_nested_spans(self):
+        """入れ子の区間の集計のテスト"""
+        @tracing.traced
+        def inner():
+            with tracing.span('leaf'):
+                pass
+
+        tracing.enable()
+        with tracing.span('outer') as outer:
+            inner()
+            inner()
+        tracing.disable()
+
+        stats = tracing.stats()
+        self.assertEqual(list(stats), [('outer',), ('outer', 'inner'), ('outer', 'inner', 'leaf')])
+        self.assertEqual(stats[('outer', 'inner')].count, 2)
+        self.assertGreaterEqual(stats[('outer',)].total, stats[('outer', 'inner')].total)
+        self.assertEqual([child.name for child in outer.children], ['inner', 'inner'])
+        self.assertTrue(tracing.summarize(outer).startswith('outer '))
+        self.assertIn('inner', tracing.summarize(outer))
+
+    def test_exception(self):
+        """例外が発生しても区間が閉じられることのテスト"""
+        tracing.enable()
+        with self.assertRaises(ValueError):
+            with tracing.span('failing'):
+                raise ValueError()
+        with tracing.span('next'):
+            pass
+        tracing.disable()
+        self.assertEqual(list(tracing.stats()), [('failing',), ('next',)])
+
+    def test_config_report(self):
+        """設定ファイルの保存の内訳の表示のテスト"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'config.json')
+            with open(path, 'w') as f:
+                json.dump({"mcpServers": {"filesystem": {"command": "npx", "args": ["C:\\old"]}}}, f)
+
+            tracing.enable()
+            document = config.load_config(path)
+            config.set_mcp_path(document, "D:\\new")
+            config.save_config(document, path)
+            tracing.disable()
+
+        stats = tracing.stats()
+        self.assertIn(('save_config', 'backup_config'), stats)
+        self.assertIn(('save_config', 'atomic_write_bytes'), stats)
+        output = io.StringIO()
+        tracing.print_report(output)
+        self.assertIn('\n  backup_config', output.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
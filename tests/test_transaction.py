@@ -0,0 +1,135 @@
+"""
+トランザクションモジュールのテスト
+"""
+
+import unittest
+import argparse
+import io
+import json
+import os
+import sys
+import tempfile
+from contextlib import redirect_stdout
+from pathlib import Path
+from unittest.mock import patch
+
+# モジュールをインポートできるようにシステムパスを調整
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src import cli
+from src import config
+from src import transaction
+from src.backup_store import BackupStore
+
+
+class TestTransaction(unittest.TestCase):
+    """トランザクションのテストケース"""
+
+    def setUp(self):
+        """テスト前の準備"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.temp_path = Path(self.temp_dir.name)
+        self.paths = []
+        for i in range(4):
+            directory = self.temp_path / f"user{i}"
+            directory.mkdir()
+            path = directory / 'claude_desktop_config.json'
+            with open(path, 'w') as f:
+                json.dump({"mcpServers": {"filesystem": {"command": "npx", "args": ["-y", f"C:\\old{i}"]}}}, f)
+            self.paths.append(path)
+        self.originals = [path.read_bytes() for path in self.paths]
+
+    def tearDown(self):
+        """テスト後のクリーンアップ"""
+        self.temp_dir.cleanup()
+
+    def _target(self, path):
+        with open(path) as f:
+            return json.load(f)["mcpServers"]["filesystem"]["args"][-1]
+
+    def _leftovers(self):
+        """トランザクションが残した一時ファイル"""
+        return [name for path in self.paths for name in os.listdir(path.parent) if 'txn-' in name]
+
+    def test_apply_path(self):
+        """すべてのファイルが変更されることのテスト"""
+        # 最後のファイルは変更後と同じ内容にしておく
+        document = config.load_config(self.paths[3])
+        config.set_mcp_path(document, "D:\\new")
+        config.save_config(document, self.paths[3], backup=False)
+
+        result = transaction.apply_path(self.paths, "D:\\new", workers=4)
+        self.assertEqual(result.committed, [str(path) for path in self.paths[:3]])
+        self.assertEqual(result.unchanged, [str(self.paths[3])])
+        for path in self.paths:
+            self.assertEqual(self._target(path), "D:\\new")
+        self.assertEqual(self._leftovers(), [])
+
+        # 変更したファイルだけがバックアップされている
+        self.assertEqual(len(BackupStore(self.paths[0].parent / 'backup').entries()), 1)
+        self.assertFalse((self.paths[3].parent / 'backup').exists())
+
+    def test_prepare_failure(self):
+        """準備に失敗した場合にどのファイルも変更されないことのテスト"""
+        with open(self.paths[2], 'w') as f:
+            json.dump({"mcpServers": {}}, f)
+        self.originals[2] = self.paths[2].read_bytes()
+
+        with self.assertRaises(transaction.TransactionError) as context:
+            transaction.apply_path(self.paths, "D:\\new", backup=False)
+        self.assertEqual(context.exception.phase, 'prepare')
+        self.assertEqual([path for path, error in context.exception.failures], [str(self.paths[2])])
+        self.assertEqual([path.read_bytes() for path in self.paths], self.originals)
+        self.assertEqual(self._leftovers(), [])
+
+    def test_commit_failure_rolls_back(self):
+        """確定の途中で失敗した場合に置き換え済みのファイルが元に戻ることのテスト"""
+        original_replace = os.replace
+        calls = []
+
+        def replace(source, destination):
+            calls.append(destination)
+            if len(calls) == 3:
+                raise OSError("disk full")
+            original_replace(source, destination)
+
+        with self.assertRaises(transaction.TransactionError) as context:
+            with patch.object(transaction.os, 'replace', side_effect=replace):
+                transaction.apply_path(self.paths, "D:\\new", backup=False)
+        self.assertEqual(context.exception.phase, 'commit')
+        self.assertEqual(context.exception.failures[0][0], str(self.paths[2]))
+        self.assertEqual(context.exception.rolled_back, [str(self.paths[1]), str(self.paths[0])])
+        self.assertEqual([path.read_bytes() for path in self.paths], self.originals)
+        self.assertEqual(self._leftovers(), [])
+
+    def test_concurrent_change_detected(self):
+        """準備の後に変更されたファイルがあれば確定しないことのテスト"""
+        with transaction.Transaction(self.paths, lambda document: config.set_mcp_path(document, "D:\\new"),
+                                     backup=False) as txn:
+            txn.prepare()
+            with open(self.paths[1], 'w') as f:
+                json.dump({"mcpServers": {"filesystem": {"command": "node", "args": ["other"]}}}, f)
+            changed = self.paths[1].read_bytes()
+            with self.assertRaises(transaction.TransactionError):
+                txn.commit()
+        self.assertEqual(self.paths[0].read_bytes(), self.originals[0])
+        self.assertEqual(self.paths[1].read_bytes(), changed)
+        self.assertEqual(self._leftovers(), [])
+
+    def test_cli(self):
+        """txnサブコマンドのテスト"""
+        args = argparse.Namespace(files=[str(path) for path in self.paths], path="D:\\cli", workers=2,
+                                  no_backup=True, backup_mode=None)
+        output = io.StringIO()
+        with redirect_stdout(output):
+            self.assertEqual(cli.run_txn_command(args), 0)
+        self.assertIn("確定: 4件", output.getvalue())
+        self.assertEqual(self._target(self.paths[0]), "D:\\cli")
+
+        args.files = [str(self.temp_path / 'missing.json')] + args.files
+        with redirect_stdout(io.StringIO()):
+            self.assertEqual(cli.run_txn_command(args), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
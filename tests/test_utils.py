@@ -75,6 +75,35 @@ class TestUtils(unittest.TestCase):
             f.write("test")
         self.assertFalse(utils.is_valid_directory(file_path))
     
+    def test_atomic_write_bytes(self):
+        """不可分な書き込み機能のテスト"""
+        target = self.temp_path / "target.json"
+        utils.atomic_write_bytes(target, b'{"a": 1}')
+        self.assertEqual(target.read_bytes(), b'{"a": 1}')
+        
+        # 上書きしても一時ファイルが残らない
+        utils.atomic_write_bytes(target, b'{"a": 2}')
+        self.assertEqual(target.read_bytes(), b'{"a": 2}')
+        self.assertEqual([p.name for p in self.temp_path.iterdir()], ["target.json"])
+    
+    def test_file_content_equals(self):
+        """ファイル内容の比較機能のテスト"""
+        target = self.temp_path / "target.json"
+        target.write_bytes(b'{"a": 1}')
+        self.assertTrue(utils.file_content_equals(target, b'{"a": 1}'))
+        self.assertFalse(utils.file_content_equals(target, b'{"a": 2}'))
+        self.assertFalse(utils.file_content_equals(target, b'{"a": 10}'))
+        self.assertFalse(utils.file_content_equals(self.temp_path / "missing.json", b''))
+    
+    def test_get_app_data_dir(self):
+        """アプリケーションデータのディレクトリのテスト"""
+        with patch('platform.system', return_value='Windows'), \
+                patch.dict(os.environ, {'APPDATA': self.temp_dir.name}):
+            self.assertEqual(utils.get_app_data_dir(), Path(self.temp_dir.name) / utils.APP_DIR_NAME)
+        with patch('platform.system', return_value='Linux'), \
+                patch.dict(os.environ, {'XDG_CONFIG_HOME': self.temp_dir.name}):
+            self.assertEqual(utils.get_app_data_dir(), Path(self.temp_dir.name) / utils.APP_DIR_NAME)
+    
     def test_is_valid_json_file(self):
         """JSONファイル検証機能のテスト"""
         # 有効なJSONファイル
@@ -0,0 +1,127 @@
+"""
+バックアップの検証モジュールのテスト
+"""
+
+import unittest
+import argparse
+import io
+import json
+import os
+import sys
+import tempfile
+from contextlib import redirect_stdout
+from pathlib import Path
+from unittest.mock import patch
+
+# モジュールをインポートできるようにシステムパスを調整
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src import cli
+from src import config
+from src import verify
+from src.backup_store import BackupStore
+
+
+class TestVerify(unittest.TestCase):
+    """バックアップの検証のテストケース"""
+
+    def setUp(self):
+        """テスト前の準備"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.temp_path = Path(self.temp_dir.name)
+        self.config_path = self.temp_path / 'claude_desktop_config.json'
+        self.backup_dir = self.temp_path / 'backup'
+        for i in range(6):
+            with open(self.config_path, 'w') as f:
+                json.dump({"mcpServers": {"filesystem": {"command": "npx", "args": ["-y", f"C:\\{i}"]}}}, f)
+            config.backup_config(self.config_path, mode='pack' if i % 2 else 'store')
+        self.store = BackupStore(self.backup_dir)
+
+    def tearDown(self):
+        """テスト後のクリーンアップ"""
+        self.temp_dir.cleanup()
+
+    def _corrupt(self, path, data):
+        """更新時刻を変えずに内容を書き換えます"""
+        stat_result = os.stat(path)
+        os.chmod(path, 0o644)
+        with open(path, 'r+b') as f:
+            f.write(data)
+        os.utime(path, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns))
+
+    def test_incremental(self):
+        """マニフェストの作成と、変更のあったファイルだけの検証のテスト"""
+        report = verify.verify_backups(self.backup_dir, workers=1)
+        self.assertEqual(report.problems, [])
+        self.assertEqual(report.checked, report.files)
+        self.assertTrue(verify.manifest_path(self.backup_dir).exists())
+        self.assertEqual(verify.manifest_path(self.backup_dir).parent, self.temp_path)
+
+        # 2回目は読み込まない
+        with patch.object(verify, 'check_file') as check_file:
+            report = verify.verify_backups(self.backup_dir, workers=1)
+        check_file.assert_not_called()
+        self.assertEqual(report.skipped, report.files)
+
+        # バックアップを追加するとそのファイルとカタログ・パックだけを読む
+        config.backup_config(self.config_path, mode='pack')
+        report = verify.verify_backups(self.backup_dir, workers=1)
+        self.assertEqual(report.checked, 2)
+
+    def test_detects_corruption(self):
+        """途中で切れたファイルと壊れたファイルの検出のテスト"""
+        verify.verify_backups(self.backup_dir, workers=1)
+        entry = self.store.entries()[0]
+        blob = self.store.blob_path(entry.digest)
+        self._corrupt(blob, b'X')
+
+        # 更新時刻とサイズが変わらない破損は、fullの場合だけ見つかる
+        self.assertEqual(verify.verify_backups(self.backup_dir, workers=1).problems, [])
+        report = verify.verify_backups(self.backup_dir, full=True, workers=2)
+        paths = {path for path, message in report.problems}
+        self.assertEqual(paths, {blob.relative_to(self.backup_dir).as_posix(),
+                                 self.store.snapshot_path(entry.id).name})
+        self.assertIn("ファイル名と一致しません", report.problems[0][1])
+
+        # 一度見つかった問題は、次回もfullでなくても報告される
+        self.assertEqual(len(verify.verify_backups(self.backup_dir, workers=1).problems), 2)
+
+        pack = self.backup_dir / 'config.pack'
+        os.truncate(pack, os.path.getsize(pack) - 5)
+        report = verify.verify_backups(self.backup_dir, workers=1)
+        self.assertIn(('config.pack', "2番目の版がパックの末尾を超えています（途中で切れています）"), report.problems)
+
+        os.remove(blob)
+        report = verify.verify_backups(self.backup_dir, workers=1)
+        self.assertIn("本体がありません", dict(report.problems)[blob.relative_to(self.backup_dir).as_posix()])
+
+    def test_unparsable_store_backup(self):
+        """JSONとして解析できない設定のバックアップを問題としないことのテスト"""
+        with open(self.config_path, 'w') as f:
+            f.write('{"mcpServers": {')
+        snapshot = config.backup_config(self.config_path)
+        self.assertTrue(snapshot.name.startswith(BackupStore.SNAPSHOT_PREFIX))
+
+        report = verify.verify_backups(self.backup_dir, workers=1)
+        self.assertEqual(report.problems, [])
+        # 問題がなければ次回は読み直さない
+        self.assertEqual(verify.verify_backups(self.backup_dir, workers=1).checked, 0)
+
+    def test_cli(self):
+        """verify-backupsサブコマンドのテスト"""
+        args = argparse.Namespace(config=str(self.config_path), dirs=[], full=False, workers=1)
+        output = io.StringIO()
+        with redirect_stdout(output):
+            self.assertEqual(cli.run_verify_command(args), 0)
+        self.assertIn("問題: 0件", output.getvalue())
+
+        with open(self.backup_dir / 'claude_desktop_config_backup_legacy.json', 'w') as f:
+            f.write('{"mcpServers": {')
+        output = io.StringIO()
+        with redirect_stdout(output):
+            self.assertEqual(cli.run_verify_command(args), 1)
+        self.assertIn("NG  claude_desktop_config_backup_legacy.json", output.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
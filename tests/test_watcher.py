@@ -0,0 +1,73 @@
+"""
+ファイル監視モジュールのテスト
+"""
+
+import unittest
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# モジュールをインポートできるようにシステムパスを調整
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src import utils
+from src.watcher import FileWatcher
+
+
+class TestWatcher(unittest.TestCase):
+    """ファイル監視のテストケース"""
+
+    def setUp(self):
+        """テスト前の準備"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.config_file = Path(self.temp_dir.name) / 'config.json'
+        self.config_file.write_text('{"a": 0}')
+        self.events = []
+        self.notified = threading.Event()
+
+    def tearDown(self):
+        """テスト後のクリーンアップ"""
+        self.temp_dir.cleanup()
+
+    def _callback(self, path):
+        self.events.append(path)
+        self.notified.set()
+
+    def _check_debounced_change(self, use_inotify):
+        watcher = FileWatcher(self.config_file, self._callback, debounce=0.1, poll_interval=0.05,
+                              use_inotify=use_inotify)
+        watcher.start()
+        try:
+            # 関係のないファイルの変更は通知されない
+            (Path(self.temp_dir.name) / 'other.json').write_text('{}')
+            time.sleep(0.2)
+            self.assertEqual(self.events, [])
+
+            # 連続した変更は1回にまとめて通知される
+            for i in range(1, 4):
+                utils.atomic_write_bytes(self.config_file, f'{{"a": {i}0}}'.encode())
+                time.sleep(0.02)
+            self.assertTrue(self.notified.wait(2.0))
+            time.sleep(0.3)
+            self.assertEqual(self.events, [self.config_file])
+        finally:
+            watcher.stop()
+        return watcher
+
+    def test_polling(self):
+        """ポーリングによる監視のテスト"""
+        watcher = self._check_debounced_change(use_inotify=False)
+        self.assertEqual(watcher.backend, 'polling')
+
+    @unittest.skipUnless(sys.platform.startswith('linux'), "inotifyはLinuxのみ")
+    def test_inotify(self):
+        """inotifyによる監視のテスト"""
+        watcher = self._check_debounced_change(use_inotify=True)
+        self.assertEqual(watcher.backend, 'inotify')
+
+
+if __name__ == '__main__':
+    unittest.main()